@@ -121,7 +121,8 @@ def doctest_rst_and_public_interface():
           'file and that public interfaces are clean.')
 
     # Import all seirmo modules. If a new module is added to seirmo
-    # it should be imported here for this doctest.
+    # it should be imported here for this doctest. The apps and plots are
+    # imported lazily, when the check below looks up the names in dir().
     import seirmo
 
     # If any modules other than these are exposed it may indicate that a module
@@ -4,15 +4,11 @@
 # for copyright notice and full license details.
 #
 
-
-from . import apps
-
-from . import plots
-
 from ._core import (
     SEIRParameters,
     SEIROutputCollector,
-    SEIRForwardModel
+    SEIRForwardModel,
+    SharedOutputBuffer
 )
 
 from .deterministic_models import (
@@ -20,22 +16,63 @@ from .deterministic_models import (
 )
 
 from ._models import (
+    CachedModel,
     ForwardModel,
     ReducedModel,
     SEIRModel
 )
 from ._stoch_model import StochasticSEIRModel
 
+from ._hybrid_model import HybridSEIRModel
+
+from ._langevin_model import LangevinSEIRModel
+
+from ._surrogate_model import SurrogateModel
+
 from ._stochastic_output_collector import StochasticOutputCollector
 
+from ._parallel import EnsembleRunner
+
 from ._simulation import (
     SimulationController
 )
 
-from ._dataset_library_api import (
-    DatasetLibrary
-)
-
 from ._gillespie import (
     solve_gillespie
 )
+
+from ._tau_leaping import (
+    solve_tau_leaping
+)
+
+# The apps, the plots and the data classes pull in dash, plotly,
+# matplotlib and pandas, which batch simulations do not need, so they are
+# only imported on first access
+_LAZY_ATTRIBUTES = {
+    'apps': ('.apps', None),
+    'plots': ('.plots', None),
+    'DatasetLibrary': ('._dataset_library_api', 'DatasetLibrary'),
+    'IncidenceStream': ('._incidence_stream', 'IncidenceStream'),
+    'IncidenceSource': ('._incidence_stream', 'IncidenceSource'),
+    'FileIncidenceSource': ('._incidence_stream', 'FileIncidenceSource'),
+    'QueueIncidenceSource': ('._incidence_stream', 'QueueIncidenceSource'),
+    'epiabm_incidences': ('._epiabm_processing', 'epiabm_incidences')
+}
+
+
+def __getattr__(name):
+    import importlib
+
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name))
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module_name, __name__)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -7,6 +7,7 @@
 
 import pints
 import typing
+from multiprocessing import shared_memory
 import numpy as np
 
 
@@ -36,6 +37,80 @@ class SEIRParameters():
         return self._parameters[val]
 
 
+class SharedOutputBuffer():
+    """Array of simulation outputs in a block of shared memory, which
+    several processes can write to and read from without copying.
+
+    The buffer created by the parent process owns the shared memory, and
+    should be unlinked with :meth:`unlink` (or by using it as a context
+    manager) when it is no longer needed. Pickled copies, e.g. passed to
+    worker processes, attach to the same memory by its name, and should be
+    closed with :meth:`close` when they are no longer needed.
+
+    :param shape: Shape of the array, e.g. ``(n_runs, n_times, n_outputs)``.
+    :param name: Name of an existing block of shared memory to attach to,
+        defaults to creating a new block.
+    """
+    def __init__(self, shape: typing.Tuple[int, ...], name: str = None):
+        self._shape = tuple(int(n) for n in shape)
+        n_bytes = max(1, int(np.prod(self._shape)) * 8)
+        self._owner = name is None
+        if self._owner:
+            self._memory = shared_memory.SharedMemory(
+                create=True, size=n_bytes)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+        # Unlike np.ndarray, np.frombuffer keeps the memory exported while
+        # the array (or any view of it) exists, so it cannot be unmapped
+        # while still in use
+        self._array = np.frombuffer(
+            self._memory.buf, dtype=float,
+            count=int(np.prod(self._shape))).reshape(self._shape)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.unlink()
+
+    def __getstate__(self):
+        return {'shape': self._shape, 'name': self._memory.name}
+
+    def __setstate__(self, state):
+        self.__init__(state['shape'], state['name'])
+
+    def name(self):
+        """Returns the Name of the Shared Memory"""
+        return self._memory.name
+
+    def shape(self):
+        """Returns the Shape of the Array"""
+        return self._shape
+
+    def array(self):
+        """Returns the Array, as a View of the Shared Memory"""
+        return self._array
+
+    def close(self):
+        """Detaches this Process from the Shared Memory. Arrays returned
+        by :meth:`array` must be deleted first."""
+        self._array = None
+        try:
+            self._memory.close()
+        except BufferError:
+            raise BufferError(
+                'The shared memory is still in use; delete the arrays '
+                'returned by array() before closing the buffer.')
+
+    def unlink(self):
+        """Detaches from and, if this is the Buffer which created it, frees
+        the Shared Memory"""
+        if self._owner:
+            self._owner = False
+            self._memory.unlink()
+        self.close()
+
+
 class SEIROutputCollector():
     """Base Class for Accumulating the Output Data from SEIR
         and Related Forward Models"""
@@ -43,6 +118,7 @@ class SEIROutputCollector():
         self._output_names = outputNames
         self._n_outputs = len(outputNames)
         self._output_indices = np.arange(self._n_outputs)
+        self._shared_output = None
 
     def n_outputs(self):
         """Returns the Number of Outputs"""
@@ -69,6 +145,44 @@ class SEIROutputCollector():
         self._output_indices = output_indices
         self._n_outputs = len(outputs)
 
+    def set_shared_output(self, buffer: SharedOutputBuffer, index=None):
+        """
+        Writes the data of subsequent simulations into a
+        :class:`SharedOutputBuffer`, instead of a private array, so that
+        other processes can read it without copying.
+
+        The data is written to ``buffer.array()[index]``, e.g. the row of
+        the run of an ensemble, and holds all outputs, whichever are
+        selected with :meth:`set_outputs`. Pass ``None`` as the buffer to
+        write into private arrays again, which copies the data of the last
+        simulation out of the buffer.
+
+        :param buffer: Shared buffer to write into, or None.
+        :param index: Index of the data in the buffer, e.g. a run index or a
+            slice of runs. Defaults to the whole buffer.
+        """
+        if buffer is None:
+            if self._shared_output is not None and hasattr(self, '_data'):
+                self._data = np.array(self._data)
+            self._shared_output = None
+            return
+        if not isinstance(buffer, SharedOutputBuffer):
+            raise TypeError(
+                'The buffer has to be an instance of '
+                'seirmo.SharedOutputBuffer.')
+        if buffer.shape()[-1] != len(self._output_names):
+            raise ValueError(
+                'The last axis of the buffer must hold all outputs.')
+        # Indexing with None would add an axis instead of selecting all
+        self._shared_output = (buffer, ... if index is None else index)
+
+    def _shared_data(self):
+        """Returns the view of the shared buffer to write into, or None"""
+        if self._shared_output is None:
+            return None
+        buffer, index = self._shared_output
+        return buffer.array()[index]
+
     def begin(self, *args, **kwargs):
         """
         Abstract method which is called before observations from
@@ -99,6 +213,10 @@ class SEIROutputCollector():
 
         : param: data np.ndarray: Data to save.
         """
+        shared_data = self._shared_data()
+        if shared_data is not None:
+            shared_data[...] = data
+            data = shared_data
         self._data = data
 
     def retrieve(self):
@@ -106,9 +224,10 @@ class SEIROutputCollector():
         Returns the Data stored in the Collector.
 
         If the collector is configured to only output specific columns,
-        these are filtered here.
+        these are filtered here. The outputs are stored along the last axis
+        of the data.
         """
-        return self._data[:, self._output_indices]
+        return self._data[..., self._output_indices]
 
 
 class SEIRForwardModel(pints.ForwardModel):
@@ -4,7 +4,14 @@
 # for copyright notice and full license details.
 #
 
+import json
 import os
+import re
+import shutil
+import tempfile
+import threading
+
+import numpy as np
 import pandas as pd
 
 
@@ -14,10 +21,140 @@ class DatasetLibrary(object):
     datasets.
 
     Each method returns a unique dataset in form of :class:`pandas.DataFrame`.
+
+    The datasets are kept in a registry, which holds the bundled datasets
+    and can be extended with local CSV files using :meth:`register`. Any
+    registered dataset can be loaded by name with :meth:`load`, which
+    selects rows, years, weeks and columns before the data is copied, so
+    only the requested part of a long history is materialised.
+
+    The first time a dataset is loaded, its CSV file is parsed once and
+    converted into a columnar binary format, with one ``.npy`` file per
+    column. Subsequent loads, also in other processes, memory-map these
+    files, so that processes share the pages of the data instead of each
+    holding a parsed copy. The datasets loaded by a library are also cached
+    by it, until the library is deleted.
+
+    The columns of the returned data frames are read-only views of the
+    memory-mapped files. Assigning new or rescaled columns, slicing and
+    renaming work as usual, but modifying values in place requires a copy,
+    e.g. ``dataframe.copy()``, unless pandas' copy-on-write is enabled.
+
+    :param cache_dir: Directory to store the converted datasets in. Defaults
+        to a ``seirmo`` directory in the user's cache directory,
+        ``$XDG_CACHE_HOME`` or ``~/.cache``.
+    :type cache_dir: str
     """
-    def __init__(self):
+    def __init__(self, cache_dir=None):
         self._directory = os.path.join(
             os.path.dirname(__file__), 'data_library')
+        self._registry = {
+            'french_flu': os.path.join(self._directory, 'french_flu_data.csv')
+        }
+
+        if cache_dir is None:
+            cache_dir = os.path.join(
+                os.environ.get('XDG_CACHE_HOME')
+                or os.path.join(os.path.expanduser('~'), '.cache'),
+                'seirmo')
+        self._cache_dir = cache_dir
+
+        # Datasets loaded by this library, and the directory of their
+        # columns, by the path of their file
+        self._datasets = {}
+        self._lock = threading.Lock()
+
+    def cache_dir(self):
+        """
+        Returns the directory the converted datasets are stored in.
+        """
+        return self._cache_dir
+
+    def datasets(self):
+        """
+        Returns the names of the registered datasets.
+        """
+        return list(self._registry)
+
+    def register(self, name, filepath):
+        """
+        Registers a local CSV file as a dataset, which can then be loaded
+        with :meth:`load`. The file is only read when the dataset is loaded,
+        and converted like the bundled datasets.
+
+        :param name: Name of the dataset.
+        :type name: str
+        :param filepath: Path to the CSV file, with a header row of column
+            names.
+        :type filepath: str
+        """
+        if name in self._registry:
+            raise ValueError(
+                'A dataset named {} is already registered.'.format(name))
+        if not os.path.isfile(filepath):
+            raise ValueError('The file {} does not exist.'.format(filepath))
+        self._registry[name] = os.path.abspath(filepath)
+
+    def load(self, name, rows=None, years=None, weeks=None, columns=None):
+        """
+        Returns a registered dataset as a :class:`pandas.DataFrame`,
+        restricted to the selected rows and columns.
+
+        The rows are selected on the memory-mapped columns, before any data
+        is copied, and keep their index in the full dataset. Only the
+        selected rows of the selected columns are materialised, and none
+        are for a plain range of rows.
+
+        :param name: Name of the dataset, see :meth:`datasets`.
+        :type name: str
+        :param rows: Range of rows to select, by position, e.g.
+            ``slice(60, 91)``. Defaults to all rows.
+        :type rows: slice
+        :param years: Year, or inclusive range ``(first, last)`` of years, to
+            select rows by the ``year`` column.
+        :type years: int | tuple
+        :param weeks: Week, or inclusive range ``(first, last)`` of weeks, to
+            select rows by the ``week`` column.
+        :type weeks: int | tuple
+        :param columns: Names of the columns to select. Defaults to all
+            columns.
+        :type columns: list
+        """
+        if name not in self._registry:
+            raise ValueError('Unknown dataset {}, expected one of {}.'.format(
+                name, self.datasets()))
+        if rows is None:
+            rows = slice(None)
+        if not isinstance(rows, slice):
+            raise TypeError('The rows have to be selected with a slice.')
+
+        dataframe = self._load(self._registry[name])
+        if columns is not None:
+            columns = list(columns)
+            unknown = [c for c in columns if c not in dataframe.columns]
+            if unknown:
+                raise ValueError('Unknown columns {}.'.format(unknown))
+
+        # A range of rows is a view of the columns
+        selected = dataframe.iloc[rows]
+        if columns is not None:
+            selected = selected[columns]
+
+        # The filters only read their own column within the range
+        mask = None
+        for key, value in (('year', years), ('week', weeks)):
+            if value is None:
+                continue
+            if key not in dataframe.columns:
+                raise ValueError(
+                    'The dataset {} has no {} column.'.format(name, key))
+            first, last = value if np.ndim(value) else (value, value)
+            values = dataframe[key].to_numpy()[rows]
+            in_range = (values >= first) & (values <= last)
+            mask = in_range if mask is None else mask & in_range
+        if mask is not None:
+            selected = selected.iloc[np.flatnonzero(mask)]
+        return selected
 
     def french_flu(self):
         """
@@ -50,5 +187,117 @@ class DatasetLibrary(object):
         `inc100_up`: upper bound of the 95% confidence interval of the number
         of flu cases at that time point reported to 100,000 people.
         """
-        filepath = os.path.join(self._directory, 'french_flu_data.csv')
-        return pd.read_csv(filepath)
+        return self.load('french_flu')
+
+    def _load(self, filepath):
+        # Returns the dataset of the CSV file from the library's cache, the
+        # converted columns, or by parsing (and converting) the file. The
+        # columns are stored in a directory named after the size and
+        # modification time of the file, so changed files are converted again
+        stat = os.stat(filepath)
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        directory = os.path.join(
+            os.path.abspath(self._cache_dir),
+            '{}-{}-{}'.format(name, stat.st_size, stat.st_mtime_ns))
+
+        with self._lock:
+            cached = self._datasets.get(filepath)
+            if cached is not None and cached[0] == directory:
+                dataframe = cached[1]
+            else:
+                try:
+                    dataframe = _read_columns(directory)
+                except (OSError, ValueError):
+                    dataframe = _convert(filepath, directory)
+                # Replaces the columns of an older version of the file, so
+                # that their memory maps are released
+                self._datasets[filepath] = (directory, dataframe)
+
+        # A shallow copy, so that callers adding or replacing columns do not
+        # change the cached data frame
+        return dataframe.copy(deep=False)
+
+
+def _convert(filepath, directory):
+    """Parses the CSV file and stores its columns in the directory, and
+    returns the dataset read back from there. If the directory cannot be
+    written, the parsed dataset is returned instead."""
+    dataframe = pd.read_csv(filepath)
+    parent = os.path.dirname(directory)
+    try:
+        os.makedirs(parent, exist_ok=True)
+        # Write to a temporary directory first, so that other processes
+        # never see a partially written dataset
+        temporary = tempfile.mkdtemp(dir=parent)
+    except OSError:
+        return dataframe
+
+    try:
+        _write_columns(dataframe, temporary)
+        os.rename(temporary, directory)
+    except OSError:
+        # Another process may have converted the file at the same time
+        shutil.rmtree(temporary, ignore_errors=True)
+
+    # Remove the columns of older versions of the file
+    name, _, _ = os.path.basename(directory).rsplit('-', 2)
+    for entry in os.listdir(parent):
+        path = os.path.join(parent, entry)
+        if re.fullmatch(re.escape(name) + r'-\d+-\d+', entry) \
+                and path != directory:
+            shutil.rmtree(path, ignore_errors=True)
+
+    try:
+        return _read_columns(directory)
+    except (OSError, ValueError):
+        return dataframe
+
+
+def _write_columns(dataframe, directory):
+    """Stores each column of the data frame as a ``.npy`` file in the
+    directory, together with a ``columns.json`` file listing the names and
+    pandas types of the columns.
+
+    Numeric columns are stored as they are. Other columns are stored as
+    fixed-width strings with a mask of their missing values.
+    """
+    columns = []
+    for index, (name, column) in enumerate(dataframe.items()):
+        numeric = column.dtype.kind in 'biuf'
+        if numeric:
+            values = column.to_numpy()
+        else:
+            missing = column.isna().to_numpy()
+            values = column.astype(object).where(~missing, '').to_numpy(
+                dtype=str)
+            np.save(os.path.join(directory, '{}-missing.npy'.format(index)),
+                    missing)
+        np.save(os.path.join(directory, '{}.npy'.format(index)), values)
+        columns.append({
+            'name': name, 'dtype': str(column.dtype), 'numeric': numeric})
+
+    with open(os.path.join(directory, 'columns.json'), 'w') as f:
+        json.dump(columns, f)
+
+
+def _read_columns(directory):
+    """Returns the data frame stored in the directory by
+    :func:`_write_columns`, with its numeric columns memory-mapped."""
+    with open(os.path.join(directory, 'columns.json'), 'r') as f:
+        columns = json.load(f)
+
+    data = {}
+    for index, column in enumerate(columns):
+        # The memory map is read-only, and viewed as a plain array so pandas
+        # treats it like any other column
+        values = np.load(
+            os.path.join(directory, '{}.npy'.format(index)),
+            mmap_mode='r').view(np.ndarray)
+        if not column['numeric']:
+            missing = np.load(
+                os.path.join(directory, '{}-missing.npy'.format(index)))
+            values = pd.Series(values.astype(object)).where(~missing)
+            values = values.astype(column['dtype'])
+        data[column['name']] = values
+
+    return pd.DataFrame(data, copy=False)
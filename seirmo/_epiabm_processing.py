@@ -0,0 +1,132 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+# Number of bytes of statuses processed at once, if the chunk size is not
+# given
+_CHUNK_BYTES = 2 ** 24
+
+
+def epiabm_incidences(status_history, chunk_size=None):
+    """
+    Returns the incidence numbers of an Epiabm simulation, computed from its
+    history of the infection status of each individual.
+
+    The history has a row for each time step, with the time in the first
+    column and the infection status of an individual in each further
+    column, as written to ``inf_status_history.csv`` by Epiabm. The
+    incidence at the first time step is the number of infectious
+    individuals (statuses 3 to 8), and at each further time step the number
+    of individuals who were susceptible (status 1) at the previous step, and
+    are exposed or infectious (statuses 2 to 8) at this step.
+
+    The history is processed ``chunk_size`` rows at a time, with the
+    statuses stored as 8-bit integers, so the memory needed is bounded by
+    the size of a chunk, however many time steps the history holds. By
+    default, the chunks hold about 16 MB of statuses, e.g. 8 rows for a
+    population of two million. A CSV file is parsed with
+    :func:`numpy.loadtxt`, which is much faster than :func:`pandas.read_csv`
+    for files with a column per individual of a population.
+
+    The incidences are returned as a :class:`pandas.DataFrame` with columns
+    `Time` and `Incidence Number`, as accepted by the apps and plots.
+
+    :param status_history: Path to the CSV file, with a header row, or a
+        :class:`pandas.DataFrame` of its contents.
+    :type status_history: str | pandas.DataFrame
+    :param chunk_size: Number of rows processed at once.
+    :type chunk_size: int
+    """
+    if chunk_size is not None and (
+            int(chunk_size) != chunk_size or chunk_size < 1):
+        raise ValueError('The chunk size must be a positive integer.')
+
+    if isinstance(status_history, (str, os.PathLike)):
+        chunks = _read_chunks(status_history, chunk_size)
+    elif isinstance(status_history, pd.DataFrame):
+        chunks = _dataframe_chunks(status_history, chunk_size)
+    else:
+        raise TypeError(
+            'The status history has to be a path to a CSV file or a '
+            'pandas.DataFrame.')
+
+    times, incidences = [], []
+    susceptible = None
+    for chunk_times, statuses in chunks:
+        infected = (statuses > 1) & (statuses < 9)
+        if susceptible is None:
+            # The initial infections of the first step
+            new_infections = [np.count_nonzero(
+                infected[0] & (statuses[0] > 2))]
+        else:
+            new_infections = [np.count_nonzero(susceptible & infected[0])]
+
+        # New infections since the previous step, within the chunk
+        new_infections.extend(np.count_nonzero(
+            (statuses[:-1] == 1) & infected[1:], axis=1))
+        susceptible = statuses[-1] == 1
+
+        times.append(chunk_times)
+        incidences.append(new_infections)
+
+    if not times:
+        raise ValueError('The status history has no rows.')
+    return pd.DataFrame({
+        'Time': np.concatenate(times),
+        'Incidence Number': np.concatenate(incidences).astype(int)})
+
+
+def _rows_per_chunk(chunk_size, n_individuals):
+    """Returns the chunk size, or the number of rows of statuses which fit
+    into the default chunk if it is not given."""
+    if chunk_size is not None:
+        return int(chunk_size)
+    return max(1, _CHUNK_BYTES // max(1, n_individuals))
+
+
+def _dataframe_chunks(dataframe, chunk_size):
+    """Yields the times and statuses of the data frame in chunks of up to
+    ``chunk_size`` rows."""
+    chunk_size = _rows_per_chunk(chunk_size, dataframe.shape[1] - 1)
+    for start in range(0, len(dataframe), chunk_size):
+        chunk = dataframe.iloc[start:start + chunk_size]
+        yield (chunk.iloc[:, 0].to_numpy(dtype=float),
+               chunk.iloc[:, 1:].to_numpy(dtype=np.int8))
+
+
+def _read_chunks(filepath, chunk_size):
+    """Yields the times and statuses of the rows of the CSV file, after its
+    header, in chunks of up to ``chunk_size`` rows."""
+    with open(filepath, 'r') as f:
+        n_individuals = len(f.readline().split(',')) - 1
+        chunk_size = _rows_per_chunk(chunk_size, n_individuals)
+        dtype = np.dtype(
+            [('time', float), ('status', np.int8, (n_individuals,))])
+
+        n_rows = 0
+        while True:
+            try:
+                with warnings.catch_warnings():
+                    # Warnings of blank lines, or of no rows left to read
+                    warnings.simplefilter('ignore', UserWarning)
+                    chunk = np.loadtxt(f, delimiter=',', dtype=dtype,
+                                       max_rows=chunk_size, ndmin=1)
+            except ValueError as e:
+                raise ValueError(
+                    'Could not read the statuses of {} after row {}: {}'
+                    .format(filepath, n_rows, e)) from None
+            if len(chunk) == 0:
+                return
+            yield chunk['time'], chunk['status']
+            n_rows += len(chunk)
+            if len(chunk) < chunk_size:
+                return
@@ -4,13 +4,18 @@
 # for copyright notice and full license details.
 #
 
+import math
 import numpy as np
 import typing
 
 
 def solve_gillespie(propensities: typing.Callable[[np.ndarray], np.ndarray],
                     initial_cond: np.ndarray, t_span: typing.List[float],
-                    max_t_step: float = 0.01):
+                    max_t_step: float = 0.01,
+                    reactions: typing.Optional[np.ndarray] = None,
+                    rng: typing.Optional[np.random.Generator] = None,
+                    method: str = 'direct',
+                    dependencies: typing.Optional[np.ndarray] = None):
     """ Solve an initial_cond value problem using gillespie algorithm
 
     This function numerically integrates a system of ordinary differential
@@ -22,12 +27,46 @@ def solve_gillespie(propensities: typing.Callable[[np.ndarray], np.ndarray],
     dependant rates that may be non-zero at later times
     This time step is drawn from an exp dist based on ((t_stop-t_start)/100)
 
+    The reaction that fires is selected with a cumulative sum of the rates and
+    a binary search (``np.searchsorted``). If ``reactions`` is given, only the
+    listed (loss, gain) transitions are considered, and ``propensities`` must
+    return one rate per reaction. Otherwise the full NxN propensity matrix is
+    searched, which is kept for compatibility with existing callers.
+
+    For large reaction networks, where the cost of the direct method grows
+    with the number of reactions, two alternative event selection methods
+    may be chosen with ``method``:
+
+    - ``'next_reaction'``: the next reaction method of Gibson and Bruck
+      (2000), which keeps the putative firing time of every reaction in an
+      indexed priority queue, and updates the reactions affected by an
+      event at a cost logarithmic in the number of reactions.
+    - ``'composition_rejection'``: the composition-rejection method of
+      Slepoy, Thompson and Plimpton (2008), which groups reactions by the
+      magnitude of their rates and selects a reaction by rejection sampling
+      within a group, at a cost independent of the number of reactions.
+
+    Both only update the reactions whose rates depend on the compartments
+    changed by the last event, as given by ``dependencies``, which is
+    required by these methods, and assume that the rates only change when
+    an event fires. The costs above assume a sparse dependency graph, where
+    each event affects few reactions, and exclude the evaluation of
+    ``propensities``, which still computes every rate after each event.
+    They only pay off when that evaluation is cheap compared to selecting
+    the reaction, e.g. for many reactions with vectorised rates.
+
+    If ``reactions`` is not given, the reactions of these methods are the
+    entries of the propensity matrix which are non-zero in the initial
+    state, or whose rates depend on any compartment. Entries which are zero
+    and constant can never fire, and are left out.
+
     Parameters
     ----------
     propensities : callable of form propensities(state)
         State is array of length (N+1) of time and count per compartment
         (for N compartments)
-        Will return an NxN array as a transition matrix for propensities
+        Will return an NxN array as a transition matrix for propensities, or
+        an array of shape (M,) of reaction rates if ``reactions`` is given
     t_span : 2-list of floats
         Internal of integration (t_start, t_end). The solver starts at t_start
         and will finish once the first random time_step exceeds t_end
@@ -39,6 +78,24 @@ def solve_gillespie(propensities: typing.Callable[[np.ndarray], np.ndarray],
         Default value is 0.01, so (t_span[1] - t_span[0])/100
         Note that the exact time_steps are sampled from an exponential
         distribution, and so may be smaller than this
+    reactions : array_like, shape (M, 2), optional
+        List of (loss, gain) compartment indices, one row per reaction. When
+        a reaction fires, one individual moves from compartment ``loss`` to
+        compartment ``gain``. The list is processed once, before the first
+        event is simulated
+    rng : numpy.random.Generator, optional
+        Source of the random numbers. Defaults to the global ``numpy.random``
+        state. Passing independent generators allows replicates to be run
+        reproducibly in separate processes
+    method : str (default value 'direct')
+        Event selection method, one of 'direct', 'next_reaction' or
+        'composition_rejection'
+    dependencies : array_like of bool, shape (M, N), optional
+        Entry (j, i) is True if the rate of reaction j depends on the count
+        in compartment i, where reactions are the entries of the propensity
+        matrix in row-major order if ``reactions`` is not given. Only used
+        by, and required for, the 'next_reaction' and
+        'composition_rejection' methods
 
     Yields
     -------
@@ -47,6 +104,81 @@ def solve_gillespie(propensities: typing.Callable[[np.ndarray], np.ndarray],
         after the end of the time_span given
 
     """
+    _check_inputs(initial_cond, t_span)
+
+    if method not in ('direct', 'next_reaction', 'composition_rejection'):
+        raise ValueError(
+            f'Unknown method {method}, expected one of direct, '
+            'next_reaction or composition_rejection')
+
+    if rng is None:
+        rng = np.random
+    n_compartments = len(initial_cond)
+    if reactions is not None:
+        losses, gains = _reaction_indices(reactions, n_compartments)
+
+    state = np.zeros(n_compartments + 1)
+    state[0] = t_span[0]
+    state[1:] = initial_cond
+
+    if method != 'direct':
+        if dependencies is None:
+            raise ValueError(
+                f'The {method} method requires the dependencies of the '
+                'reaction rates on the compartments')
+        if reactions is None:
+            # The entries of the propensity matrix are the reactions, except
+            # those which are zero and do not depend on any compartment
+            dependencies = _check_dependencies(
+                dependencies, n_compartments ** 2, n_compartments)
+            index = np.flatnonzero(
+                (np.ravel(propensities(state)) != 0)
+                | np.any(dependencies, axis=1))
+            losses, gains = _reaction_indices(
+                np.stack(np.divmod(index, n_compartments), axis=1),
+                n_compartments)
+            dependencies = dependencies[index]
+            rate_function = lambda x: np.ravel(propensities(x))[index]  # noqa
+        else:
+            dependencies = _check_dependencies(
+                dependencies, len(losses), n_compartments)
+            rate_function = propensities
+        graph = _dependency_graph(losses, gains, dependencies)
+        solver = _next_reaction if method == 'next_reaction' \
+            else _composition_rejection
+
+        yield from solver(rate_function, state, t_span, max_t_step, losses,
+                          gains, graph, rng)
+        return
+
+    while state[0] < t_span[1]:
+        propensity_values = propensities(state)
+        if np.any(propensity_values < 0):
+            raise ValueError('Propensity function should not \
+                              return neagtive values')
+        cumulative_rates = np.cumsum(propensity_values, axis=None)
+        total_rate = cumulative_rates[-1]
+        if total_rate == 0:
+            total_rate = 1 / ((t_span[1] - t_span[0]) * max_t_step)
+        time_step = np.log(1 / rng.random()) / total_rate
+        state[0] += time_step
+
+        index = _select_reaction(cumulative_rates, rng.random())
+        if index is not None:
+            if reactions is not None:
+                loss, gain = losses[index], gains[index]
+            else:
+                loss, gain = divmod(index, n_compartments)
+                loss, gain = loss + 1, gain + 1  # +1 to skip past time index
+            state[loss] -= 1
+            state[gain] += 1
+
+        yield state
+
+
+def _check_inputs(initial_cond: np.ndarray, t_span: typing.List[float]):
+    """Checks the initial conditions and time span of a stochastic
+    simulation are valid."""
     if len(t_span) != 2:
         raise ValueError("`t_span must be 2-dimensional - form [start, end]")
     try:
@@ -62,30 +194,351 @@ def solve_gillespie(propensities: typing.Callable[[np.ndarray], np.ndarray],
     if np.any(np.array(initial_cond) < 0):
         raise ValueError("Cannot have negative elements in initial_cond")
 
-    state = np.zeros(len(initial_cond) + 1)
-    state[0] = t_span[0]
-    state[1:] = initial_cond
+
+def _reaction_indices(reactions, n_compartments: int):
+    """Returns the state indices of the loss and gain compartments of each
+    reaction, checking the reaction list is well-formed.
+
+    The indices are shifted by one to skip past the time entry of the state.
+    """
+    reactions = np.asarray(reactions)
+    if reactions.ndim != 2 or reactions.shape[1] != 2:
+        raise ValueError(
+            'Reactions must be given as an array of (loss, gain) pairs')
+    if not np.issubdtype(reactions.dtype, np.integer):
+        raise TypeError('Reaction compartment indices must be integers')
+    if np.any(reactions < 0) or np.any(reactions >= n_compartments):
+        raise ValueError(
+            'Reaction compartment indices must lie between 0 and '
+            f'{n_compartments - 1}')
+
+    return reactions[:, 0] + 1, reactions[:, 1] + 1
+
+
+def _check_dependencies(dependencies: np.ndarray, n_reactions: int,
+                        n_compartments: int) -> np.ndarray:
+    """Returns the dependencies of the reaction rates on the compartments
+    as a boolean array, checking it has one row per reaction."""
+    dependencies = np.asarray(dependencies, dtype=bool)
+    if dependencies.shape != (n_reactions, n_compartments):
+        raise ValueError(
+            'Dependencies must be of shape (n_reactions, n_compartments)')
+    return dependencies
+
+
+def _dependency_graph(losses: np.ndarray, gains: np.ndarray,
+                      dependencies: np.ndarray):
+    """Returns, for each reaction, the array of reactions whose rates may
+    change when it fires (always including the reaction itself)."""
+    graph = []
+    for reaction, (loss, gain) in enumerate(zip(losses, gains)):
+        changed = [] if loss == gain else [loss - 1, gain - 1]
+        affected = np.any(dependencies[:, changed], axis=1)
+        affected[reaction] = True
+        graph.append(np.flatnonzero(affected))
+    return graph
+
+
+def _checked_rate(rate: float) -> float:
+    """Returns the rate as a float, checking it is not negative"""
+    if rate < 0:
+        raise ValueError('Propensity function should not \
+                          return neagtive values')
+    return float(rate)
+
+
+def _next_reaction(rate_function, state, t_span, max_t_step, losses, gains,
+                   graph, rng):
+    """Simulates the reactions with the next reaction method of Gibson and
+    Bruck, yielding the state after every event."""
+    idle_rate = 1 / ((t_span[1] - t_span[0]) * max_t_step)
+    rates = [_checked_rate(rate) for rate in rate_function(state)]
+    queue = _IndexedPriorityQueue(
+        [_putative_time(state[0], rate, rng) for rate in rates])
 
     while state[0] < t_span[1]:
-        propensity_values = propensities(state)
-        if np.any(propensity_values < 0):
-            raise ValueError('Propensity function should not \
-                              return neagtive values')
-        total_rate = np.sum(propensity_values)
-        if total_rate == 0:
-            total_rate = 1 / ((t_span[1] - t_span[0]) * max_t_step)
-        time_step = np.log(1 / np.random.rand()) / total_rate
-        state[0] += time_step
+        reaction, time = queue.top()
+        if time == np.inf:
+            # No reaction can fire, so wait in case the rates change
+            state[0] += np.log(1 / rng.random()) / idle_rate
+            rates = [_checked_rate(rate) for rate in rate_function(state)]
+            queue = _IndexedPriorityQueue(
+                [_putative_time(state[0], rate, rng) for rate in rates])
+            yield state
+            continue
+
+        state[0] = time
+        state[losses[reaction]] -= 1
+        state[gains[reaction]] += 1
 
-        normal_prop = propensity_values / total_rate
-        running_tot = 0
-        random_proc = np.random.rand()
-        for index, value in np.ndenumerate(normal_prop):
-            running_tot += value
-            if value != 0 and running_tot > random_proc:
-                loss, gain = index
-                state[loss + 1] -= 1  # +1 to skip past time index
-                state[gain + 1] += 1
+        new_rates = rate_function(state)
+        for affected in graph[reaction]:
+            old_rate = rates[affected]
+            new_rate = _checked_rate(new_rates[affected])
+            if affected == reaction or old_rate == 0:
+                new_time = _putative_time(time, new_rate, rng)
+            elif new_rate > 0:
+                # Rescale the remaining waiting time to the new rate
+                new_time = time + (queue.time(affected) - time) * (
+                    old_rate / new_rate)
+            else:
+                new_time = np.inf
+            rates[affected] = new_rate
+            queue.update(affected, new_time)
+
+        yield state
+
+
+def _putative_time(time: float, rate: float, rng) -> float:
+    """Returns a random firing time of a reaction with the given rate"""
+    if rate == 0:
+        return np.inf
+    return time + np.log(1 / rng.random()) / rate
+
+
+class _IndexedPriorityQueue(object):
+    """Binary min-heap of the putative firing times of the reactions, which
+    tracks the position of each reaction in the heap so that its time can be
+    updated in logarithmic time."""
+    def __init__(self, times: typing.List[float]):
+        self._times = list(times)
+        # A sorted list is a valid heap
+        self._heap = sorted(range(len(times)), key=self._times.__getitem__)
+        self._position = [0] * len(times)
+        for position, reaction in enumerate(self._heap):
+            self._position[reaction] = position
+
+    def top(self) -> typing.Tuple[int, float]:
+        """Returns the reaction with the earliest time, and its time"""
+        if not self._heap:
+            return None, np.inf
+        reaction = self._heap[0]
+        return reaction, self._times[reaction]
+
+    def time(self, reaction: int) -> float:
+        """Returns the time of a reaction"""
+        return self._times[reaction]
+
+    def update(self, reaction: int, time: float):
+        """Sets the time of a reaction and restores the heap order"""
+        old_time = self._times[reaction]
+        self._times[reaction] = time
+        if time < old_time:
+            self._sift_up(self._position[reaction])
+        elif time > old_time:
+            self._sift_down(self._position[reaction])
+
+    def _swap(self, i: int, j: int):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._position[heap[i]] = i
+        self._position[heap[j]] = j
+
+    def _sift_up(self, position: int):
+        times, heap = self._times, self._heap
+        while position > 0:
+            parent = (position - 1) // 2
+            if times[heap[parent]] <= times[heap[position]]:
+                break
+            self._swap(parent, position)
+            position = parent
+
+    def _sift_down(self, position: int):
+        times, heap = self._times, self._heap
+        size = len(heap)
+        while True:
+            smallest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and \
+                        times[heap[child]] < times[heap[smallest]]:
+                    smallest = child
+            if smallest == position:
                 break
+            self._swap(smallest, position)
+            position = smallest
+
+
+def _composition_rejection(rate_function, state, t_span, max_t_step,
+                           losses, gains, graph, rng):
+    """Simulates the reactions with the composition-rejection method of
+    Slepoy, Thompson and Plimpton, yielding the state after every event."""
+    idle_rate = 1 / ((t_span[1] - t_span[0]) * max_t_step)
+    selector = _CompositionRejectionSelector(
+        [_checked_rate(rate) for rate in rate_function(state)])
+
+    while state[0] < t_span[1]:
+        total_rate = selector.total()
+        if total_rate == 0:
+            # No reaction can fire, so wait in case the rates change
+            state[0] += np.log(1 / rng.random()) / idle_rate
+            new_rates = rate_function(state)
+            for reaction in range(len(new_rates)):
+                selector.update(reaction, _checked_rate(new_rates[reaction]))
+            yield state
+            continue
+
+        state[0] += np.log(1 / rng.random()) / total_rate
+        reaction = selector.select(rng)
+        state[losses[reaction]] -= 1
+        state[gains[reaction]] += 1
+
+        new_rates = rate_function(state)
+        for affected in graph[reaction]:
+            selector.update(affected, _checked_rate(new_rates[affected]))
 
         yield state
+
+
+class _CompositionRejectionSelector(object):
+    """Groups reactions by the binary exponent of their rates, so that a
+    reaction can be selected with probability proportional to its rate by
+    choosing a group and then rejection sampling within it.
+
+    All rates in a group lie within a factor of two of each other, so each
+    rejection step accepts with probability at least one half."""
+    def __init__(self, rates: typing.List[float]):
+        self._rates = [0.0] * len(rates)
+        self._group = [None] * len(rates)
+        self._position = [0] * len(rates)
+        self._members = {}
+        self._sums = {}
+        for reaction, rate in enumerate(rates):
+            self.update(reaction, rate)
+
+    def total(self) -> float:
+        """Returns the sum of all rates"""
+        return sum(self._sums.values())
+
+    def update(self, reaction: int, rate: float):
+        """Sets the rate of a reaction, moving it to the right group"""
+        group = self._group[reaction]
+        if group is not None:
+            # Remove the reaction, filling its place with the last member
+            members = self._members[group]
+            last = members.pop()
+            if last != reaction:
+                members[self._position[reaction]] = last
+                self._position[last] = self._position[reaction]
+            if members:
+                self._sums[group] -= self._rates[reaction]
+            else:
+                del self._members[group], self._sums[group]
+
+        self._rates[reaction] = rate
+        group = math.frexp(rate)[1] if rate > 0 else None
+        self._group[reaction] = group
+        if group is not None:
+            members = self._members.setdefault(group, [])
+            self._position[reaction] = len(members)
+            members.append(reaction)
+            self._sums[group] = self._sums.get(group, 0.0) + rate
+
+    def select(self, rng) -> int:
+        """Returns a random reaction, with probability proportional to its
+        rate"""
+        threshold = rng.random() * self.total()
+        for group, group_sum in self._sums.items():
+            threshold -= group_sum
+            if threshold < 0:
+                break
+
+        members = self._members[group]
+        upper = math.ldexp(1.0, group)
+        while True:
+            reaction = members[int(rng.random() * len(members))]
+            if rng.random() * upper < self._rates[reaction]:
+                return reaction
+
+
+def _select_reaction(cumulative_rates: np.ndarray,
+                     random_number: float) -> typing.Optional[int]:
+    """Returns the index of the reaction to fire, given the cumulative sum
+    of the (flattened) reaction rates and a uniform random number in [0, 1).
+
+    Returns None if no reaction can fire (all rates are zero).
+    """
+    total_rate = cumulative_rates[-1]
+    if total_rate == 0:
+        return None
+    # The first reaction whose cumulative rate exceeds the random threshold
+    # fires; zero rates never increase the cumulative sum, so they are skipped
+    index = int(np.searchsorted(
+        cumulative_rates, random_number * total_rate, side='right'))
+    if index == len(cumulative_rates):
+        # Rounding error pushed the threshold past the total rate
+        return None
+    return index
+
+
+def _solve_gillespie_ensemble(
+        propensities: typing.Callable[[np.ndarray], np.ndarray],
+        initial_cond: np.ndarray, times: np.ndarray, n_runs: int,
+        reactions: np.ndarray, rng: np.random.Generator,
+        max_t_step: float = 0.01) -> np.ndarray:
+    """Simulates ``n_runs`` independent replicates of the Gillespie
+    algorithm in lock-step, and returns the counts in each compartment at
+    each of the requested ``times`` as an array of shape
+    (n_runs, n_times, N).
+
+    All replicates are held in one (n_runs, N+1) array of the form
+    [Time, Compartment_1, ...], so ``propensities`` is called once per
+    iteration with the states of all unfinished replicates and must return
+    an array of shape (n_active, M) of reaction rates. Each iteration fires
+    one event in every unfinished replicate.
+
+    The state recorded at a time point is the state the replicate was in at
+    that time, i.e. before the first event occurring after it.
+    """
+    times = np.asarray(times, dtype=float)
+    t_span = [times[0], times[-1]]
+    _check_inputs(initial_cond, t_span)
+    if np.any(np.diff(times) < 0):
+        raise ValueError('Times must be increasing')
+
+    n_compartments = len(initial_cond)
+    losses, gains = _reaction_indices(reactions, n_compartments)
+    idle_rate = 1 / ((t_span[1] - t_span[0]) * max_t_step)
+
+    states = np.empty((n_runs, n_compartments + 1))
+    states[:, 0] = t_span[0]
+    states[:, 1:] = initial_cond
+    output = np.empty((n_runs, len(times), n_compartments))
+
+    # Index of the next time point to be recorded for each replicate
+    next_index = np.zeros(n_runs, dtype=int)
+    active = np.arange(n_runs)
+
+    while len(active) > 0:
+        current = states[active]
+        rates = propensities(current)
+        if np.any(rates < 0):
+            raise ValueError('Propensity function should not \
+                              return neagtive values')
+        cumulative_rates = np.cumsum(rates, axis=1)
+        total_rate = cumulative_rates[:, -1]
+        new_time = current[:, 0] + np.log(
+            1 / rng.random(len(active))) / np.where(
+                total_rate > 0, total_rate, idle_rate)
+
+        # Record the current state at every time point before the event
+        new_index = np.searchsorted(times, new_time, side='left')
+        counts = new_index - next_index[active]
+        rows = np.repeat(np.arange(len(active)), counts)
+        offsets = np.arange(len(rows)) - np.repeat(
+            np.cumsum(counts) - counts, counts)
+        output[active[rows], next_index[active[rows]] + offsets] = \
+            current[rows, 1:]
+        next_index[active] = new_index
+
+        # Select one reaction per replicate; zero rates never fire
+        threshold = rng.random(len(active)) * total_rate
+        index = np.sum(cumulative_rates <= threshold[:, np.newaxis], axis=1)
+        fires = (total_rate > 0) & (index < rates.shape[1])
+        firing = active[fires]
+        states[firing, losses[index[fires]]] -= 1
+        states[firing, gains[index[fires]]] += 1
+        states[active, 0] = new_time
+
+        active = active[new_index < len(times)]
+
+    return output
@@ -0,0 +1,166 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+import seirmo as se
+from ._gillespie import solve_gillespie
+from ._models import _solver_kwargs
+
+
+class HybridSEIRModel(se.SEIRForwardModel):
+    r"""
+    Hybrid model: stochastic and deterministic SEIR
+    The SEIR Model has four compartments:
+    susceptible individuals (:math:`S`),
+    exposed but not yet infectious (:math:`E`),
+    infectious (:math:`I`) and recovered (:math:`R`).
+
+    While the number of infected individuals :math:`E + I` is below
+    ``threshold``, the model is simulated exactly with the Gillespie
+    algorithm, using the reactions of :class:`StochasticSEIRModel`. Once it
+    reaches ``threshold``, the stochastic fluctuations are small relative to
+    the counts and the model switches to integrating the ODEs of
+    :class:`DeterministicSEIRModel`, which is much cheaper. If the number of
+    infected individuals falls back below half the threshold, e.g. at the
+    end of an outbreak, the state is rounded to whole individuals (keeping
+    the total population) and the exact simulation resumes.
+
+    The parameters are the initial values of the compartments and the rates
+    :math:`\beta`, :math:`\kappa` and :math:`\gamma`.
+
+    Extends :class:`SEIRForwardModel`.
+
+    :param threshold: Number of infected individuals above which the ODEs
+        are integrated.
+    :type threshold: float
+    """
+    def __init__(self, threshold: float = 100):
+        super(HybridSEIRModel, self).__init__()
+
+        if threshold < 0:
+            raise ValueError('The threshold cannot be negative.')
+        self._threshold = threshold
+
+        params_names = ['S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma']
+        self._stochastic_model = se.StochasticSEIRModel(params_names)
+        self._deterministic_model = se.DeterministicSEIRModel()
+        self._parameters = self._stochastic_model._parameters
+        self._output_collector = se.StochasticOutputCollector(
+            ['S', 'E', 'I', 'R'])
+
+    def set_solver_options(self, method=None, rtol=None, atol=None,
+                           max_step=None):
+        """
+        Sets the method and tolerances of the ODE solver, which integrates
+        the model above the threshold. Options which are ``None`` are left
+        unchanged. See :meth:`SEIRModel.set_solver_options` for a
+        description of the methods and options. The ``'RK4'`` method cannot
+        stop at the threshold, and is replaced by ``'RK45'``.
+
+        :param method: Integration method of
+            :func:`scipy.integrate.solve_ivp`, or ``'RK4'``.
+        :type method: str
+        :param rtol: Relative tolerance of the solver.
+        :type rtol: float
+        :param atol: Absolute tolerance of the solver.
+        :type atol: float
+        :param max_step: Maximum step of the solver.
+        :type max_step: float
+        """
+        self._deterministic_model.set_solver_options(
+            method, rtol, atol, max_step)
+
+    def solver_options(self):
+        """Returns the method and tolerances of the ODE solver"""
+        return self._deterministic_model.solver_options()
+
+    def threshold(self):
+        """Returns the number of infected individuals above which the ODEs
+        are integrated"""
+        return self._threshold
+
+    def simulate(self, parameters: np.ndarray, times: list,
+                 rng: np.random.Generator = None):
+        """
+        Forward simulation of the model for the given time points.
+
+        Returns a NumPy array of shape ``(n_times, n_outputs)``. Counts are
+        whole numbers while the model is simulated stochastically, and real
+        numbers while the ODEs are integrated.
+
+        :param parameters: An array of length 7 with the initial values of
+            the compartments and the values of beta, kappa and gamma.
+        :type parameters: numpy.ndarray
+        :param times: An array-like object with increasing time points.
+        :type times: list | numpy.ndarray
+        :param rng: Source of the random numbers, defaults to the global
+            ``numpy.random`` state.
+        :type rng: numpy.random.Generator
+        """
+        self._parameters.configure_parameters(parameters)
+        reaction_rates = self._stochastic_model.compile_reaction_rates()
+        constants = self._parameters[4:]
+        times = np.asarray(times, dtype=float)
+
+        self._output_collector.begin(times)
+        time, state = times[0], np.array(self._parameters[:4], dtype=float)
+        self._output_collector.report(np.append(time, state))
+
+        while time < times[-1]:
+            if state[1] + state[2] < self._threshold:
+                # Few infected individuals, simulate exactly
+                for point in solve_gillespie(
+                        reaction_rates, state, [time, times[-1]],
+                        reactions=self._stochastic_model.reactions,
+                        rng=rng):
+                    self._output_collector.report(point)
+                    if point[2] + point[3] >= self._threshold:
+                        break
+                time, state = point[0], point[1:].copy()
+                if time >= times[-1]:
+                    break
+
+            # Many infected individuals, integrate the ODEs until they drop
+            # below half the threshold
+            def few_infected(t, y, c):
+                return y[1] + y[2] - self._threshold / 2
+            few_infected.terminal = True
+            few_infected.direction = -1
+
+            sol = solve_ivp(
+                self._deterministic_model._right_hand_side,
+                [time, times[-1]], state, t_eval=times[times >= time],
+                events=few_infected, args=(constants,),
+                **_solver_kwargs(
+                    self._deterministic_model._solver_options,
+                    self._deterministic_model._jacobian))
+            if sol.status == -1:
+                raise RuntimeError(sol.message)
+            for point in np.vstack((sol.t, sol.y)).transpose():
+                self._output_collector.report(point)
+
+            if sol.status == 1:
+                time = sol.t_events[0][0]
+                state = _round_population(sol.y_events[0][0])
+                self._output_collector.report(np.append(time, state))
+            else:
+                time = times[-1]
+                self._output_collector.report(np.append(np.inf, sol.y[:, -1]))
+
+        return self._output_collector.retrieve()
+
+
+def _round_population(counts: np.ndarray) -> np.ndarray:
+    """Rounds the counts in each compartment to whole numbers, keeping the
+    total population, by rounding up the counts with the largest
+    fractional parts."""
+    counts = np.maximum(counts, 0)
+    rounded = np.floor(counts)
+    remainder = int(round(np.sum(counts) - np.sum(rounded)))
+    rounded[np.argsort(rounded - counts)[:remainder]] += 1
+    return rounded
@@ -0,0 +1,343 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import csv
+import os
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class IncidenceStream(object):
+    """IncidenceStream Class:
+    A ring buffer of the most recent incidence numbers of a continuously
+    growing surveillance feed.
+
+    New rows are appended with :meth:`append`, e.g. by an
+    :class:`IncidenceSource` which follows a file or a queue. When the
+    buffer is full, the oldest rows are dropped. Every append notifies the
+    subscribed callbacks with only the new rows, so that fits and plots can
+    be updated without reloading the full history.
+
+    The stream is thread-safe, so it can be filled by a source running in a
+    background thread while it is read from another.
+
+    :param capacity: Largest number of rows held by the stream.
+    :type capacity: int
+    """
+    def __init__(self, capacity):
+        if int(capacity) != capacity or capacity < 1:
+            raise ValueError('The capacity must be a positive integer.')
+
+        self._capacity = int(capacity)
+        self._times = np.empty(self._capacity)
+        self._incidences = np.empty(self._capacity)
+        self._start = 0
+        self._size = 0
+        self._n_received = 0
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def capacity(self):
+        """
+        Returns the largest number of rows held by the stream.
+        """
+        return self._capacity
+
+    def n_rows(self):
+        """
+        Returns the number of rows currently held by the stream.
+        """
+        return self._size
+
+    def n_received(self):
+        """
+        Returns the number of rows appended to the stream since it was
+        created, including those dropped from the buffer.
+        """
+        return self._n_received
+
+    def subscribe(self, callback):
+        """
+        Registers a callback which is called with a :class:`pandas.DataFrame`
+        of the new rows, with columns `Time` and `Incidence Number`, after
+        each append.
+
+        Callbacks are called in the thread which appends the rows.
+
+        :param callback: Callable taking the data frame of new rows.
+        """
+        if not callable(callback):
+            raise TypeError('The callback has to be callable.')
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        Removes a callback registered with :meth:`subscribe`.
+        """
+        with self._lock:
+            self._callbacks.remove(callback)
+
+    def append(self, times, incidences):
+        """
+        Appends rows of time points and incidence numbers to the stream, and
+        notifies the subscribed callbacks.
+
+        :param times: An array-like object with the time points of the rows.
+        :type times: list | numpy.ndarray
+        :param incidences: An array-like object with the incidence numbers of
+            the rows.
+        :type incidences: list | numpy.ndarray
+        """
+        times = np.asarray(times, dtype=float).reshape(-1)
+        incidences = np.asarray(incidences, dtype=float).reshape(-1)
+        if len(times) != len(incidences):
+            raise ValueError(
+                'The times and incidences must be of the same length.')
+        if len(times) == 0:
+            return
+
+        with self._lock:
+            # Only the last rows fit into the buffer
+            kept = slice(max(0, len(times) - self._capacity), None)
+            n_kept = len(times[kept])
+            positions = (self._start + self._size + np.arange(n_kept)) \
+                % self._capacity
+            self._times[positions] = times[kept]
+            self._incidences[positions] = incidences[kept]
+
+            n_dropped = max(0, self._size + n_kept - self._capacity)
+            self._start = (self._start + n_dropped) % self._capacity
+            self._size = min(self._capacity, self._size + n_kept)
+            self._n_received += len(times)
+            callbacks = list(self._callbacks)
+
+        new_rows = _to_dataframe(times, incidences)
+        for callback in callbacks:
+            callback(new_rows)
+
+    def data(self):
+        """
+        Returns the rows held by the stream, from oldest to newest, as a
+        :class:`pandas.DataFrame` with columns `Time` and `Incidence Number`,
+        as accepted by the apps and plots.
+        """
+        with self._lock:
+            positions = (self._start + np.arange(self._size)) % self._capacity
+            return _to_dataframe(
+                self._times[positions], self._incidences[positions])
+
+
+class IncidenceSource(object):
+    """IncidenceSource Class:
+    Base class for sources of incidence data, which append the rows they
+    receive to an :class:`IncidenceStream`.
+
+    The source can be polled for new rows with :meth:`poll`, or poll itself
+    in a background thread between :meth:`start` and :meth:`stop`.
+
+    :param stream: The stream to append the rows to.
+    :type stream: IncidenceStream
+    """
+    def __init__(self, stream):
+        if not isinstance(stream, IncidenceStream):
+            raise TypeError(
+                'The stream has to be an instance of seirmo.IncidenceStream.')
+        self._stream = stream
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def stream(self):
+        """
+        Returns the stream the rows are appended to.
+        """
+        return self._stream
+
+    def poll(self):
+        """
+        Appends the rows received since the last poll to the stream, and
+        returns their number.
+        """
+        raise NotImplementedError
+
+    def start(self, interval=1):
+        """
+        Polls the source every ``interval`` seconds in a background thread,
+        until :meth:`stop` is called.
+
+        :param interval: Time between polls in seconds.
+        :type interval: float
+        """
+        if self._thread is not None:
+            raise ValueError('The source is already running.')
+        if interval <= 0:
+            raise ValueError('The interval must be positive.')
+
+        def follow():
+            self.poll()
+            while not self._stop_event.wait(interval):
+                self.poll()
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=follow, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops polling the source in the background thread.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+
+class FileIncidenceSource(IncidenceSource):
+    """FileIncidenceSource Class:
+    A source which follows a CSV file that is appended to, like
+    ``tail -f``, and appends its new rows to an :class:`IncidenceStream`.
+
+    Each poll only reads the complete lines written since the last poll. If
+    the file is truncated or replaced, it is read again from the start.
+
+    Extends :class:`IncidenceSource`.
+
+    :param stream: The stream to append the rows to.
+    :type stream: IncidenceStream
+    :param filepath: Path to the CSV file, with a header row of column names.
+    :type filepath: str
+    :param time_key: Name of the column of time points.
+    :type time_key: str
+    :param inc_key: Name of the column of incidence numbers.
+    :type inc_key: str
+    :param from_start: Whether the rows already in the file are appended on
+        the first poll, or only those added afterwards.
+    :type from_start: bool
+    """
+    def __init__(self, stream, filepath, time_key='Time',
+                 inc_key='Incidence Number', from_start=True):
+        super(FileIncidenceSource, self).__init__(stream)
+        self._filepath = filepath
+        self._keys = (time_key, inc_key)
+        self._columns = None
+        self._offset = 0
+        self._inode = None
+
+        if not from_start:
+            # Skip to the end of the last complete line
+            with open(filepath, 'rb') as f:
+                self._inode = os.fstat(f.fileno()).st_ino
+                self._read_header(f)
+                if self._columns is not None:
+                    self._offset += f.read().rfind(b'\n') + 1
+
+    def _read_header(self, f):
+        # Reads the header line from the start of the file, and finds the
+        # columns of the times and incidences
+        f.seek(0)
+        line = f.readline()
+        if not line.endswith(b'\n'):
+            # The header has not been written completely yet
+            self._offset = 0
+            return
+        header = next(csv.reader([line.decode()]))
+        for key in self._keys:
+            if key not in header:
+                raise ValueError(
+                    'The file {} has no column {}.'.format(
+                        self._filepath, key))
+        self._columns = [header.index(key) for key in self._keys]
+        self._offset = len(line)
+
+    def poll(self):
+        """
+        Appends the rows written to the file since the last poll to the
+        stream, and returns their number.
+        """
+        with open(self._filepath, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                # The file is new, truncated or replaced
+                self._inode = stat.st_ino
+                self._columns = None
+                self._offset = 0
+            if self._columns is None:
+                self._read_header(f)
+                if self._columns is None:
+                    return 0
+            f.seek(self._offset)
+            chunk = f.read()
+
+        # Leave an incomplete last line for the next poll
+        end = chunk.rfind(b'\n') + 1
+        self._offset += end
+        rows = [row for row in csv.reader(chunk[:end].decode().splitlines())
+                if row]
+        if not rows:
+            return 0
+
+        time_column, inc_column = self._columns
+        self._stream.append(
+            [_to_float(row[time_column]) for row in rows],
+            [_to_float(row[inc_column]) for row in rows])
+        return len(rows)
+
+
+class QueueIncidenceSource(IncidenceSource):
+    """QueueIncidenceSource Class:
+    A source which takes rows from a :class:`queue.Queue`, e.g. filled by
+    another thread of the application, and appends them to an
+    :class:`IncidenceStream`.
+
+    Each item of the queue is a pair ``(time, incidence)``.
+
+    Extends :class:`IncidenceSource`.
+
+    :param stream: The stream to append the rows to.
+    :type stream: IncidenceStream
+    :param rows: The queue of rows.
+    :type rows: queue.Queue
+    """
+    def __init__(self, stream, rows):
+        super(QueueIncidenceSource, self).__init__(stream)
+        self._queue = rows
+
+    def poll(self):
+        """
+        Appends the rows in the queue to the stream, and returns their
+        number.
+        """
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not rows:
+            return 0
+
+        rows = np.asarray(rows, dtype=float).reshape(-1, 2)
+        self._stream.append(rows[:, 0], rows[:, 1])
+        return len(rows)
+
+
+def _to_dataframe(times, incidences):
+    """Returns the rows as a data frame with the column names used by the
+    apps and plots."""
+    return pd.DataFrame({'Time': times, 'Incidence Number': incidences})
+
+
+def _to_float(value):
+    """Converts a field of a CSV file to a float, with missing values as
+    NaN."""
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
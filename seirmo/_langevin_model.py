@@ -0,0 +1,151 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import numpy as np
+
+import seirmo as se
+
+
+class LangevinSEIRModel(se.SEIRForwardModel):
+    r"""
+    SDE model: chemical Langevin approximation of the stochastic SEIR model
+    The SEIR Model has four compartments:
+    susceptible individuals (:math:`S`),
+    exposed but not yet infectious (:math:`E`),
+    infectious (:math:`I`) and recovered (:math:`R`), with the reactions of
+    :class:`StochasticSEIRModel`:
+
+    Exposure: S -> E, at rate :math:`a_1 = \beta S(t)I(t)`
+    Infection: E -> I, at rate :math:`a_2 = \kappa E(t)`
+    Recovery: I -> R, at rate :math:`a_3 = \gamma I(t)`
+
+    In a time step :math:`h`, each reaction :math:`j` fires
+    :math:`a_j h + \sqrt{a_j h} Z_j` times, with :math:`Z_j` a standard
+    normal random variable, i.e. the model is integrated with the
+    Euler-Maruyama method. The number of firings is truncated to lie between
+    zero and the size of the compartment the reaction draws from, so the
+    compartments stay non-negative and the population is conserved.
+
+    The cost of a step does not depend on the population size, so noisy
+    trajectories can be generated for populations far too large for
+    :func:`solve_gillespie`.
+
+    Extends :class:`SEIRForwardModel`.
+
+    :param time_step: Maximum time step of the integrator. Each interval
+        between requested time points is split into equal steps no longer
+        than this.
+    :type time_step: float
+    """
+    def __init__(self, time_step: float = 0.1):
+        super(LangevinSEIRModel, self).__init__()
+
+        if time_step <= 0:
+            raise ValueError('The time step must be positive.')
+        self._time_step = time_step
+
+        self._parameters = se.SEIRParameters(
+            ['S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'])
+        self._output_collector = se.SEIROutputCollector(
+            ['S', 'E', 'I', 'R'])
+
+        # Net change of each compartment when each reaction fires once
+        reactions = se.StochasticSEIRModel.reactions
+        self._losses = reactions[:, 0]
+        self._stoichiometry = np.zeros((len(reactions), 4))
+        self._stoichiometry[np.arange(len(reactions)), reactions[:, 0]] = -1
+        self._stoichiometry[np.arange(len(reactions)), reactions[:, 1]] = 1
+
+    def time_step(self):
+        """Returns the maximum time step of the integrator"""
+        return self._time_step
+
+    def _reaction_rates(self, states: np.ndarray) -> np.ndarray:
+        # Assuming states of shape (n_runs, 4), with columns S, E, I, R
+        beta, kappa, gamma = self._parameters[4:]
+        return np.column_stack((
+            beta * states[:, 0] * states[:, 2],
+            kappa * states[:, 1],
+            gamma * states[:, 2]))
+
+    def _integrate(self, n_runs: int, times: np.ndarray, rng) -> np.ndarray:
+        """Integrates ``n_runs`` replicates of the SDEs and returns their
+        states at each time point, as an array of shape (n_runs, n_times, 4).
+        """
+        times = np.asarray(times, dtype=float)
+        if np.any(np.diff(times) < 0):
+            raise ValueError('Times must be increasing')
+
+        states = np.tile(np.asarray(self._parameters[:4], dtype=float),
+                         (n_runs, 1))
+        if np.any(states < 0):
+            raise ValueError('Cannot have negative initial compartments')
+
+        output = np.empty((n_runs, len(times), 4))
+        output[:, 0] = states
+        for index in range(1, len(times)):
+            interval = times[index] - times[index - 1]
+            n_steps = max(1, int(np.ceil(interval / self._time_step)))
+            step = interval / n_steps
+            for _ in range(n_steps):
+                mean_firings = self._reaction_rates(states) * step
+                firings = mean_firings + np.sqrt(mean_firings) * \
+                    rng.standard_normal(mean_firings.shape)
+                firings = np.clip(firings, 0, states[:, self._losses])
+                states += firings @ self._stoichiometry
+            output[:, index] = states
+
+        return output
+
+    def simulate(self, parameters: np.ndarray, times: list,
+                 rng: np.random.Generator = None):
+        """
+        Forward simulation of a single trajectory of the model.
+
+        Returns a NumPy array of shape ``(n_times, n_outputs)``.
+
+        :param parameters: An array of length 7 with the initial values of
+            the compartments and the values of beta, kappa and gamma.
+        :type parameters: numpy.ndarray
+        :param times: An array-like object with increasing time points.
+        :type times: list | numpy.ndarray
+        :param rng: Source of the random numbers, defaults to the global
+            ``numpy.random`` state.
+        :type rng: numpy.random.Generator
+        """
+        self._parameters.configure_parameters(parameters)
+        if rng is None:
+            rng = np.random
+
+        self._output_collector.report_all(self._integrate(1, times, rng)[0])
+        return self._output_collector.retrieve()
+
+    def simulate_ensemble(self, parameters: np.ndarray, times: list,
+                          n_runs: int, seed=None):
+        """
+        Forward simulation of ``n_runs`` independent trajectories of the
+        model, integrated together as one NumPy array.
+
+        Returns a NumPy array of shape ``(n_runs, n_times, n_outputs)``.
+
+        :param parameters: An array of length 7 with the initial values of
+            the compartments and the values of beta, kappa and gamma.
+        :type parameters: numpy.ndarray
+        :param times: An array-like object with increasing time points.
+        :type times: list | numpy.ndarray
+        :param n_runs: Number of trajectories to simulate.
+        :type n_runs: int
+        :param seed: Seed of the random number generator, passed to
+            :func:`numpy.random.default_rng`.
+        :type seed: int | numpy.random.SeedSequence | numpy.random.Generator
+        """
+        if int(n_runs) != n_runs or n_runs < 1:
+            raise ValueError('The number of runs must be a positive integer')
+        self._parameters.configure_parameters(parameters)
+
+        self._output_collector.report_all(self._integrate(
+            int(n_runs), times, np.random.default_rng(seed)))
+        return self._output_collector.retrieve()
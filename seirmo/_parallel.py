@@ -0,0 +1,214 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import seirmo as se
+
+
+def _simulate_replicate(model, parameters, times, seed, simulate_kwargs):
+    # Runs a single replicate in a worker process, with its own generator
+    return model.simulate(
+        parameters, times, rng=np.random.default_rng(seed),
+        **simulate_kwargs)
+
+
+def _simulate_replicate_shared(model, parameters, times, seed,
+                               simulate_kwargs, buffer, index):
+    # Runs a single replicate in a worker process, writing the output into
+    # the shared buffer instead of returning it
+    collector = model._output_collector
+    collector.set_shared_output(buffer, index)
+    try:
+        _simulate_replicate(model, parameters, times, seed, simulate_kwargs)
+    finally:
+        collector.set_shared_output(None)
+
+
+def _simulate_replicate_attached(model, parameters, times, seed,
+                                 simulate_kwargs, shape, name, index):
+    # Runs a single replicate in a worker process, attaching to the shared
+    # memory by its name for this replicate only. Replicates sent to a
+    # worker in one chunk would otherwise share an unpickled buffer, which
+    # could not be closed after each of them
+    buffer = se.SharedOutputBuffer(shape, name)
+    try:
+        _simulate_replicate_shared(model, parameters, times, seed,
+                                   simulate_kwargs, buffer, index)
+    finally:
+        buffer.close()
+
+
+class EnsembleRunner(object):
+    """EnsembleRunner Class:
+
+    Runs replicates of a :class:`StochasticSEIRModel` in parallel, across a
+    pool of worker processes.
+
+    Each replicate draws its random numbers from its own
+    :class:`numpy.random.Generator`, spawned from a single
+    :class:`numpy.random.SeedSequence`. The results for a given seed are
+    therefore reproducible, and do not depend on the number of workers or
+    on the order in which the replicates finish.
+
+    Parameters
+    ----------
+    model: seirmo.StochasticSEIRModel instance
+    n_workers: number of worker processes. Defaults to the number of CPUs.
+        With a single worker the replicates are run in the current process.
+    """
+
+    def __init__(self, model, n_workers=None):
+        super(EnsembleRunner, self).__init__()
+
+        if not isinstance(model, se.StochasticSEIRModel):
+            raise TypeError(
+                'Model has to be an instance of seirmo.StochasticSEIRModel.')
+
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        if int(n_workers) != n_workers or n_workers < 1:
+            raise ValueError(
+                'The number of workers must be a positive integer.')
+
+        self._model = model
+        self._n_workers = int(n_workers)
+
+    def n_workers(self):
+        """
+        Returns the number of worker processes.
+        """
+        return self._n_workers
+
+    def _tasks(self, parameters, times, n_runs, seed):
+        # Returns the parameters, times and seed of each replicate, grouped
+        # by parameter set
+        if int(n_runs) != n_runs or n_runs < 1:
+            raise ValueError('The number of runs must be a positive integer')
+
+        scenarios = np.atleast_2d(np.asarray(parameters, dtype=float))
+        if scenarios.ndim != 2:
+            raise ValueError(
+                'Parameters must be of shape (n_parameters,) or '
+                '(n_scenarios, n_parameters).')
+
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        seeds = seed.spawn(len(scenarios) * int(n_runs))
+
+        return (
+            np.repeat(scenarios, int(n_runs), axis=0), [times] * len(seeds),
+            seeds)
+
+    def imap(self, parameters, times, n_runs, seed=None, chunksize=1,
+             **simulate_kwargs):
+        """
+        Simulates ``n_runs`` replicates for each parameter set, yielding the
+        output of each replicate as soon as it and all replicates before it
+        have finished.
+
+        Replicates are yielded in order, grouped by parameter set. Further
+        keyword arguments, e.g. ``method``, are passed to
+        :meth:`StochasticSEIRModel.simulate`.
+
+        :param parameters: An array of length :meth:`n_parameters` of the
+            model, or an array of shape ``(n_scenarios, n_parameters)`` to
+            sweep over several parameter sets.
+        :type parameters: numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        :param n_runs: Number of replicates per parameter set.
+        :type n_runs: int
+        :param seed: Entropy of the :class:`numpy.random.SeedSequence` from
+            which the generator of each replicate is spawned.
+        :type seed: int | numpy.random.SeedSequence
+        :param chunksize: Number of replicates sent to a worker at once.
+        :type chunksize: int
+        """
+        tasks = self._tasks(parameters, times, n_runs, seed)
+        n_tasks = len(tasks[0])
+
+        if self._n_workers == 1:
+            for params, run_times, run_seed in zip(*tasks):
+                yield _simulate_replicate(
+                    self._model, params, run_times, run_seed,
+                    simulate_kwargs)
+            return
+
+        with ProcessPoolExecutor(max_workers=self._n_workers) as executor:
+            yield from executor.map(
+                _simulate_replicate, [self._model] * n_tasks, *tasks,
+                [simulate_kwargs] * n_tasks, chunksize=chunksize)
+
+    def run(self, parameters, times, n_runs, seed=None, chunksize=1,
+            shared_output=None, **simulate_kwargs):
+        """
+        Simulates ``n_runs`` replicates for each parameter set and returns
+        the outputs as one array.
+
+        Returns a NumPy array of shape ``(n_runs, n_times, n_outputs)`` for a
+        single parameter set, or ``(n_scenarios, n_runs, n_times,
+        n_outputs)`` when a sweep over several parameter sets is requested.
+        See :meth:`imap` for a description of the other arguments.
+
+        By default the output of each replicate is pickled and sent back
+        from its worker process. For large ensembles, a
+        :class:`SharedOutputBuffer` of shape ``(n_scenarios * n_runs,
+        n_times, n_model_outputs)`` can be passed instead, into which the
+        workers write all outputs of the model directly. The returned array
+        is then a view of the buffer if all outputs are selected, so the
+        buffer must not be unlinked while it is in use.
+
+        :param shared_output: Shared buffer to write the outputs into.
+        :type shared_output: SharedOutputBuffer
+        """
+        if shared_output is None:
+            output = np.array(list(self.imap(
+                parameters, times, n_runs, seed, chunksize,
+                **simulate_kwargs)))
+        else:
+            output = self._run_shared(
+                parameters, times, n_runs, seed, chunksize, shared_output,
+                simulate_kwargs)
+
+        if np.ndim(parameters) == 1:
+            return output
+        return output.reshape(
+            (len(parameters), int(n_runs)) + output.shape[1:])
+
+    def _run_shared(self, parameters, times, n_runs, seed, chunksize,
+                    buffer, simulate_kwargs):
+        # Runs the replicates, writing their outputs into the shared buffer,
+        # and returns the selected outputs
+        tasks = self._tasks(parameters, times, n_runs, seed)
+        n_tasks = len(tasks[0])
+        collector = self._model._output_collector
+        if buffer.shape() != (
+                n_tasks, len(times), len(collector._output_names)):
+            raise ValueError(
+                'The shared buffer must be of shape (n_scenarios * n_runs, '
+                'n_times, n_model_outputs).')
+
+        if self._n_workers == 1:
+            for index, task in enumerate(zip(*tasks)):
+                _simulate_replicate_shared(
+                    self._model, *task, simulate_kwargs, buffer, index)
+        else:
+            with ProcessPoolExecutor(max_workers=self._n_workers) as executor:
+                # Wait for all replicates, raising any errors
+                list(executor.map(
+                    _simulate_replicate_attached, [self._model] * n_tasks,
+                    *tasks, [simulate_kwargs] * n_tasks,
+                    [buffer.shape()] * n_tasks, [buffer.name()] * n_tasks,
+                    range(n_tasks), chunksize=chunksize))
+
+        output = buffer.array()
+        if len(collector.output_names()) < output.shape[-1]:
+            output = output[..., collector._output_indices]
+        return output
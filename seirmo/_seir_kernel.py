@@ -0,0 +1,111 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import functools
+
+import numpy as np
+
+from ._gillespie import _check_inputs
+
+
+def _seir_gillespie_kernel(state, beta, kappa, gamma, times, idle_rate,
+                           uniforms, output, index):
+    """Runs the direct Gillespie algorithm for the SEIR reactions, consuming
+    two uniform random numbers per event, until either the state passes the
+    last time point or the random numbers run out.
+
+    ``state`` is of the form [time, S, E, I, R] and is updated in place. The
+    state at each time point is written to ``output``, starting from the
+    time point ``index``.
+
+    Returns the index of the next time point to be recorded. The random
+    numbers are only left over once the state passes the last time point,
+    so a new array is passed to each call.
+
+    The arithmetic and order of the random numbers follow
+    :func:`solve_gillespie` exactly, so both give the same trajectories.
+    Only scalar operations are used, so the kernel can be compiled with
+    Numba.
+    """
+    t_end = times[-1]
+    n_times = len(times)
+    position = 0
+    while state[0] < t_end and position + 1 < len(uniforms):
+        exposure = beta * state[1] * state[3]
+        infection_total = exposure + kappa * state[2]
+        total_rate = infection_total + gamma * state[3]
+
+        rate = total_rate
+        if rate == 0:
+            rate = idle_rate
+        new_time = state[0] + np.log(1 / uniforms[position]) / rate
+
+        # Every time point before the event holds the current state
+        while index < n_times and times[index] < new_time:
+            output[index, :] = state[1:]
+            index += 1
+        state[0] = new_time
+
+        if total_rate > 0:
+            threshold = uniforms[position + 1] * total_rate
+            if threshold < exposure:
+                state[1] -= 1
+                state[2] += 1
+            elif threshold < infection_total:
+                state[2] -= 1
+                state[3] += 1
+            elif threshold < total_rate:
+                state[3] -= 1
+                state[4] += 1
+        position += 2
+
+    return index
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled_kernel():
+    """Returns the kernel compiled with Numba, or None if Numba is not
+    installed. Numba is only imported on first use, as importing it slows
+    down ``import seirmo`` considerably.
+    """
+    try:
+        import numba
+    except ImportError:  # pragma: no cover
+        return None
+    return numba.njit(_seir_gillespie_kernel)
+
+
+def _simulate_seir(initial_states, beta, kappa, gamma, times, max_t_step,
+                   rng, compiled=True, chunk_size=4096):
+    """Simulates the SEIR model with the direct Gillespie algorithm and
+    returns the state at each time point, as an array of shape (n_times, 4).
+
+    The random numbers are drawn from ``rng`` in chunks of ``chunk_size``
+    events and passed to the kernel, which is compiled with Numba if
+    ``compiled`` is True and Numba is installed.
+    """
+    times = np.asarray(times, dtype=float)
+    _check_inputs(initial_states, [times[0], times[-1]])
+    if rng is None:
+        rng = np.random
+
+    kernel = _compiled_kernel() if compiled else None
+    if kernel is None:
+        kernel = _seir_gillespie_kernel
+
+    state = np.empty(5)
+    state[0] = times[0]
+    state[1:] = initial_states
+    output = np.full((len(times), 4), np.nan)
+    idle_rate = 1 / ((times[-1] - times[0]) * max_t_step)
+
+    index = 0
+    while state[0] < times[-1]:
+        index = kernel(
+            state, float(beta), float(kappa), float(gamma), times,
+            idle_rate, rng.random(2 * chunk_size), output, index)
+
+    return output
@@ -19,9 +19,11 @@ class SimulationController(object):
     model: seirmo.ForwardModel class
     start: simulation start time
     end: simulation end time
+    cache_size: number of simulations to remember, see
+        seirmo.CachedModel. Defaults to None, for no caching.
     """
 
-    def __init__(self, model, start, end): # noqa
+    def __init__(self, model, start, end, cache_size=None): # noqa
         super(SimulationController, self).__init__()
 
         if not issubclass(model, se.ForwardModel):
@@ -29,6 +31,8 @@ class SimulationController(object):
                 'Model has to be a subclass of seirmo.ForwardModel.')
 
         self._model = model()
+        if cache_size is not None:
+            self._model = se.CachedModel(self._model, max_size=cache_size)
         self._simulation_times = np.arange(start, end, step=1)
 
     def run(self, parameters, outputs=None):
@@ -6,7 +6,9 @@
 
 import numpy as np
 import seirmo as se
-from ._gillespie import solve_gillespie
+from ._gillespie import solve_gillespie, _solve_gillespie_ensemble
+from ._tau_leaping import solve_tau_leaping
+from ._seir_kernel import _simulate_seir, _compiled_kernel
 
 
 class StochasticSEIRModel(se.SEIRForwardModel):
@@ -23,11 +25,23 @@ class StochasticSEIRModel(se.SEIRForwardModel):
     Infection: E -> I, at rate :math:\kappa E(t)``
     Recovery: I -> R, at rate :math:\gamma I(t)``
 
-    Can be used in conjunction with solve_gillespie(),
-    a stochastic ODE solver implemented in this package.
+    Can be used in conjunction with solve_gillespie(), a stochastic ODE
+    solver implemented in this package, or with the approximate but much
+    faster solve_tau_leaping() for large populations.
 
     Extends :class:`SEIRForwardModel`.
     """
+    # (loss, gain) compartment indices of the exposure, infection and
+    # recovery reactions
+    reactions = np.array([[0, 1], [1, 2], [2, 3]])
+    # Highest order of the reactions consuming each compartment, S and I
+    # are both consumed by the second order exposure reaction
+    _highest_order = np.array([2, 1, 2, 1])
+    # Compartments each reaction rate depends on, exposure depends on S and
+    # I, infection on E and recovery on I
+    _dependencies = np.array([[1, 0, 1, 0], [0, 1, 0, 0], [0, 0, 1, 0]],
+                             dtype=bool)
+
     def __init__(self, params_names: list):
         super(StochasticSEIRModel, self).__init__()
         self._parameters = se.SEIRParameters(params_names)
@@ -66,8 +80,111 @@ class StochasticSEIRModel(se.SEIRForwardModel):
 
         return propens_matrix
 
+    def update_reaction_rates(self, current_states: np.ndarray) -> np.ndarray:
+        ''' This function takes the current populations in each
+        of the N compartments and returns the rates of the reactions
+        listed in :attr:`reactions`, in the same order.
+
+        This is the sparse counterpart of :meth:`update_propensity`,
+        which only evaluates the non-zero transitions of the model.
+
+        The states of several replicates may be given at once as an array
+        of shape (n_runs, N+1), in which case an array of shape (n_runs, M)
+        is returned.
+        '''
+
+        params_names = self._parameters.parameter_names()
+        beta = self._parameters[params_names.index('beta')]
+        kappa = self._parameters[params_names.index('kappa')]
+        gamma = self._parameters[params_names.index('gamma')]
+
+        S = current_states[..., 1]
+        E = current_states[..., 2]
+        I = current_states[..., 3]
+        return np.stack([beta * S * I, kappa * E, gamma * I], axis=-1)
+
+    def compile_reaction_rates(self):
+        ''' Returns a fast equivalent of :meth:`update_reaction_rates` for
+        the currently configured parameters, for use in the event loop of
+        the stochastic solvers.
+
+        The parameter indices are resolved and the rate constants read once,
+        when this method is called, and the returned function writes the
+        rates into a preallocated vector of length M. The same vector is
+        returned by every call, so its values are only valid until the next
+        call.
+        '''
+        params_names = self._parameters.parameter_names()
+        beta, kappa, gamma = [
+            float(self._parameters[params_names.index(name)])
+            for name in ('beta', 'kappa', 'gamma')]
+        rates = np.empty(len(self.reactions))
+
+        def reaction_rates(current_states: np.ndarray) -> np.ndarray:
+            _, S, E, I, _ = current_states
+            rates[0] = beta * S * I
+            rates[1] = kappa * E
+            rates[2] = gamma * I
+            return rates
+
+        return reaction_rates
+
     def simulate(self, parameters: np.ndarray, times: list,
-                 max_t_step: float = 0.01):
+                 max_t_step: float = 0.01, method: str = 'gillespie',
+                 rng: np.random.Generator = None, backend: str = 'numpy'):
+        """
+        Forward simulation of the model for the given time points.
+
+        :param parameters: An array of length 7 with the initial values of
+            the compartments and the values of beta, kappa and gamma.
+        :type parameters: numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        :param max_t_step: Maximum time step, as a fraction of the total
+            simulation time.
+        :type max_t_step: float
+        :param method: Stochastic solver to use, either ``'gillespie'``
+            for the exact algorithm, ``'next_reaction'`` or
+            ``'composition_rejection'`` for the exact algorithm with the
+            corresponding event selection method of :func:`solve_gillespie`,
+            or ``'tau_leaping'`` for the adaptive tau-leaping approximation,
+            suited to large populations.
+        :type method: str
+        :param rng: Source of the random numbers, defaults to the global
+            ``numpy.random`` state.
+        :type rng: numpy.random.Generator
+        :param backend: Either ``'numpy'``, or ``'numba'`` to run the
+            ``'gillespie'`` method in a compiled kernel specialised to the
+            SEIR reactions. The kernel gives the same trajectories as the
+            NumPy backend for the same random number generator seed, at a
+            fraction of the cost per event. If Numba is not installed, the
+            NumPy backend is used instead.
+        :type backend: str
+        """
+        if backend not in ('numpy', 'numba'):
+            raise ValueError(
+                f'Unknown backend {backend}, expected numpy or numba')
+        if backend == 'numba' and method != 'gillespie':
+            raise ValueError(
+                'The numba backend only supports the gillespie method')
+
+        if method == 'gillespie':
+            solver = solve_gillespie
+            solver_kwargs = {'reactions': self.reactions}
+        elif method in ('next_reaction', 'composition_rejection'):
+            solver = solve_gillespie
+            solver_kwargs = {'reactions': self.reactions, 'method': method,
+                             'dependencies': self._dependencies}
+        elif method == 'tau_leaping':
+            solver = solve_tau_leaping
+            solver_kwargs = {'reactions': self.reactions,
+                             'highest_order': self._highest_order}
+        else:
+            raise ValueError(
+                f'Unknown simulation method {method}, expected one of '
+                "'gillespie', 'next_reaction', 'composition_rejection' or "
+                "'tau_leaping'")
+
         self._parameters.configure_parameters(parameters)  # array of length 7
         # with values of beta
         # gamma kappa and initial
@@ -75,13 +192,64 @@ class StochasticSEIRModel(se.SEIRForwardModel):
 
         initial_states = self._parameters[:4]  # input initial values
 
-        for point in solve_gillespie(
-                lambda states: self.update_propensity(states),  # states
-                # includes t as first argument
+        if backend == 'numba' and _compiled_kernel() is not None:
+            params_names = self._parameters.parameter_names()
+            beta, kappa, gamma = [
+                self._parameters[params_names.index(name)]
+                for name in ('beta', 'kappa', 'gamma')]
+            self._output_collector.report_all(_simulate_seir(
+                initial_states, beta, kappa, gamma, times, max_t_step, rng))
+            return self._output_collector.retrieve()
+
+        self._output_collector.report(np.append(times[0], initial_states))
+
+        for point in solver(
+                self.compile_reaction_rates(),  # states includes t as first
+                # argument
                 initial_states,
-                [times[0], times[-1]], max_t_step):
+                [times[0], times[-1]], max_t_step=max_t_step, rng=rng,
+                **solver_kwargs):
 
             self._output_collector.report(point)
-            self._output_collector.retrieve()
 
         return self._output_collector.retrieve()
+
+    def simulate_ensemble(self, parameters: np.ndarray, times: list,
+                          n_runs: int, seed=None, max_t_step: float = 0.01):
+        """
+        Forward simulation of ``n_runs`` independent replicates of the model
+        with the exact Gillespie algorithm.
+
+        The replicates are advanced together as one NumPy array, firing one
+        event in each unfinished replicate per iteration, which is much faster
+        than calling :meth:`simulate` in a loop.
+
+        Returns a NumPy array of shape ``(n_runs, n_times, n_outputs)``.
+
+        :param parameters: An array of length 7 with the initial values of
+            the compartments and the values of beta, kappa and gamma.
+        :type parameters: numpy.ndarray
+        :param times: An array-like object with increasing time points.
+        :type times: list | numpy.ndarray
+        :param n_runs: Number of replicates to simulate.
+        :type n_runs: int
+        :param seed: Seed of the random number generator, passed to
+            :func:`numpy.random.default_rng`.
+        :type seed: int | numpy.random.SeedSequence | numpy.random.Generator
+        :param max_t_step: Maximum time step, as a fraction of the total
+            simulation time, taken while all reaction rates are zero.
+        :type max_t_step: float
+        """
+        if int(n_runs) != n_runs or n_runs < 1:
+            raise ValueError('The number of runs must be a positive integer')
+
+        self._parameters.configure_parameters(parameters)
+        initial_states = self._parameters[:4]
+
+        output = _solve_gillespie_ensemble(
+            lambda states: self.update_reaction_rates(states),
+            initial_states, times, int(n_runs), self.reactions,
+            np.random.default_rng(seed), max_t_step)
+
+        self._output_collector.report_all(output)
+        return self._output_collector.retrieve()
@@ -9,24 +9,46 @@ import seirmo as se
 
 
 class StochasticOutputCollector(se.SEIROutputCollector):
+    """Output collector for stochastic simulations, which report the state
+    of the model at random event times.
+
+    The reported states are streamed into a preallocated array which holds
+    the state of the model at each of the requested time points, i.e. the
+    last state reported at or before that time. Every time point that an
+    event jumps over is filled, and each report only costs a comparison and
+    a copy of the current state, so the output can be retrieved once the
+    simulation has finished.
+    """
     def begin(self, times):
-        self._data = np.full((len(times), len(self._output_names)), np.nan)
+        self._data = self._shared_data()
+        if self._data is None:
+            self._data = np.empty((len(times), len(self._output_names)))
+        elif self._data.shape != (len(times), len(self._output_names)):
+            raise ValueError(
+                'The shared buffer does not match the time points.')
+        self._data[...] = np.nan
         self._index = 0
         self._times = np.array(times)
+        self._state = np.full(len(self._output_names), np.nan)
 
     def report(self, data: np.ndarray) -> np.array:
-        """Report data as a column vector into an array at each timestep.
+        """Report the state of the model, as an array of the form
+        [time, compartment_1, ...], after each event of the simulation.
+
+        The state holds until the next report, so all time points before
+        the reported time are filled with the previously reported state.
 
         :param data: numpy array containing the data of the model resolution
-        :return: numpy array containing the model solution
         """
         if self._index >= self._data.shape[0]:
             return
         assert data.shape == (self._data.shape[1] + 1,), 'Invalid Data Shape'
         gill_time = data[0]
-        if gill_time >= self._times[self._index]:
-            self._data[self._index, :] = np.transpose(data[1:])
-            self._index += 1
+        if gill_time > self._times[self._index]:
+            index = np.searchsorted(self._times, gill_time, side='left')
+            self._data[self._index:index] = self._state
+            self._index = index
+        self._state[:] = data[1:]
 
     def retrieve_time(self, index: int) -> np.ndarray:
         """Return data as a column vector at a time point requested. Asserts
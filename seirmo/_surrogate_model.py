@@ -0,0 +1,255 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import numpy as np
+import scipy.linalg
+import scipy.optimize
+
+import seirmo as se
+
+
+class SurrogateModel(se.ForwardModel):
+    r"""
+    A class that emulates an expensive :class:`ForwardModel` or
+    :class:`SEIRForwardModel` instance with a Gaussian process, trained on
+    simulations at a design of parameter points.
+
+    The outputs at all time points are modelled as Gaussian processes of
+    the parameters, with a common squared exponential covariance
+
+    .. math::
+        k(p, p') = \sigma^2 \left(\exp\left(-\sum_j
+        \frac{(p_j - p'_j)^2}{2 l_j^2}\right) + g \delta_{pp'}\right),
+
+    where the variance :math:`\sigma^2` is estimated for each output and
+    time point, and the length scales :math:`l_j` (relative to the range of
+    the design) and the nugget :math:`g` are fitted by maximising the
+    marginal likelihood of the training simulations. The nugget absorbs the
+    noise of stochastic models, whose mean output is then emulated.
+
+    :meth:`simulate` returns the mean of the Gaussian process if its
+    standard deviation is at most ``tolerance`` for all outputs, which
+    takes microseconds, and otherwise simulates the wrapped model. Until
+    :meth:`fit` is called, and for other times or outputs than those it was
+    trained on, the wrapped model is always simulated.
+
+    Extends :class:`ForwardModel`.
+
+    :param model: An instance of a :class:`ForwardModel` or
+        :class:`SEIRForwardModel`.
+    :type model: ForwardModel | SEIRForwardModel
+    :param tolerance: Largest standard deviation of the emulator, in units
+        of the outputs, for which its mean is returned.
+    :type tolerance: float
+    """
+    def __init__(self, model, tolerance):
+        super(SurrogateModel, self).__init__()
+
+        # Check input
+        if not isinstance(model, (se.ForwardModel, se.SEIRForwardModel)):
+            raise TypeError(
+                'The model has to be an instance of a seirmo.ForwardModel '
+                'or seirmo.SEIRForwardModel.')
+        if tolerance < 0:
+            raise ValueError('The tolerance cannot be negative.')
+
+        self._model = model
+        self._tolerance = tolerance
+        self._emulator = None
+        self._n_emulated = 0
+        self._n_simulated = 0
+
+    def tolerance(self):
+        """
+        Returns the largest standard deviation of the emulator for which its
+        mean is returned.
+        """
+        return self._tolerance
+
+    def emulator_info(self):
+        """
+        Returns a dictionary with the number of simulations answered by the
+        emulator (``'emulated'``) and by the wrapped model
+        (``'simulated'``).
+        """
+        return {'emulated': self._n_emulated, 'simulated': self._n_simulated}
+
+    def n_outputs(self):
+        """
+        Returns the number of model outputs.
+        """
+        return self._model.n_outputs()
+
+    def n_parameters(self):
+        """
+        Returns the number of model parameters.
+        """
+        return self._model.n_parameters()
+
+    def output_names(self):
+        """
+        Returns the names of the model outputs.
+        """
+        return self._model.output_names()
+
+    def parameter_names(self):
+        """
+        Returns the names of the model parameters.
+        """
+        return self._model.parameter_names()
+
+    def set_outputs(self, outputs):
+        """
+        Sets the outputs of the model.
+        """
+        self._model.set_outputs(outputs)
+
+    def fit(self, parameters, times):
+        """
+        Simulates the wrapped model at a design of parameter points, and
+        trains the emulator on the outputs.
+
+        The design should cover the region of parameter space the emulator
+        will be asked about, e.g. a Latin hypercube in the prior support.
+
+        :param parameters: An array of shape ``(n, n_parameters)`` with a
+            parameter point of the design in each row.
+        :type parameters: numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        """
+        parameters = np.asarray(parameters, dtype=float)
+        if parameters.ndim != 2 or \
+                parameters.shape[1] != self._model.n_parameters():
+            raise ValueError(
+                'Parameters must be of shape (n, n_parameters).')
+        if len(parameters) < 2:
+            raise ValueError('The design needs at least two points.')
+
+        times = np.asarray(times, dtype=float)
+        outputs = np.array([
+            self._model.simulate(params, times) for params in parameters])
+        output_shape = outputs.shape[1:]
+        outputs = outputs.reshape(len(parameters), -1)
+
+        # Rescale the parameters to the unit cube spanned by the design, and
+        # centre the outputs
+        offset = np.min(parameters, axis=0)
+        scale = np.max(parameters, axis=0) - offset
+        scale[scale == 0] = 1
+        inputs = (parameters - offset) / scale
+        mean_output = np.mean(outputs, axis=0)
+        outputs = outputs - mean_output
+
+        # Fit the log length scales and log nugget to the outputs which vary
+        # across the design, e.g. not the initial values
+        n_parameters = parameters.shape[1]
+        varying = np.any(outputs != 0, axis=0)
+        result = scipy.optimize.minimize(
+            _negative_log_likelihood, np.append(np.zeros(n_parameters), -6),
+            args=(inputs, outputs[:, varying]), method='L-BFGS-B',
+            bounds=[(np.log(1e-2), np.log(1e2))] * n_parameters
+            + [(np.log(1e-10), 0)])
+
+        length_scales = np.exp(result.x[:-1])
+        nugget = np.exp(result.x[-1])
+        cholesky = _cholesky(inputs, length_scales, nugget)
+        weights = scipy.linalg.cho_solve(cholesky, outputs)
+        variances = np.sum(outputs * weights, axis=0) / len(inputs)
+
+        self._emulator = {
+            'times': times, 'output_names': list(self._model.output_names()),
+            'output_shape': output_shape, 'offset': offset, 'scale': scale,
+            'inputs': inputs, 'length_scales': length_scales,
+            'nugget': nugget, 'cholesky': cholesky, 'weights': weights,
+            'mean_output': mean_output, 'variances': variances}
+
+    def predict(self, parameters):
+        """
+        Returns the mean and standard deviation of the emulator at the given
+        parameters, as NumPy arrays of the shape of the output of
+        :meth:`simulate` at the times of :meth:`fit`.
+
+        :param parameters: An array-like object with parameter values of length
+            :meth:`n_parameters`.
+        :type parameters: list | numpy.ndarray
+        """
+        emulator = self._emulator
+        if emulator is None:
+            raise ValueError('The emulator has not been fitted yet.')
+
+        inputs = (np.asarray(parameters, dtype=float) - emulator['offset']) \
+            / emulator['scale']
+        covariance = _correlation(
+            inputs[np.newaxis], emulator['inputs'],
+            emulator['length_scales'])[0]
+
+        mean = emulator['mean_output'] + covariance @ emulator['weights']
+        reduction = scipy.linalg.solve_triangular(
+            emulator['cholesky'][0], covariance, lower=True)
+        correlation = max(1 - reduction @ reduction, 0)
+        std = np.sqrt(emulator['variances'] * correlation)
+
+        shape = emulator['output_shape']
+        return mean.reshape(shape), std.reshape(shape)
+
+    def simulate(self, parameters, times):
+        """
+        Forward simulation of a model for a given time period with given
+        parameters, emulated if the emulator is accurate enough.
+
+        :param parameters: An array-like object with parameter values of length
+            :meth:`n_parameters`.
+        :type parameters: list | numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        """
+        emulator = self._emulator
+        if emulator is not None \
+                and np.array_equal(emulator['times'], times) \
+                and emulator['output_names'] == self._model.output_names():
+            mean, std = self.predict(parameters)
+            if np.max(std) <= self._tolerance:
+                self._n_emulated += 1
+                return mean
+
+        self._n_simulated += 1
+        return self._model.simulate(parameters, times)
+
+
+def _correlation(inputs, other_inputs, length_scales):
+    """Returns the squared exponential correlation matrix between two sets
+    of inputs."""
+    differences = (inputs[:, np.newaxis] - other_inputs[np.newaxis]) \
+        / length_scales
+    return np.exp(-0.5 * np.sum(differences ** 2, axis=-1))
+
+
+def _cholesky(inputs, length_scales, nugget):
+    """Returns the Cholesky factorisation of the correlation matrix of the
+    training inputs, with the nugget (and a little jitter) added to the
+    diagonal."""
+    correlation = _correlation(inputs, inputs, length_scales)
+    correlation[np.diag_indices_from(correlation)] += nugget + 1e-10
+    return scipy.linalg.cho_factor(correlation, lower=True)
+
+
+def _negative_log_likelihood(log_hyperparameters, inputs, outputs):
+    """Returns the negative log marginal likelihood of the centred training
+    outputs, maximised over the variance of each output."""
+    try:
+        cholesky = _cholesky(
+            inputs, np.exp(log_hyperparameters[:-1]),
+            np.exp(log_hyperparameters[-1]))
+    except np.linalg.LinAlgError:
+        return np.inf
+
+    n, m = outputs.shape
+    weights = scipy.linalg.cho_solve(cholesky, outputs)
+    variances = np.sum(outputs * weights, axis=0) / n
+
+    return n / 2 * np.sum(np.log(variances)) \
+        + m * np.sum(np.log(np.diag(cholesky[0])))
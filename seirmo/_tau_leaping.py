@@ -0,0 +1,177 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import numpy as np
+import typing
+
+from ._gillespie import _check_inputs, _reaction_indices, _select_reaction
+
+
+def solve_tau_leaping(propensities: typing.Callable[[np.ndarray], np.ndarray],
+                      initial_cond: np.ndarray, t_span: typing.List[float],
+                      reactions: np.ndarray, max_t_step: float = 0.01,
+                      epsilon: float = 0.03, n_critical: int = 10,
+                      highest_order: typing.Optional[np.ndarray] = None,
+                      rng: typing.Optional[np.random.Generator] = None):
+    """ Solve an initial_cond value problem using explicit tau-leaping
+
+    Instead of firing a single reaction per step, as in
+    :func:`solve_gillespie`, each step leaps forward by a time ``tau`` and
+    fires a Poisson distributed number of every reaction. The leap size is
+    chosen adaptively so that no propensity is expected to change by more than
+    a fraction ``epsilon`` of its value (Cao, Gillespie and Petzold, 2006).
+
+    Compartments are kept non-negative: reactions that could exhaust their
+    loss compartment within ``n_critical`` firings are treated as critical
+    and fire at most once per leap, and a leap which would still produce a
+    negative count is retried with half the step size. When the selected leap
+    is not much larger than the expected time to the next event, a short
+    batch of exact Gillespie steps is taken instead.
+
+    Parameters
+    ----------
+    propensities : callable of form propensities(state)
+        State is array of length (N+1) of time and count per compartment
+        (for N compartments)
+        Will return an array of shape (M,) with the rate of each reaction
+    initial_cond : array_like, shape (N,)
+        Initial state, gives counts in each of N compartments
+    t_span : 2-list of floats
+        Internal of integration (t_start, t_end). The solver starts at t_start
+        and will finish once the first time_step exceeds t_end
+        (Note that the final value may be greater than t_end)
+    reactions : array_like, shape (M, 2)
+        List of (loss, gain) compartment indices, one row per reaction
+    max_t_step : float (default value 0.01)
+        This is the maximum allowed timestep, as a fraction of the total t_span
+    epsilon : float (default value 0.03)
+        Error control parameter, bounding the relative change in the
+        propensities over a single leap
+    n_critical : int (default value 10)
+        Reactions that can fire fewer than this many times before exhausting
+        their loss compartment are simulated exactly
+    highest_order : array_like, shape (N,), optional
+        Highest order of any reaction consumed by each compartment, used in
+        the step size selection. Defaults to 2 for every compartment, which
+        is suitable for mass-action reactions of up to second order
+    rng : numpy.random.Generator, optional
+        Source of the random numbers. Defaults to the global ``numpy.random``
+        state
+
+    Yields
+    -------
+    Numpy array of form [Time, Compartment_1, ...], ie [time, S, E, I, R]
+        Note that time steps are not uniform, and final timestep lie
+        after the end of the time_span given
+
+    """
+    _check_inputs(initial_cond, t_span)
+
+    n_compartments = len(initial_cond)
+    losses, gains = _reaction_indices(reactions, n_compartments)
+    losses, gains = losses - 1, gains - 1  # Index compartments, not state
+
+    # Net change of each compartment when each reaction fires once
+    stoichiometry = np.zeros((len(losses), n_compartments))
+    np.add.at(stoichiometry, (np.arange(len(losses)), losses), -1)
+    np.add.at(stoichiometry, (np.arange(len(gains)), gains), 1)
+    consumed = np.any(stoichiometry < 0, axis=0)
+
+    if highest_order is None:
+        highest_order = np.full(n_compartments, 2)
+    highest_order = np.asarray(highest_order, dtype=float)
+    if highest_order.shape != (n_compartments,):
+        raise ValueError(
+            'highest_order must give one value for each compartment')
+
+    max_step = (t_span[1] - t_span[0]) * max_t_step
+    if rng is None:
+        rng = np.random
+
+    state = np.zeros(n_compartments + 1)
+    state[0] = t_span[0]
+    state[1:] = initial_cond
+
+    while state[0] < t_span[1]:
+        rates = propensities(state)
+        if np.any(rates < 0):
+            raise ValueError('Propensity function should not \
+                              return neagtive values')
+        total_rate = np.sum(rates)
+        if total_rate == 0:
+            state[0] += np.log(1 / rng.random()) * max_step
+            yield state
+            continue
+
+        # Reactions which could exhaust their loss compartment
+        critical = (rates > 0) & (state[1:][losses] < n_critical)
+
+        tau = min(_leap_size(rates * ~critical, stoichiometry, state[1:],
+                             consumed, highest_order, epsilon), max_step)
+
+        if tau < 10 / total_rate:
+            # Leaping gives little benefit, so take exact steps instead
+            for _ in range(100):
+                cumulative_rates = np.cumsum(rates)
+                state[0] += np.log(1 / rng.random()) / cumulative_rates[-1]
+                index = _select_reaction(cumulative_rates, rng.random())
+                if index is not None:
+                    state[1:] += stoichiometry[index]
+                yield state
+
+                if state[0] >= t_span[1]:
+                    break
+                rates = propensities(state)
+                if np.sum(rates) == 0:
+                    break
+            continue
+
+        critical_rate = np.sum(rates[critical])
+        while True:
+            if critical_rate > 0:
+                critical_tau = np.log(1 / rng.random()) / critical_rate
+            else:
+                critical_tau = np.inf
+            step = min(tau, critical_tau)
+
+            firings = rng.poisson(rates * step * ~critical)
+            if critical_tau <= tau:
+                # Exactly one critical reaction fires during the leap
+                index = _select_reaction(
+                    np.cumsum(rates * critical), rng.random())
+                if index is not None:
+                    firings[index] += 1
+
+            new_counts = state[1:] + firings @ stoichiometry
+            if np.all(new_counts >= 0):
+                break
+            tau /= 2
+
+        state[0] += step
+        state[1:] = new_counts
+        yield state
+
+
+def _leap_size(rates: np.ndarray, stoichiometry: np.ndarray,
+               counts: np.ndarray, consumed: np.ndarray,
+               highest_order: np.ndarray, epsilon: float) -> float:
+    """Returns the largest leap for which the expected relative change in
+    the propensities stays below ``epsilon`` (Cao, Gillespie and Petzold,
+    2006), given the rates of the non-critical reactions.
+    """
+    mean_change = rates @ stoichiometry
+    variance = rates @ stoichiometry ** 2
+
+    bound = np.maximum(epsilon * counts / highest_order, 1)[consumed]
+    mean_change = np.abs(mean_change[consumed])
+    variance = variance[consumed]
+
+    with np.errstate(divide='ignore'):
+        tau_mean = np.where(mean_change > 0, bound / mean_change, np.inf)
+        tau_variance = np.where(variance > 0, bound ** 2 / variance, np.inf)
+
+    return float(min(np.min(tau_mean, initial=np.inf),
+                     np.min(tau_variance, initial=np.inf)))
@@ -177,7 +177,8 @@ class _OptimisationApp(object):
             parameters_name, 'Sliders of parameters')
 
         self.simulate = se.SimulationController(
-            model, self.simulation_start, self.simulation_end)
+            model, self.simulation_start, self.simulation_end,
+            cache_size=128)
 
         data = self.simulate.run(init_parameters)
         data = pd.DataFrame({
@@ -205,7 +206,8 @@ class _OptimisationApp(object):
             self.data, time_key, inc_key)
 
         self.simulate = se.SimulationController(
-            model, self.simulation_start, self.simulation_end)
+            model, self.simulation_start, self.simulation_end,
+            cache_size=128)
 
         initialise_data = pd.DataFrame({
             'Time': [0],
@@ -119,7 +119,8 @@ class _SimulationApp(object):
             parameters_name, 'Sliders of parameters')
 
         self.simulate = se.SimulationController(
-            model, self.simulation_start, self.simulation_end)
+            model, self.simulation_start, self.simulation_end,
+            cache_size=128)
 
         data = self.simulate.run(init_parameters)
         data = pd.DataFrame({
@@ -19,10 +19,10 @@ from seirmo import apps
 app = apps._OptimisationApp()
 
 # Add french flu data
-flu_data = se.DatasetLibrary().french_flu()
+flu_data = se.DatasetLibrary().load(
+    'french_flu', rows=slice(60, 91), columns=['time_index', 'inc'])
 flu_data = flu_data.rename(
     columns={'time_index': 'Time', 'inc': 'Incidence Number'})
-flu_data = flu_data.loc[60:90, :]
 flu_data['Time'] = flu_data['Time'] - flu_data['Time'].min()
 flu_data['Incidence Number'] = flu_data['Incidence Number'] / 1e5
 
@@ -25,8 +25,7 @@ from seirmo import apps
 app = apps._SimulationApp()
 
 # Add french flu data
-flu_data = se.DatasetLibrary().french_flu()
-flu_data = flu_data.loc[:30,:]
+flu_data = se.DatasetLibrary().load('french_flu', rows=slice(0, 31))
 flu_data['inc'] = flu_data['inc']
 app.add_data(flu_data, time_key='time_index', inc_key='inc')
 
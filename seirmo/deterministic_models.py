@@ -8,6 +8,9 @@ import numpy as np
 from scipy.integrate import solve_ivp
 
 import seirmo
+from ._models import (
+    _FIXED_STEP_METHODS, _check_solver_options, _seir_jacobian,
+    _seir_right_hand_side, _solve_rk4, _solve_sensitivities, _solver_kwargs)
 
 
 class DeterministicSEIRModel(seirmo.SEIRForwardModel):
@@ -42,22 +45,72 @@ class DeterministicSEIRModel(seirmo.SEIRForwardModel):
         self._parameters = seirmo.SEIRParameters(
             ['S0', 'E0', 'I0', 'R0', 'alpha', 'beta', 'gamma'])
 
+        # Default options of the ODE solver, see solve_ivp
+        self._solver_options = {'method': 'RK45', 'rtol': 1e-3, 'atol': 1e-6}
+
+    def set_solver_options(self, method=None, rtol=None, atol=None,
+                           max_step=None):
+        """
+        Sets the method and tolerances of the ODE solver. Options which are
+        ``None`` are left unchanged. See
+        :meth:`SEIRModel.set_solver_options` for a description of the
+        methods and options.
+
+        :param method: Integration method of
+            :func:`scipy.integrate.solve_ivp`, or ``'RK4'``.
+        :type method: str
+        :param rtol: Relative tolerance of the solver.
+        :type rtol: float
+        :param atol: Absolute tolerance of the solver.
+        :type atol: float
+        :param max_step: Maximum step of the solver.
+        :type max_step: float
+        """
+        self._solver_options = _check_solver_options(
+            self._solver_options, method, rtol, atol, max_step)
+
+    def solver_options(self):
+        """Returns the method and tolerances of the ODE solver"""
+        return dict(self._solver_options)
+
     def _right_hand_side(self, t, y, c):
-        # Assuming y = [S, E, I, R] (the dependent variables in the model)
-        # Assuming the parameters are ordered like
-        # parameters = [S0, E0, I0, R0, beta, kappa, gamma]
-        # Let c = [beta, kappa, gamma]
-        #  = [parameters[0], parameters[1], parameters[2]],
-        # then beta = c[0], kappa = c[1], gamma = c[2]
+        # Assuming y = [S, E, I, R] and c = [beta, kappa, gamma]
+        return _seir_right_hand_side(t, y, c)
+
+    # Partial derivatives of the right-hand side with respect to the states
+    _jacobian = staticmethod(_seir_jacobian)
+
+    def simulateS1(self, parameters, times):
+        """
+        Forward simulation of the model for a given time period with given
+        parameters, together with the sensitivities of the outputs with
+        respect to the parameters.
+
+        The forward sensitivity equations are integrated alongside the
+        states, with the solver options of :meth:`set_solver_options`.
+
+        Returns a tuple ``(y, dy)``, where ``y`` is the output of
+        :meth:`simulate` and ``dy`` is a NumPy array of shape
+        ``(n_times, n_outputs, n_parameters)``.
+
+        :param parameters: An array-like object with parameter values of length
+            :meth:`n_parameters`.
+        :type parameters: list | numpy.ndarray
+        :param times: An array-like object with time points.
+        :type times: list | numpy.ndarray
+        """
+        self._parameters.configure_parameters(parameters)
 
-        # Construct the derivative functions of the system of ODEs
+        output, doutput = _solve_sensitivities(
+            self._parameters[:4], self._parameters[4:], times,
+            self._solver_options)
 
-        s, e, i, _ = y
-        beta, kappa, gamma = c
-        dydt = [-beta * s * i, beta * s * i - kappa * e,
-                kappa * e - gamma * i, gamma * i]
+        # Get the sensitivities of the selected outputs, with the time
+        # points along the first axis
+        doutput = doutput[self._output_collector._output_indices]
 
-        return dydt
+        self._output_collector.report_all(output.transpose())
+        return self._output_collector.retrieve(), doutput.transpose((2, 0, 1))
 
     def simulate(self, parameters, times):
         self._parameters.configure_parameters(parameters)
@@ -66,11 +119,17 @@ class DeterministicSEIRModel(seirmo.SEIRForwardModel):
         #c = parameters[4:]
 
         # Solve the system of ODEs
-        sol = solve_ivp(
-            lambda t, y: self._right_hand_side(t, y, self._parameters[4:]),
-            [times[0], times[-1]], self._parameters[:4], t_eval=times)
-
-        output = sol['y']
+        if self._solver_options['method'] in _FIXED_STEP_METHODS:
+            output = _solve_rk4(
+                self._parameters[:4], self._parameters[4:], times,
+                self._solver_options.get('max_step', np.inf)).transpose()
+        else:
+            sol = solve_ivp(
+                self._right_hand_side, [times[0], times[-1]],
+                self._parameters[:4], t_eval=times,
+                args=(self._parameters[4:],),
+                **_solver_kwargs(self._solver_options, self._jacobian))
+            output = sol['y']
 
         # Total infected is infectious 'i' plus recovered 'r'
         total_infected = output[2, :] + output[3, :]
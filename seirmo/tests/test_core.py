@@ -4,6 +4,7 @@
 # for copyright notice and full license details.
 #
 
+import pickle
 import unittest
 import numpy as np
 import seirmo as se
@@ -108,6 +109,91 @@ class TestSEIROutputCollector(unittest.TestCase):
             NotImplementedError,
             testSubject.report, np.zeros((2, 1)))
 
+    def test_report_all(self):
+        testSubject = se.SEIROutputCollector(['a', 'b'])
+        testSubject.report_all(np.ones((3, 2)))
+        testSubject.set_outputs(['b'])
+        np.testing.assert_array_equal(testSubject.retrieve(), np.ones((3, 1)))
+
+    def test_set_shared_output(self):
+        testSubject = se.SEIROutputCollector(['a', 'b'])
+        with se.SharedOutputBuffer((2, 3, 2)) as buffer:
+            # The data is written into the given row of the buffer
+            testSubject.set_shared_output(buffer, 1)
+            testSubject.report_all(np.ones((3, 2)))
+            np.testing.assert_array_equal(buffer.array()[1], 1)
+            self.assertTrue(
+                np.shares_memory(testSubject._data, buffer.array()))
+
+            with self.assertRaises(ValueError):
+                testSubject.report_all(np.ones((4, 2)))
+
+            # Without the buffer, the data is private again
+            testSubject.set_shared_output(None)
+            testSubject.report_all(np.zeros((3, 2)))
+            np.testing.assert_array_equal(buffer.array()[1], 1)
+            self.assertFalse(
+                np.shares_memory(testSubject._data, buffer.array()))
+
+        # Without an index, the data fills the whole buffer
+        testSubject = se.SEIROutputCollector(['a', 'b'])
+        with se.SharedOutputBuffer((3, 2)) as buffer:
+            testSubject.set_shared_output(buffer)
+            testSubject.report_all(np.ones((3, 2)))
+            np.testing.assert_array_equal(buffer.array(), 1)
+            self.assertEqual(testSubject.retrieve().shape, (3, 2))
+            testSubject.set_shared_output(None)
+
+        model = se.DeterministicSEIRModel()
+        times = np.linspace(0, 10, num=11)
+        parameters = np.array([0.9, 0, 0.1, 0, 1, 1, 1])
+        expected = model.simulate(parameters, times)
+        with se.SharedOutputBuffer((11, 5)) as buffer:
+            model._output_collector.set_shared_output(buffer)
+            output = model.simulate(parameters, times)
+            self.assertEqual(output.shape, (11, 5))
+            np.testing.assert_array_equal(output, expected)
+            np.testing.assert_array_equal(buffer.array(), expected)
+            model._output_collector.set_shared_output(None)
+            del output
+
+        self.assertRaises(
+            TypeError, testSubject.set_shared_output, np.zeros((3, 2)))
+        with se.SharedOutputBuffer((2, 3, 3)) as buffer:
+            self.assertRaises(
+                ValueError, testSubject.set_shared_output, buffer)
+
+
+class TestSharedOutputBuffer(unittest.TestCase):
+    """Tests the SharedOutputBuffer Class"""
+    def test__init__(self):
+        with se.SharedOutputBuffer((2, 3)) as buffer:
+            self.assertEqual(buffer.shape(), (2, 3))
+            self.assertEqual(buffer.array().shape, (2, 3))
+            self.assertIsInstance(buffer.name(), str)
+
+    def test_pickle(self):
+        # Copies attach to the same memory
+        with se.SharedOutputBuffer((2, 3)) as buffer:
+            copy = pickle.loads(pickle.dumps(buffer))
+            self.assertEqual(copy.name(), buffer.name())
+            copy.array()[1, 2] = 5
+            self.assertEqual(buffer.array()[1, 2], 5)
+
+            # Unlinking a copy does not free the memory
+            copy.unlink()
+            self.assertEqual(buffer.array()[1, 2], 5)
+
+    def test_unlink(self):
+        buffer = se.SharedOutputBuffer((2, 3))
+        array = buffer.array()
+        with self.assertRaises(BufferError):
+            buffer.unlink()
+        del array
+        buffer.close()
+        with self.assertRaises(FileNotFoundError):
+            se.SharedOutputBuffer((2, 3), name=buffer.name())
+
 
 if __name__ == '__main__':
     unittest.main()
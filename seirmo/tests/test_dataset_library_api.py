@@ -4,7 +4,14 @@
 # for copyright notice and full license details.
 #
 
+import os
+import tempfile
 import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
 import seirmo as se
 
 
@@ -12,17 +19,155 @@ class TestDatasetLibraryAPIClass(unittest.TestCase):
     """
     Test the 'DatasetLibraryAPI' class.
     """
+    def setUp(self):
+        # Keep the converted datasets in a temporary directory, and check
+        # nothing is written to the default cache or the package
+        self._directory = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self._directory.name, 'cache')
+        self._default_cache = os.path.join(self._directory.name, 'default')
+        self._environ = patch.dict(
+            os.environ, {'XDG_CACHE_HOME': self._default_cache})
+        self._environ.start()
+        self._package_files = os.listdir(self.data_library())
+
+    def tearDown(self):
+        self._environ.stop()
+        self.assertFalse(os.path.exists(self._default_cache))
+        self.assertEqual(
+            os.listdir(self.data_library()), self._package_files)
+        self._directory.cleanup()
+
+    def data_library(self):
+        return os.path.join(os.path.dirname(se.__file__), 'data_library')
+
     def test__init__(self):
         se.DatasetLibrary()
 
+        # The converted datasets are stored in the user's cache directory
+        with patch.dict(os.environ, {'XDG_CACHE_HOME': '/xdg'}):
+            self.assertEqual(se.DatasetLibrary().cache_dir(),
+                             os.path.join('/xdg', 'seirmo'))
+        with patch.dict(os.environ, {'XDG_CACHE_HOME': ''}):
+            self.assertEqual(
+                se.DatasetLibrary().cache_dir(),
+                os.path.join(os.path.expanduser('~'), '.cache', 'seirmo'))
+
     def test_french_flu(self):
-        dataframe = se.DatasetLibrary().french_flu()
+        dataframe = se.DatasetLibrary(cache_dir=self.cache_dir).french_flu()
         column_keys = dataframe.head()
         expect_keys = [
             'time_index', 'year', 'week', 'day', 'inc', 'inc_low',
             'inc_up', 'inc100', 'inc100_low', 'inc100_up']
         self.assertTrue(set(column_keys) == set(expect_keys))
 
+    def test_register(self):
+        library = se.DatasetLibrary(cache_dir=self.cache_dir)
+        self.assertEqual(library.datasets(), ['french_flu'])
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'data.csv')
+            with open(filepath, 'w') as f:
+                f.write('Time,Incidence Number\n0,1\n1,3\n')
+            library.register('local', filepath)
+            self.assertEqual(library.datasets(), ['french_flu', 'local'])
+            self.assertEqual(
+                list(library.load('local')['Incidence Number']), [1, 3])
+
+            with self.assertRaises(ValueError):
+                library.register('local', filepath)
+            with self.assertRaises(ValueError):
+                library.register('other', os.path.join(directory, 'x.csv'))
+            self.assertEqual(os.listdir(directory), ['data.csv'])
+
+        # The registry belongs to the library
+        self.assertEqual(se.DatasetLibrary().datasets(), ['french_flu'])
+
+    def test_load_query(self):
+        library = se.DatasetLibrary(cache_dir=self.cache_dir)
+        full = library.french_flu()
+
+        # A range of rows keeps the index of the full dataset, and is a view
+        dataframe = library.load(
+            'french_flu', rows=slice(60, 91), columns=['time_index', 'inc'])
+        pd.testing.assert_frame_equal(
+            dataframe, full.loc[60:90, ['time_index', 'inc']])
+        self.assertTrue(np.shares_memory(
+            dataframe['inc'].to_numpy(), full['inc'].to_numpy()))
+
+        # Years and weeks select inclusive ranges within the rows
+        dataframe = library.load(
+            'french_flu', years=(1990, 1991), weeks=(1, 10), columns=['inc'])
+        expected = full[full['year'].between(1990, 1991)
+                        & full['week'].between(1, 10)][['inc']]
+        self.assertEqual(len(dataframe), 20)
+        pd.testing.assert_frame_equal(dataframe, expected)
+
+        dataframe = library.load('french_flu', rows=slice(0, 300), years=1990)
+        pd.testing.assert_frame_equal(
+            dataframe, full.iloc[:300][full['year'].iloc[:300] == 1990])
+
+        with self.assertRaises(ValueError):
+            library.load('unknown')
+        with self.assertRaises(TypeError):
+            library.load('french_flu', rows=(60, 91))
+        with self.assertRaises(ValueError):
+            library.load('french_flu', columns=['Time'])
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'data.csv')
+            with open(filepath, 'w') as f:
+                f.write('Time,Incidence Number\n0,1\n1,3\n')
+            library.register('local', filepath)
+            with self.assertRaises(ValueError):
+                library.load('local', weeks=1)
+            self.assertEqual(os.listdir(directory), ['data.csv'])
+
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'data.csv')
+            with open(filepath, 'w') as f:
+                f.write('a,b,c\n1,0.5,x\n2,,\n3,1.5,z\n')
+            expected = pd.read_csv(filepath)
+
+            # The file is converted into columns once, and memory-mapped
+            cache_dir = os.path.join(directory, 'cache')
+            library = se.DatasetLibrary(cache_dir=cache_dir)
+            self.assertEqual(library.cache_dir(), cache_dir)
+            dataframe = library._load(filepath)
+            pd.testing.assert_frame_equal(dataframe, expected)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            self.assertFalse(dataframe['a'].to_numpy().flags.writeable)
+
+            # Later loads share the cached columns, and are not affected by
+            # added or replaced columns
+            dataframe['a'] = dataframe['a'] * 2
+            dataframe['d'] = 1
+            other = library._load(filepath)
+            pd.testing.assert_frame_equal(other, expected)
+            self.assertTrue(np.shares_memory(
+                other['b'].to_numpy(),
+                library._load(filepath)['b'].to_numpy()))
+
+            # Other libraries read the columns back from the cache directory
+            other = se.DatasetLibrary(cache_dir=cache_dir)._load(filepath)
+            pd.testing.assert_frame_equal(other, expected)
+            self.assertFalse(other['a'].to_numpy().flags.writeable)
+
+            # Changed files are converted again, replacing the old columns
+            with open(filepath, 'a') as f:
+                f.write('4,2.5,w\n')
+            dataframe = library._load(filepath)
+            self.assertEqual(list(dataframe['a']), [1, 2, 3, 4])
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            self.assertEqual(len(library._datasets), 1)
+
+            # Without a writable cache, the parsed file is returned
+            cache_file = os.path.join(directory, 'file')
+            open(cache_file, 'w').close()
+            dataframe = se.DatasetLibrary(cache_dir=cache_file)._load(
+                filepath)
+            self.assertEqual(list(dataframe['a']), [1, 2, 3, 4])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -5,6 +5,7 @@
 #
 
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 
@@ -90,6 +91,131 @@ class TestDeterministicSEIRModel(unittest.TestCase):
         # Check output shape
         self.assertEqual(output.shape, (n_times, 4))
 
+    def test_jacobian(self):
+        model = se.DeterministicSEIRModel()
+        y = np.array([900, 20, 30, 50])
+        c = np.array([0.002, 0.5, 0.3])
+
+        # Compare with central finite differences of the right-hand side
+        expected = np.empty((4, 4))
+        for j in range(4):
+            dy = np.zeros(4)
+            dy[j] = 1e-4
+            expected[:, j] = (
+                np.array(model._right_hand_side(0, y + dy, c))
+                - np.array(model._right_hand_side(0, y - dy, c))) / 2e-4
+        np.testing.assert_allclose(model._jacobian(0, y, c), expected,
+                                   atol=1e-8)
+
+    def test_set_solver_options(self):
+        model = se.DeterministicSEIRModel()
+        self.assertEqual(model.solver_options(), {
+            'method': 'RK45', 'rtol': 1e-3, 'atol': 1e-6})
+
+        model.set_solver_options(method='BDF', atol=1e-8)
+        self.assertEqual(model.solver_options(), {
+            'method': 'BDF', 'rtol': 1e-3, 'atol': 1e-8})
+
+        with self.assertRaises(ValueError):
+            model.set_solver_options(method='Euler')
+        with self.assertRaises(ValueError):
+            model.set_solver_options(rtol=0)
+
+    def test_simulate_stiff(self):
+        """Compare the number of right-hand side evaluations of the
+        explicit and implicit solvers for a stiff system"""
+        test_parameters = np.array([1000, 0, 1, 0, 1e-3, 1e3, 0.1])
+        test_times = np.linspace(0, 10, num=11)
+
+        outputs, n_evaluations = [], []
+        for method in ('RK45', 'LSODA', 'BDF', 'Radau'):
+            model = se.DeterministicSEIRModel()
+            model.set_outputs(['S', 'E', 'I', 'R'])
+            model.set_solver_options(method=method)
+            with patch.object(model, '_right_hand_side',
+                              wraps=model._right_hand_side) as rhs:
+                outputs.append(model.simulate(test_parameters, test_times))
+            n_evaluations.append(rhs.call_count)
+
+        # The implicit solvers agree with the explicit solver, with a
+        # fraction of the evaluations
+        for output, n in zip(outputs[1:], n_evaluations[1:]):
+            np.testing.assert_allclose(output, outputs[0], rtol=0.01,
+                                       atol=0.1)
+            self.assertLess(10 * n, n_evaluations[0])
+
+    def test_simulate_rk4(self):
+        test_parameters = np.array([990, 5, 5, 0, 1e-3, 0.2, 0.1])
+        test_times = np.arange(0, 100)
+
+        model = se.DeterministicSEIRModel()
+        model.set_solver_options(rtol=1e-10, atol=1e-10)
+        expected = model.simulate(test_parameters, test_times)
+
+        # The error is below 1e-5 of the population with the default step
+        # (of 0.25 here), and shrinks as the fourth power of the step
+        model.set_solver_options(method='RK4')
+        output = model.simulate(test_parameters, test_times)
+        self.assertEqual(output.shape, (100, 5))
+        error = np.max(np.abs(output - expected))
+        self.assertLess(error, 0.01)
+
+        model.set_solver_options(max_step=0.0625)
+        self.assertEqual(model.solver_options()['max_step'], 0.0625)
+        output = model.simulate(test_parameters, test_times)
+        np.testing.assert_allclose(output, expected, atol=error / 100)
+
+        # The population is conserved
+        model.set_outputs(['S', 'E', 'I', 'R'])
+        output = model.simulate(test_parameters, test_times)
+        np.testing.assert_allclose(np.sum(output, axis=1), 1000)
+
+        # Sensitivities fall back to the adaptive solver
+        output, doutput = model.simulateS1(test_parameters, test_times)
+        self.assertEqual(doutput.shape, (100, 4, 7))
+
+        with self.assertRaises(ValueError):
+            model.set_solver_options(max_step=0)
+
+    def test_simulateS1(self):
+        test_parameters = np.array([0.9, 0.05, 0.05, 0, 1, 1, 0.5])
+        n_times = 11
+        test_times = np.linspace(0, 10, num=n_times)
+
+        model = se.DeterministicSEIRModel()
+        model.set_solver_options(rtol=1e-10, atol=1e-12)
+        output, doutput = model.simulateS1(test_parameters, test_times)
+        self.assertEqual(output.shape, (n_times, 5))
+        self.assertEqual(doutput.shape, (n_times, 5, 7))
+        np.testing.assert_allclose(
+            output, model.simulate(test_parameters, test_times), atol=1e-8)
+
+        # Compare with central finite differences of the outputs
+        expected = np.empty((n_times, 5, 7))
+        for j in range(7):
+            dp = np.zeros(7)
+            dp[j] = 1e-5
+            expected[..., j] = (
+                model.simulate(test_parameters + dp, test_times)
+                - model.simulate(test_parameters - dp, test_times)) / 2e-5
+        np.testing.assert_allclose(doutput, expected, atol=1e-6)
+
+        # Check the sensitivities of the selected outputs
+        model.set_outputs(['I', 'Incidence'])
+        output, doutput = model.simulateS1(test_parameters, test_times)
+        self.assertEqual(output.shape, (n_times, 2))
+        np.testing.assert_allclose(doutput, expected[:, [2, 4]], atol=1e-6)
+
+        # Only the outputs are written into a shared buffer
+        with se.SharedOutputBuffer((n_times, 5)) as buffer:
+            model._output_collector.set_shared_output(buffer)
+            shared_output, shared_doutput = model.simulateS1(
+                test_parameters, test_times)
+            np.testing.assert_array_equal(shared_output, output)
+            np.testing.assert_array_equal(shared_doutput, doutput)
+            np.testing.assert_array_equal(buffer.array()[:, [2, 4]], output)
+            model._output_collector.set_shared_output(None)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,117 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import numpy.testing as npt
+import pandas as pd
+
+import seirmo as se
+
+
+class TestEpiabmIncidences(unittest.TestCase):
+    """
+    Test the 'epiabm_incidences' function.
+    """
+    @classmethod
+    def setUpClass(cls):
+        # Four individuals over four time steps
+        cls.history = pd.DataFrame({
+            'time': [0, 0.5, 1, 1.5],
+            '0': [1, 2, 3, 9],
+            '1': [1, 1, 1, 4],
+            '2': [4, 5, 9, 9],
+            '3': [1, 1, 10, 10]})
+        cls.expected = [1, 1, 0, 1]
+
+    def test_dataframe(self):
+        output = se.epiabm_incidences(self.history)
+        self.assertEqual(
+            list(output.columns), ['Time', 'Incidence Number'])
+        npt.assert_array_equal(output['Time'], [0, 0.5, 1, 1.5])
+        npt.assert_array_equal(output['Incidence Number'], self.expected)
+
+    def test_chunks(self):
+        """Ensure the incidences do not depend on the chunk size"""
+        rng = np.random.default_rng(1)
+        statuses = rng.integers(1, 11, size=(30, 200))
+        statuses[:, :100] = rng.integers(1, 3, size=(30, 100))
+        history = pd.DataFrame(statuses)
+        history.insert(0, 'time', np.arange(30))
+
+        # Count the transitions one by one
+        expected = [np.sum((statuses[0] > 2) & (statuses[0] < 9))]
+        for previous, current in zip(statuses[:-1], statuses[1:]):
+            expected.append(sum(
+                1 for a, b in zip(previous, current) if a == 1 and 1 < b < 9))
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'inf_status_history.csv')
+            history.to_csv(filepath, index=False)
+            for chunk_size in (1, 7, 30, 64):
+                npt.assert_array_equal(se.epiabm_incidences(
+                    history, chunk_size)['Incidence Number'], expected)
+                pd.testing.assert_frame_equal(
+                    se.epiabm_incidences(filepath, chunk_size),
+                    se.epiabm_incidences(history, chunk_size))
+
+    def test_wide_history(self):
+        """Ensure a history with many individuals is processed in chunks of
+        the default size, with the statuses stored as 8-bit integers"""
+        rng = np.random.default_rng(2)
+        statuses = np.sort(rng.integers(1, 11, size=(12, 20000)), axis=0)
+        history = pd.DataFrame(statuses)
+        history.insert(0, 'time', np.arange(12) / 4)
+
+        previous, current = statuses[:-1], statuses[1:]
+        expected = [np.sum((statuses[0] > 2) & (statuses[0] < 9))] + list(
+            np.sum((previous == 1) & (current > 1) & (current < 9), axis=1))
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'inf_status_history.csv')
+            history.to_csv(filepath, index=False)
+
+            # Two rows of statuses per chunk
+            with patch.object(se._epiabm_processing, '_CHUNK_BYTES', 50000):
+                chunks = list(se._epiabm_processing._read_chunks(
+                    filepath, None))
+                output = se.epiabm_incidences(filepath)
+                pd.testing.assert_frame_equal(
+                    se.epiabm_incidences(history), output)
+
+        self.assertEqual(len(chunks), 6)
+        for times, chunk in chunks:
+            self.assertEqual(chunk.dtype, np.int8)
+            self.assertEqual(chunk.shape, (2, 20000))
+        npt.assert_array_equal(output['Time'], np.arange(12) / 4)
+        npt.assert_array_equal(output['Incidence Number'], expected)
+
+    def test_bad_input(self):
+        with self.assertRaises(TypeError):
+            se.epiabm_incidences(self.history.to_numpy())
+        with self.assertRaises(ValueError):
+            se.epiabm_incidences(self.history, chunk_size=0)
+        with self.assertRaises(ValueError):
+            se.epiabm_incidences(self.history.iloc[:0])
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'inf_status_history.csv')
+            with open(filepath, 'w') as f:
+                f.write('time,0,1\n0,1,1\n1,NA,1\n')
+            with self.assertRaises(ValueError):
+                se.epiabm_incidences(filepath)
+            with open(filepath, 'w') as f:
+                f.write('time,0,1\n0,1,1\n1,1\n')
+            with self.assertRaises(ValueError):
+                se.epiabm_incidences(filepath)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -117,6 +117,238 @@ class TestGillespieFunc(unittest.TestCase):
             self.assertAlmostEqual(np.sum(output[1:]), initial_pop,
                                    'Unexpected output - pop. not conserved')
 
+    def test_reactions_input(self):
+        """Ensure correct error handling for invalid reaction lists"""
+        m_rates = MagicMock()
+        m_rates.return_value = np.array([1])
+        with self.assertRaises(ValueError):  # reactions are (loss, gain)
+            list(se.solve_gillespie(m_rates, self.initial, self.t_span,
+                                    reactions=np.array([0, 1])))
+        with self.assertRaises(ValueError):  # compartments must exist
+            list(se.solve_gillespie(m_rates, self.initial, self.t_span,
+                                    reactions=np.array([[0, 2]])))
+        with self.assertRaises(TypeError):  # indices must be integers
+            list(se.solve_gillespie(m_rates, self.initial, self.t_span,
+                                    reactions=np.array([[0.0, 1.0]])))
+
+    def test_reactions_output(self):
+        def rate_func(x: np.ndarray):
+            return np.array([x[1]])
+
+        solve = se.solve_gillespie(rate_func, self.initial, [0, 100],
+                                   reactions=np.array([[0, 1]]))
+        for output in solve:
+            state = output[1:]
+            self.assertTrue(np.all(state >= 0),
+                            'Returned negative values in state array')
+
+        self.assertEqual(state.tolist(), [0, 10],
+                         'Unexpected output - incomplete infection')
+
+    def test_reactions_selection(self):
+        """Ensure only reactions with non-zero rates fire"""
+        m_rates = MagicMock()
+        m_rates.return_value = np.array([0, 2, 0])
+        reactions = np.array([[0, 1], [1, 2], [2, 0]])
+        solve = se.solve_gillespie(m_rates, np.array([0, 100, 0]), [0, 1],
+                                   reactions=reactions)
+        for i, output in enumerate(solve):
+            if output[0] < 1:
+                self.assertEqual(output[1:].tolist(), [0, 99 - i, i + 1])
+
+    @parameterized.expand([(np.random.randint(0, 100, (3,)),
+                            np.random.rand(3, 3) * 100)
+                           for _ in range(numReps // 10)])
+    def test_matrix_and_reactions_agree(self, initial, propensity_mat):
+        """Ensure the reaction list and matrix forms give the same path"""
+        reactions = np.argwhere(propensity_mat)
+
+        np.random.seed(1)
+        matrix_path = [output.copy() for output in se.solve_gillespie(
+            lambda x: propensity_mat, initial, [0, 1])]
+        np.random.seed(1)
+        reaction_path = [output.copy() for output in se.solve_gillespie(
+            lambda x: propensity_mat[tuple(reactions.T)], initial, [0, 1],
+            reactions=reactions)]
+
+        np.testing.assert_allclose(matrix_path, reaction_path)
+
+    def test_rng(self):
+        """Ensure generators with the same seed give the same path"""
+        paths = []
+        for _ in range(2):
+            rng = np.random.default_rng(5)
+            paths.append([output.copy() for output in se.solve_gillespie(
+                lambda x: np.array([x[1]]), np.array([50, 0]), [0, 1],
+                reactions=np.array([[0, 1]]), rng=rng)])
+        np.testing.assert_array_equal(paths[0], paths[1])
+
+
+class TestGillespieMethods(unittest.TestCase):
+    """Test the next reaction and composition-rejection methods of the
+    gillespie solve_gillespie function"""
+    def test_method_input(self):
+        m_rates = MagicMock()
+        m_rates.return_value = np.array([1])
+        with self.assertRaises(ValueError):  # method must be known
+            list(se.solve_gillespie(m_rates, np.array([10, 0]), [0, 1],
+                                    reactions=np.array([[0, 1]]),
+                                    method='first_reaction'))
+        with self.assertRaises(ValueError):  # one row per reaction
+            list(se.solve_gillespie(m_rates, np.array([10, 0]), [0, 1],
+                                    reactions=np.array([[0, 1]]),
+                                    method='next_reaction',
+                                    dependencies=np.ones((2, 2))))
+        with self.assertRaises(ValueError):  # dependencies are required
+            list(se.solve_gillespie(m_rates, np.array([10, 0]), [0, 1],
+                                    reactions=np.array([[0, 1]]),
+                                    method='composition_rejection'))
+
+    @parameterized.expand([('next_reaction',), ('composition_rejection',)])
+    def test_neg_propensity(self, method):
+        m_neg = MagicMock()
+        m_neg.return_value = np.array([[0, -1], [0, 0]])
+        solve = se.solve_gillespie(m_neg, np.array([10, 0]), [0, 1],
+                                   method=method,
+                                   dependencies=np.zeros((4, 2)))
+        with self.assertRaises(ValueError):
+            next(solve)
+
+    @parameterized.expand([(method, np.random.randint(0, 100, (3,)),
+                            np.random.rand(3, 3) * 100)
+                           for method in ('next_reaction',
+                                          'composition_rejection')
+                           for _ in range(numReps // 10)])
+    def test_population_conservation(self, method, initial, propensity_mat):
+        """Ensure population is conserved for any initial and prop matrix"""
+        solve = se.solve_gillespie(lambda x: propensity_mat, initial,
+                                   [0, 1], method=method,
+                                   dependencies=np.zeros((9, 3)))
+        for output in solve:
+            self.assertEqual(output.shape, (len(initial) + 1,))
+            self.assertAlmostEqual(np.sum(output[1:]), np.sum(initial))
+
+    @parameterized.expand([('next_reaction',), ('composition_rejection',)])
+    def test_matrix_reactions(self, method):
+        """Ensure only the entries of the propensity matrix which can be
+        non-zero are simulated, including those which are zero initially"""
+        def propensities(x):
+            matrix = np.zeros((3, 3))
+            matrix[0, 1], matrix[1, 2] = x[1], x[2]
+            return matrix
+
+        # Entry (0, 1) depends on A, entry (1, 2) on B
+        dependencies = np.zeros((9, 3))
+        dependencies[1, 0] = dependencies[5, 1] = 1
+        changes = set()
+        previous = np.array([20, 0, 0])
+        for output in se.solve_gillespie(
+                propensities, previous, [0, 50], method=method,
+                rng=np.random.default_rng(3), dependencies=dependencies):
+            changes.add(tuple(output[1:] - previous))
+            previous = output[1:].copy()
+
+        self.assertEqual(previous.tolist(), [0, 0, 20])
+        self.assertEqual(changes - {(0, 0, 0)}, {(-1, 1, 0), (0, -1, 1)})
+
+        graph = se._gillespie._dependency_graph(
+            np.array([1, 2]), np.array([2, 3]), dependencies[[1, 5]] > 0)
+        self.assertEqual([list(g) for g in graph], [[0, 1], [1]])
+
+    @parameterized.expand([('next_reaction',), ('composition_rejection',)])
+    def test_zero_propensity(self, method):
+        solution = list(se.solve_gillespie(
+            lambda x: np.array([0]), np.array([5, 5]), [0, 10],
+            reactions=np.array([[0, 1]]), method=method,
+            dependencies=np.zeros((1, 2))))
+        self.assertEqual(solution[-1][1:].tolist(), [5, 5])
+        self.assertGreaterEqual(solution[-1][0], 10)
+
+    @parameterized.expand([('direct',), ('next_reaction',),
+                           ('composition_rejection',)])
+    def test_chain_statistics(self, method):
+        """Ensure the methods sample the expected mean state of the chain
+        A -> B -> C, with unit rates"""
+        reactions = np.array([[0, 1], [1, 2]])
+        dependencies = np.array([[1, 0, 0], [0, 1, 0]])
+        rng = np.random.default_rng(4)
+
+        final_states = []
+        for _ in range(200):
+            for output in se.solve_gillespie(
+                    lambda x: x[1:3], np.array([50, 0, 0]), [0, 1],
+                    reactions=reactions, rng=rng, method=method,
+                    dependencies=dependencies):
+                if output[0] < 1:
+                    state = output[1:].copy()
+            final_states.append(state)
+
+        expected = 50 * np.array([np.exp(-1), np.exp(-1), 1 - 2 * np.exp(-1)])
+        np.testing.assert_allclose(
+            np.mean(final_states, axis=0), expected, atol=1)
+
+    def test_priority_queue(self):
+        rng = np.random.default_rng(1)
+        times = rng.random(50)
+        queue = se._gillespie._IndexedPriorityQueue(list(times))
+        for _ in range(500):
+            reaction = rng.integers(50)
+            times[reaction] = np.inf if rng.random() < 0.1 else rng.random()
+            queue.update(reaction, times[reaction])
+            self.assertEqual(queue.top(),
+                             (np.argmin(times), np.min(times)))
+            self.assertEqual(queue.time(reaction), times[reaction])
+
+    def test_composition_rejection_selector(self):
+        rng = np.random.default_rng(2)
+        rates = np.array([0, 0.3, 5, 1.2, 80, 0.01, 7])
+        selector = se._gillespie._CompositionRejectionSelector(list(rates))
+        selector.update(0, 20.0)
+        selector.update(4, 0.0)
+        rates[0], rates[4] = 20, 0
+        self.assertAlmostEqual(selector.total(), np.sum(rates))
+
+        counts = np.bincount([selector.select(rng) for _ in range(20000)],
+                             minlength=len(rates))
+        np.testing.assert_allclose(counts / 20000, rates / np.sum(rates),
+                                   atol=0.01)
+
+
+class TestGillespieEnsemble(unittest.TestCase):
+    """Test the lock-step ensemble gillespie solver"""
+    def test_decay(self):
+        """Ensure the ensemble mean follows the expected decay"""
+        times = np.linspace(0, 2, num=5)
+        output = se._gillespie._solve_gillespie_ensemble(
+            lambda x: x[:, 1:2], np.array([100, 0]), times, 2000,
+            np.array([[0, 1]]), np.random.default_rng(1))
+
+        self.assertEqual(output.shape, (2000, 5, 2))
+        np.testing.assert_array_equal(np.sum(output, axis=2), 100)
+        np.testing.assert_allclose(
+            np.mean(output[:, :, 0], axis=0), 100 * np.exp(-times),
+            rtol=0.02)
+
+    def test_recording(self):
+        """Ensure every time point before an event records the state
+        preceding that event"""
+        times = np.arange(0, 100)
+        output = se._gillespie._solve_gillespie_ensemble(
+            lambda x: 0.1 * (x[:, 1:2] > 0), np.array([1, 0]), times, 5,
+            np.array([[0, 1]]), np.random.default_rng(2))
+
+        for run in output:
+            # A single event moves the individual once and for all
+            changes = np.flatnonzero(np.diff(run[:, 0]))
+            self.assertLessEqual(len(changes), 1)
+            self.assertTrue(np.all(np.diff(run[:, 0]) <= 0))
+
+    def test_times_input(self):
+        with self.assertRaises(ValueError):  # times must increase
+            se._gillespie._solve_gillespie_ensemble(
+                lambda x: x[:, 1:2], np.array([10, 0]), [0, 2, 1], 2,
+                np.array([[0, 1]]), np.random.default_rng())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,118 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import unittest
+from unittest.mock import MagicMock, patch
+import numpy as np
+import numpy.testing as npt
+
+import seirmo as se
+from seirmo import _hybrid_model
+
+
+class TestHybridSEIRModel(unittest.TestCase):
+    """
+    Test the 'HybridSEIRModel' class.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.parameters = np.array([10 ** 5, 0, 5, 0, 5e-6, 0.5, 0.25])
+        cls.times = np.linspace(0, 150, num=31)
+
+    def test__init__(self):
+        model = se.HybridSEIRModel(threshold=50)
+        self.assertEqual(model.threshold(), 50)
+        self.assertEqual(model.output_names(), ['S', 'E', 'I', 'R'])
+        self.assertEqual(model.parameter_names(), [
+            'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'])
+        self.assertEqual(model.n_parameters(), 7)
+
+        with self.assertRaises(ValueError):
+            se.HybridSEIRModel(threshold=-1)
+
+    def test_simulate_stochastic(self):
+        """Ensure the model is exact below the threshold"""
+        model = se.HybridSEIRModel(threshold=np.inf)
+        stochastic_model = se.StochasticSEIRModel(model.parameter_names())
+        parameters = np.array([100, 0, 5, 0, 0.01, 0.5, 0.25])
+
+        output = model.simulate(parameters, self.times,
+                                rng=np.random.default_rng(1))
+        expected = stochastic_model.simulate(parameters, self.times,
+                                             rng=np.random.default_rng(1))
+        npt.assert_array_equal(output, expected)
+
+    def test_simulate_deterministic(self):
+        """Ensure the model follows the ODEs above the threshold"""
+        model = se.HybridSEIRModel(threshold=0)
+        output = model.simulate(self.parameters, self.times)
+
+        deterministic_model = se.DeterministicSEIRModel()
+        deterministic_model.set_outputs(['S', 'E', 'I', 'R'])
+        expected = deterministic_model.simulate(self.parameters, self.times)
+        npt.assert_allclose(output, expected)
+
+    def test_solver_options(self):
+        """Ensure the ODEs are integrated with the solver options, and
+        solver failures are raised"""
+        model = se.HybridSEIRModel(threshold=0)
+        model.set_solver_options(method='LSODA', rtol=1e-10, atol=1e-8)
+        self.assertEqual(model.solver_options(), {
+            'method': 'LSODA', 'rtol': 1e-10, 'atol': 1e-8})
+
+        deterministic_model = se.DeterministicSEIRModel()
+        deterministic_model.set_outputs(['S', 'E', 'I', 'R'])
+        deterministic_model.set_solver_options(rtol=1e-10, atol=1e-8)
+        expected = deterministic_model.simulate(self.parameters, self.times)
+        with patch.object(_hybrid_model, 'solve_ivp',
+                          wraps=_hybrid_model.solve_ivp) as solve_ivp:
+            output = model.simulate(self.parameters, self.times)
+        npt.assert_allclose(output, expected, rtol=1e-6)
+        self.assertEqual(solve_ivp.call_args.kwargs['method'], 'LSODA')
+        self.assertEqual(solve_ivp.call_args.kwargs['rtol'], 1e-10)
+        self.assertIn('jac', solve_ivp.call_args.kwargs)
+
+        model.set_solver_options(method='RK4')
+        output = model.simulate(self.parameters, self.times)
+        npt.assert_allclose(output, expected, rtol=1e-2)
+
+        failure = MagicMock(status=-1, message='Solver failed.')
+        with patch.object(_hybrid_model, 'solve_ivp', return_value=failure):
+            with self.assertRaisesRegex(RuntimeError, 'Solver failed.'):
+                model.simulate(self.parameters, self.times)
+
+    def test_simulate(self):
+        model = se.HybridSEIRModel(threshold=100)
+        model.set_outputs(['E', 'I'])
+        output = model.simulate(self.parameters, self.times,
+                                rng=np.random.default_rng(2))
+        self.assertEqual(output.shape, (31, 2))
+
+        model.set_outputs(['S', 'E', 'I', 'R'])
+        output = model.simulate(self.parameters, self.times,
+                                rng=np.random.default_rng(2))
+
+        # Check positivity and conservation of the population
+        self.assertFalse(np.any(np.isnan(output)))
+        self.assertTrue(np.all(output >= 0))
+        npt.assert_allclose(np.sum(output, axis=1), 10 ** 5 + 5)
+
+        # Check the model is whole-numbered at the start and end of the
+        # outbreak, but continuous at its peak
+        infected = output[:, 1] + output[:, 2]
+        npt.assert_array_equal(output[0], [10 ** 5, 0, 5, 0])
+        self.assertTrue(np.all(np.mod(output[infected < 50], 1) == 0))
+        self.assertTrue(np.any(np.mod(output[infected > 100], 1) != 0))
+
+    def test_round_population(self):
+        counts = np.array([10.4, 20.7, 0.6, 3.3])
+        rounded = _hybrid_model._round_population(counts)
+        npt.assert_array_equal(rounded, [10, 21, 1, 3])
+        self.assertEqual(np.sum(rounded), 35)
+
+
+if __name__ == '__main__':
+    unittest.main()
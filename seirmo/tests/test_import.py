@@ -0,0 +1,54 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import json
+import subprocess
+import sys
+import unittest
+
+import seirmo as se
+
+
+def _run(code):
+    # Runs the code in a fresh interpreter and returns what it prints
+    output = subprocess.run(
+        [sys.executable, '-c', code], check=True, capture_output=True,
+        text=True).stdout
+    return json.loads(output)
+
+
+class TestImport(unittest.TestCase):
+    """
+    Test that ``import seirmo`` only loads what simulations need.
+    """
+    def test_lazy_modules(self):
+        """Ensure the apps, plots and dataset library, and the heavy
+        dependencies they use, are only imported when accessed"""
+        code = (
+            'import json, sys\n'
+            'import seirmo\n'
+            'print(json.dumps([m for m in ('
+            '"dash", "dash_bootstrap_components", "plotly", "matplotlib", '
+            '"pandas", "numba", "seirmo.apps", "seirmo.plots", '
+            '"seirmo._dataset_library_api") '
+            'if m in sys.modules]))')
+        self.assertEqual(_run(code), [])
+
+    def test_getattr(self):
+        # Lazy attributes are imported on first access
+        self.assertIs(se.plots.SubplotFigure, se.plots._figures.SubplotFigure)
+        self.assertTrue(hasattr(se.apps, '_SimulationApp'))
+        self.assertIs(
+            se.DatasetLibrary, se._dataset_library_api.DatasetLibrary)
+        for name in ('apps', 'plots', 'DatasetLibrary'):
+            self.assertIn(name, dir(se))
+
+        with self.assertRaises(AttributeError):
+            se.not_a_module
+
+
+if __name__ == '__main__':
+    unittest.main()
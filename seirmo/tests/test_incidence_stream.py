@@ -0,0 +1,177 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import os
+import queue
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+
+import seirmo as se
+
+
+class TestIncidenceStream(unittest.TestCase):
+    """
+    Test the 'IncidenceStream' class.
+    """
+    def test__init__(self):
+        stream = se.IncidenceStream(5)
+        self.assertEqual(stream.capacity(), 5)
+        self.assertEqual(stream.n_rows(), 0)
+        self.assertEqual(stream.n_received(), 0)
+        self.assertEqual(
+            list(stream.data().columns), ['Time', 'Incidence Number'])
+
+        with self.assertRaises(ValueError):
+            se.IncidenceStream(0)
+        with self.assertRaises(ValueError):
+            se.IncidenceStream(1.5)
+
+    def test_append(self):
+        stream = se.IncidenceStream(5)
+        stream.append([0, 1, 2], [10, 11, 12])
+        npt.assert_array_equal(stream.data()['Time'], [0, 1, 2])
+        npt.assert_array_equal(
+            stream.data()['Incidence Number'], [10, 11, 12])
+
+        # The oldest rows are dropped when the buffer is full
+        stream.append([3, 4, 5, 6], [13, 14, 15, 16])
+        self.assertEqual(stream.n_rows(), 5)
+        self.assertEqual(stream.n_received(), 7)
+        npt.assert_array_equal(stream.data()['Time'], [2, 3, 4, 5, 6])
+
+        stream.append(np.arange(7, 20), np.arange(17, 30))
+        npt.assert_array_equal(stream.data()['Time'], np.arange(15, 20))
+        npt.assert_array_equal(
+            stream.data()['Incidence Number'], np.arange(25, 30))
+
+        with self.assertRaises(ValueError):
+            stream.append([1, 2], [1])
+
+    def test_subscribe(self):
+        stream = se.IncidenceStream(2)
+        received = []
+        stream.subscribe(received.append)
+
+        # Callbacks receive the new rows only
+        stream.append([0, 1], [1, 2])
+        stream.append([2, 3, 4], [3, 4, 5])
+        stream.append([], [])
+        self.assertEqual(len(received), 2)
+        npt.assert_array_equal(received[1]['Time'], [2, 3, 4])
+
+        stream.unsubscribe(received.append)
+        stream.append([5], [6])
+        self.assertEqual(len(received), 2)
+
+        with self.assertRaises(TypeError):
+            stream.subscribe(1)
+
+
+class TestFileIncidenceSource(unittest.TestCase):
+    """
+    Test the 'FileIncidenceSource' class.
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.directory.name, 'feed.csv')
+        with open(self.filepath, 'w') as f:
+            f.write('Time,Region,Incidence Number\n0,a,10\n1,a,11\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, text, mode='a'):
+        with open(self.filepath, mode) as f:
+            f.write(text)
+
+    def test_poll(self):
+        stream = se.IncidenceStream(10)
+        source = se.FileIncidenceSource(stream, self.filepath)
+        self.assertIs(source.stream(), stream)
+        self.assertEqual(source.poll(), 2)
+        self.assertEqual(source.poll(), 0)
+
+        # Incomplete lines are read once they are complete
+        self.write('2,a,12\n3,a,')
+        self.assertEqual(source.poll(), 1)
+        self.write('NA\n')
+        self.assertEqual(source.poll(), 1)
+        npt.assert_array_equal(stream.data()['Time'], [0, 1, 2, 3])
+        npt.assert_array_equal(
+            stream.data()['Incidence Number'], [10, 11, 12, np.nan])
+
+        # Truncated files are read from the start
+        self.write('Time,Region,Incidence Number\n7,b,1\n', mode='w')
+        self.assertEqual(source.poll(), 1)
+        npt.assert_array_equal(stream.data()['Time'], [0, 1, 2, 3, 7])
+
+    def test_from_start(self):
+        stream = se.IncidenceStream(10)
+        source = se.FileIncidenceSource(
+            stream, self.filepath, from_start=False)
+        self.assertEqual(source.poll(), 0)
+        self.write('2,a,12\n')
+        self.assertEqual(source.poll(), 1)
+        npt.assert_array_equal(stream.data()['Time'], [2])
+
+    def test_keys(self):
+        stream = se.IncidenceStream(10)
+        source = se.FileIncidenceSource(
+            stream, self.filepath, inc_key='Region')
+        self.assertEqual(source.poll(), 2)
+        self.assertTrue(np.all(np.isnan(stream.data()['Incidence Number'])))
+
+        source = se.FileIncidenceSource(stream, self.filepath, time_key='t')
+        with self.assertRaises(ValueError):
+            source.poll()
+        with self.assertRaises(TypeError):
+            se.FileIncidenceSource('stream', self.filepath)
+
+    def test_start(self):
+        stream = se.IncidenceStream(10)
+        source = se.FileIncidenceSource(stream, self.filepath)
+        source.start(interval=0.01)
+        with self.assertRaises(ValueError):
+            source.start()
+        self.write('2,a,12\n')
+
+        deadline = time.time() + 5
+        while stream.n_received() < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        source.stop()
+        source.stop()
+        self.assertEqual(stream.n_received(), 3)
+
+        with self.assertRaises(ValueError):
+            source.start(interval=0)
+
+
+class TestQueueIncidenceSource(unittest.TestCase):
+    """
+    Test the 'QueueIncidenceSource' class.
+    """
+    def test_poll(self):
+        rows = queue.Queue()
+        stream = se.IncidenceStream(10)
+        source = se.QueueIncidenceSource(stream, rows)
+        self.assertEqual(source.poll(), 0)
+
+        rows.put((0, 5))
+        rows.put((1, 6))
+        self.assertEqual(source.poll(), 2)
+        self.assertTrue(rows.empty())
+        npt.assert_array_equal(stream.data()['Incidence Number'], [5, 6])
+
+        with self.assertRaises(NotImplementedError):
+            se.IncidenceSource(stream).poll()
+
+
+if __name__ == '__main__':
+    unittest.main()
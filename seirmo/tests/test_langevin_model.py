@@ -0,0 +1,75 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+import seirmo as se
+
+
+class TestLangevinSEIRModel(unittest.TestCase):
+    """
+    Test the 'LangevinSEIRModel' class.
+    """
+    def test__init__(self):
+        model = se.LangevinSEIRModel(time_step=0.5)
+        self.assertEqual(model.time_step(), 0.5)
+        self.assertEqual(model.output_names(), ['S', 'E', 'I', 'R'])
+        self.assertEqual(model.parameter_names(), [
+            'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'])
+
+        with self.assertRaises(ValueError):
+            se.LangevinSEIRModel(time_step=0)
+
+    def test_simulate(self):
+        model = se.LangevinSEIRModel()
+        parameters = np.array([100, 0, 5, 0, 0.01, 0.5, 0.25])
+        times = np.linspace(0, 30, num=16)
+
+        output = model.simulate(parameters, times,
+                                rng=np.random.default_rng(1))
+        self.assertEqual(output.shape, (16, 4))
+        npt.assert_array_equal(output[0], [100, 0, 5, 0])
+
+        # Check positivity and conservation, even for small populations
+        self.assertTrue(np.all(output >= 0))
+        npt.assert_allclose(np.sum(output, axis=1), 105)
+
+        model.set_outputs(['I'])
+        self.assertEqual(model.simulate(parameters, times).shape, (16, 1))
+
+        with self.assertRaises(ValueError):
+            model.simulate(parameters, times[::-1])
+        with self.assertRaises(ValueError):
+            model.simulate(parameters * [-1, 1, 1, 1, 1, 1, 1], times)
+
+    def test_simulate_ensemble(self):
+        model = se.LangevinSEIRModel()
+        parameters = np.array([10 ** 7, 0, 100, 0, 5e-8, 0.5, 0.25])
+        times = np.linspace(0, 120, num=13)
+
+        output = model.simulate_ensemble(parameters, times, n_runs=50,
+                                         seed=2)
+        self.assertEqual(output.shape, (50, 13, 4))
+        npt.assert_array_equal(output, model.simulate_ensemble(
+            parameters, times, n_runs=50, seed=2))
+
+        # Check the trajectories are noisy, but their mean follows the ODEs
+        # for a large population
+        self.assertGreater(np.std(output[:, -1, 0]), 0)
+        deterministic_model = se.DeterministicSEIRModel()
+        deterministic_model.set_outputs(['S', 'E', 'I', 'R'])
+        expected = deterministic_model.simulate(parameters, times)
+        npt.assert_allclose(np.mean(output[:, :, [0, 3]], axis=0),
+                            expected[:, [0, 3]], rtol=0.1, atol=100)
+
+        with self.assertRaises(ValueError):
+            model.simulate_ensemble(parameters, times, n_runs=1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
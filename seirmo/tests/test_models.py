@@ -4,9 +4,14 @@
 # for copyright notice and full license details.
 #
 
+import pickle
+import sys
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
 import numpy as np
+from scipy.integrate import solve_ivp
 
 import seirmo as se
 
@@ -48,6 +53,16 @@ class TestForwardModel(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             forward_model.simulate(0, 1)
 
+    def test_simulate_batch(self):
+        forward_model = se.ForwardModel()
+        with self.assertRaises(NotImplementedError):
+            forward_model.simulate_batch([[0]], 1)
+
+    def test_simulateS1(self):
+        forward_model = se.ForwardModel()
+        with self.assertRaises(NotImplementedError):
+            forward_model.simulateS1(0, 1)
+
 
 class TestSEIRModel(unittest.TestCase):
     """
@@ -127,6 +142,217 @@ class TestSEIRModel(unittest.TestCase):
         # Check output shape
         self.assertEqual(output.shape, (n_times, 4))
 
+    def test_jacobian(self):
+        model = se.SEIRModel()
+        y = np.array([900, 20, 30, 50])
+        c = np.array([0.002, 0.5, 0.3])
+
+        # Compare with central finite differences of the right-hand side
+        expected = np.empty((4, 4))
+        for j in range(4):
+            dy = np.zeros(4)
+            dy[j] = 1e-4
+            expected[:, j] = (
+                np.array(model._right_hand_side(0, y + dy, c))
+                - np.array(model._right_hand_side(0, y - dy, c))) / 2e-4
+        np.testing.assert_allclose(model._jacobian(0, y, c), expected,
+                                   atol=1e-8)
+
+    def test_set_solver_options(self):
+        model = se.SEIRModel()
+        self.assertEqual(model.solver_options(), {
+            'method': 'RK45', 'rtol': 1e-3, 'atol': 1e-6})
+
+        model.set_solver_options(method='BDF', atol=1e-8)
+        self.assertEqual(model.solver_options(), {
+            'method': 'BDF', 'rtol': 1e-3, 'atol': 1e-8})
+
+        with self.assertRaises(ValueError):
+            model.set_solver_options(method='Euler')
+        with self.assertRaises(ValueError):
+            model.set_solver_options(rtol=0)
+
+    def test_simulate_stiff(self):
+        """Compare the number of right-hand side evaluations of the
+        explicit and implicit solvers for a stiff system"""
+        test_parameters = np.array([1000, 0, 1, 0, 1e-3, 1e3, 0.1])
+        test_times = np.linspace(0, 10, num=11)
+
+        outputs, n_evaluations = [], []
+        for method in ('RK45', 'LSODA', 'BDF', 'Radau'):
+            model = se.SEIRModel()
+            model.set_outputs(['S', 'E', 'I', 'R'])
+            model.set_solver_options(method=method)
+            with patch.object(model, '_right_hand_side',
+                              wraps=model._right_hand_side) as rhs:
+                outputs.append(model.simulate(test_parameters, test_times))
+            n_evaluations.append(rhs.call_count)
+
+        # The implicit solvers agree with the explicit solver, with a
+        # fraction of the evaluations
+        for output, n in zip(outputs[1:], n_evaluations[1:]):
+            np.testing.assert_allclose(output, outputs[0], rtol=0.01,
+                                       atol=0.1)
+            self.assertLess(10 * n, n_evaluations[0])
+
+    def test_simulate_rk4(self):
+        test_parameters = np.array([990, 5, 5, 0, 1e-3, 0.2, 0.1])
+        test_times = np.arange(0, 100)
+
+        model = se.SEIRModel()
+        model.set_solver_options(rtol=1e-10, atol=1e-10)
+        expected = model.simulate(test_parameters, test_times)
+
+        # The error is below 1e-5 of the population with the default step
+        # (of 0.25 here), and shrinks as the fourth power of the step
+        model.set_solver_options(method='RK4')
+        output = model.simulate(test_parameters, test_times)
+        self.assertEqual(output.shape, (100, 5))
+        error = np.max(np.abs(output - expected))
+        self.assertLess(error, 0.01)
+
+        model.set_solver_options(max_step=0.0625)
+        self.assertEqual(model.solver_options()['max_step'], 0.0625)
+        output = model.simulate(test_parameters, test_times)
+        np.testing.assert_allclose(output, expected, atol=error / 100)
+
+        # The population is conserved
+        model.set_outputs(['S', 'E', 'I', 'R'])
+        output = model.simulate(test_parameters, test_times)
+        np.testing.assert_allclose(np.sum(output, axis=1), 1000)
+
+        # Sensitivities fall back to the adaptive solver
+        output, doutput = model.simulateS1(test_parameters, test_times)
+        self.assertEqual(doutput.shape, (100, 4, 7))
+
+        with self.assertRaises(ValueError):
+            model.set_solver_options(max_step=0)
+
+    def test_rk4_accuracy(self):
+        """Compare RK4 with a tight-tolerance reference over a year of daily
+        time points, for realistic rates"""
+        rng = np.random.default_rng(2)
+        times = np.arange(366)
+        model = se.SEIRModel()
+        model.set_solver_options(method='RK4')
+        model.set_outputs(['S', 'E', 'I', 'R'])
+
+        for _ in range(20):
+            population = 10 ** rng.uniform(3, 6)
+            initial_infected = population * 10 ** rng.uniform(-4, -2)
+            y_init = [population - initial_infected, 0, initial_infected, 0]
+            c = [rng.uniform(0.1, 3) / population, rng.uniform(0.05, 1),
+                 rng.uniform(0.05, 1)]
+            expected = solve_ivp(
+                model._right_hand_side, [0, 365], y_init, t_eval=times,
+                args=(c,), rtol=1e-10, atol=1e-10 * population)['y']
+
+            output = model.simulate(np.array(y_init + c), times)
+            self.assertLess(
+                np.max(np.abs(output - expected.transpose())),
+                2e-6 * population)
+
+    def test_simulateS1(self):
+        test_parameters = np.array([0.9, 0.05, 0.05, 0, 1, 1, 0.5])
+        n_times = 11
+        test_times = np.linspace(0, 10, num=n_times)
+
+        model = se.SEIRModel()
+        model.set_solver_options(rtol=1e-10, atol=1e-12)
+        output, doutput = model.simulateS1(test_parameters, test_times)
+        self.assertEqual(output.shape, (n_times, 5))
+        self.assertEqual(doutput.shape, (n_times, 5, 7))
+        np.testing.assert_allclose(
+            output, model.simulate(test_parameters, test_times), atol=1e-8)
+
+        # Compare with central finite differences of the outputs
+        expected = np.empty((n_times, 5, 7))
+        for j in range(7):
+            dp = np.zeros(7)
+            dp[j] = 1e-5
+            expected[..., j] = (
+                model.simulate(test_parameters + dp, test_times)
+                - model.simulate(test_parameters - dp, test_times)) / 2e-5
+        np.testing.assert_allclose(doutput, expected, atol=1e-6)
+
+        # Check the sensitivities of the selected outputs
+        model.set_outputs(['I', 'Incidence'])
+        output, doutput = model.simulateS1(test_parameters, test_times)
+        self.assertEqual(output.shape, (n_times, 2))
+        np.testing.assert_allclose(doutput, expected[:, [2, 4]], atol=1e-6)
+
+    def test_batch_jacobian(self):
+        model = se.SEIRModel()
+        y = np.array([900, 20, 30, 50, 800, 10, 40, 150])
+        c = np.array([[0.002, 0.5, 0.3], [0.001, 0.2, 0.1]])
+
+        # Compare with the Jacobian of each system
+        expected = np.zeros((8, 8))
+        expected[:4, :4] = model._jacobian(0, y[:4], c[0])
+        expected[4:, 4:] = model._jacobian(0, y[4:], c[1])
+        np.testing.assert_allclose(
+            model._batch_jacobian(0, y, c).toarray(), expected)
+
+        model.set_solver_options(method='LSODA')
+        np.testing.assert_allclose(model._batch_jacobian(0, y, c), expected)
+
+    def test_simulate_batch(self):
+        test_parameters = np.array([
+            [0.9, 0.05, 0.05, 0, 1, 1, 0.5],
+            [0.99, 0, 0.01, 0, 2, 0.5, 0.2],
+            [0.8, 0.1, 0, 0.1, 0.5, 2, 1]])
+        n_times = 11
+        test_times = np.linspace(0, 10, num=n_times)
+
+        # Compare with simulating each parameter set
+        for method in ('RK45', 'LSODA', 'BDF', 'Radau'):
+            model = se.SEIRModel()
+            model.set_solver_options(method=method, rtol=1e-8, atol=1e-10)
+            model.set_outputs(['S', 'I', 'Incidence'])
+            output = model.simulate_batch(test_parameters, test_times)
+            self.assertEqual(output.shape, (3, n_times, 3))
+            for params, batch_output in zip(test_parameters, output):
+                np.testing.assert_allclose(
+                    batch_output, model.simulate(params, test_times),
+                    atol=1e-6)
+
+        # Compare with simulating each parameter set with a fixed step
+        model.set_solver_options(method='RK4', max_step=0.1)
+        output = model.simulate_batch(test_parameters, test_times)
+        for params, batch_output in zip(test_parameters, output):
+            np.testing.assert_allclose(
+                batch_output, model.simulate(params, test_times))
+
+        with self.assertRaises(ValueError):
+            model.simulate_batch(test_parameters[0], test_times)
+        with self.assertRaises(ValueError):
+            model.simulate_batch(test_parameters[:, :6], test_times)
+
+    def test_adjoint_gradient(self):
+        test_parameters = np.array([0.9, 0.05, 0.05, 0, 1, 1, 0.5])
+        test_times = np.linspace(0, 10, num=11)
+
+        model = se.SEIRModel()
+        model.set_solver_options(rtol=1e-10, atol=1e-12)
+        for outputs in (['S', 'E', 'I', 'R', 'Incidence'], ['Incidence']):
+            model.set_outputs(outputs)
+            data = model.simulate(1.1 * test_parameters, test_times)
+
+            def log_likelihood(output):
+                residuals = data - output
+                return -np.sum(residuals ** 2) / 2, residuals
+
+            value, gradient = model.adjoint_gradient(
+                test_parameters, test_times, log_likelihood)
+
+            # Compare with the gradient from the forward sensitivities
+            output, doutput = model.simulateS1(test_parameters, test_times)
+            expected_value, residuals = log_likelihood(output)
+            self.assertAlmostEqual(value, expected_value)
+            np.testing.assert_allclose(
+                gradient, np.einsum('ij,ijk->k', residuals, doutput),
+                rtol=1e-6, atol=1e-9)
+
 
 class TestReducedModel(unittest.TestCase):
     """
@@ -291,6 +517,189 @@ class TestReducedModel(unittest.TestCase):
         name_value_dict = {'S0': None, 'alpha': None}
         self.reduced_model.fix_parameters(name_value_dict)
 
+    def test_simulate_threads(self):
+        # Simulate a different parameter set in each of many threads at once,
+        # switching threads as often as possible to provoke races
+        model = se.ReducedModel(se.SEIRModel())
+        model.fix_parameters({'S0': 0.9, 'R0': 0})
+        test_times = np.linspace(0, 10, num=10)
+        rng = np.random.default_rng(1)
+        test_parameters = np.column_stack((
+            rng.uniform(0, 0.1, (200, 2)), rng.uniform(0.1, 2, (200, 3))))
+        expected = [model.simulate(params, test_times)
+                    for params in test_parameters]
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                outputs = list(executor.map(
+                    lambda params: model.simulate(params, test_times),
+                    test_parameters))
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        for output, expected_output in zip(outputs, expected):
+            np.testing.assert_array_equal(output, expected_output)
+
+        # The fixed parameters are unchanged
+        model.set_outputs(['S', 'E', 'I', 'R'])
+        self.assertEqual(model.simulate(test_parameters[0], [0, 1])[0, 0], 0.9)
+
+    def test_simulate_batch(self):
+        model = se.ReducedModel(se.SEIRModel())
+        model.set_outputs(['I', 'Incidence'])
+        test_times = np.linspace(0, 10, num=10)
+        rng = np.random.default_rng(1)
+        test_parameters = np.column_stack((
+            rng.uniform(0, 0.1, (5, 2)), rng.uniform(0.1, 2, (5, 3))))
+
+        # Without fixed parameters, all the parameters are required
+        with self.assertRaises(ValueError):
+            model.simulate_batch(test_parameters, test_times)
+
+        # The fixed parameters are inserted for all parameter sets at once,
+        # and the wrapped model simulates the batch in one call
+        model.fix_parameters({'S0': 0.9, 'R0': 0})
+        with patch.object(model._model, 'simulate_batch',
+                          wraps=model._model.simulate_batch) as batch:
+            output = model.simulate_batch(test_parameters, test_times)
+        batch.assert_called_once()
+        np.testing.assert_array_equal(
+            batch.call_args[0][0][:, [0, 3]], [[0.9, 0]] * 5)
+        np.testing.assert_array_equal(
+            batch.call_args[0][0][:, [1, 2, 4, 5, 6]], test_parameters)
+
+        self.assertEqual(output.shape, (5, 10, 2))
+        for params, batch_output in zip(test_parameters, output):
+            np.testing.assert_allclose(
+                batch_output, model.simulate(params, test_times), atol=1e-3)
+
+        with self.assertRaises(ValueError):
+            model.simulate_batch(test_parameters[0], test_times)
+
+    def test_simulateS1(self):
+        test_parameters = [0, 0.1, 0, 1, 1]
+        test_times = np.linspace(0, 10, num=10)
+
+        self.reduced_model.set_outputs(['I', 'Incidence'])
+        self.reduced_model.fix_parameters({'S0': 0.9, 'alpha': 1})
+        output, doutput = self.reduced_model.simulateS1(
+            test_parameters, test_times)
+
+        # Check that the sensitivities with respect to the fixed parameters
+        # are removed
+        model = se.SEIRModel()
+        model.set_outputs(['I', 'Incidence'])
+        expected, dexpected = model.simulateS1(
+            [0.9, 0, 0.1, 0, 1, 1, 1], test_times)
+        self.assertEqual(doutput.shape, (10, 2, 5))
+        np.testing.assert_almost_equal(output, expected)
+        np.testing.assert_almost_equal(
+            doutput, dexpected[..., [1, 2, 3, 5, 6]])
+
+        # Set the outputs to the default and unfix the parameters
+        self.reduced_model.set_outputs(
+            ['S', 'E', 'I', 'R', 'Incidence'])
+        self.reduced_model.fix_parameters({'S0': None, 'alpha': None})
+
+
+class TestCachedModel(unittest.TestCase):
+    """
+    Test the 'CachedModel' class.
+    """
+    def test__init__(self):
+        with self.assertRaises(TypeError):
+            se.CachedModel('1')
+        with self.assertRaises(ValueError):
+            se.CachedModel(se.SEIRModel(), max_size=0)
+        with self.assertRaises(ValueError):
+            se.CachedModel(se.SEIRModel(), max_bytes=-1)
+
+        model = se.CachedModel(se.SEIRModel())
+        self.assertEqual(model.n_parameters(), 7)
+        self.assertEqual(model.n_outputs(), 5)
+        self.assertEqual(
+            model.parameter_names(),
+            ['S0', 'E0', 'I0', 'R0', 'alpha', 'beta', 'gamma'])
+        self.assertEqual(
+            model.output_names(), ['S', 'E', 'I', 'R', 'Incidence'])
+        self.assertEqual(model.cache_info(), {
+            'hits': 0, 'misses': 0, 'size': 0, 'n_bytes': 0})
+
+    def test_simulate(self):
+        model = se.CachedModel(se.SEIRModel())
+        test_parameters = [0.9, 0, 0.1, 0, 1, 1, 1]
+        test_times = np.linspace(0, 10, num=10)
+        expected = se.SEIRModel().simulate(test_parameters, test_times)
+
+        # Identical simulations are only run once
+        with patch.object(model._model, 'simulate',
+                          wraps=model._model.simulate) as simulate:
+            output = model.simulate(test_parameters, test_times)
+            np.testing.assert_array_equal(output, expected)
+            output[:] = 0
+            output = model.simulate(
+                np.array(test_parameters), list(test_times))
+            np.testing.assert_array_equal(output, expected)
+        self.assertEqual(simulate.call_count, 1)
+        self.assertEqual(model.cache_info(), {
+            'hits': 1, 'misses': 1, 'size': 1, 'n_bytes': expected.nbytes})
+
+        # Different parameters, times or outputs are simulated again
+        model.simulate(test_parameters, test_times[:5])
+        model.simulate([0.8, 0, 0.2, 0, 1, 1, 1], test_times)
+        model.set_outputs(['I'])
+        self.assertEqual(model.output_names(), ['I'])
+        output = model.simulate(test_parameters, test_times)
+        np.testing.assert_array_equal(output, expected[:, [2]])
+        self.assertEqual(model.cache_info()['misses'], 4)
+
+        model.clear_cache()
+        self.assertEqual(model.cache_info(), {
+            'hits': 0, 'misses': 0, 'size': 0, 'n_bytes': 0})
+
+    def test_pickle(self):
+        model = se.CachedModel(se.SEIRModel(), max_size=2)
+        model.set_outputs(['I'])
+        test_parameters = [0.9, 0, 0.1, 0, 1, 1, 1]
+        test_times = np.linspace(0, 10, num=10)
+        expected = model.simulate(test_parameters, test_times)
+
+        # The copy keeps the settings, with an empty cache
+        copy = pickle.loads(pickle.dumps(model))
+        self.assertEqual(copy.output_names(), ['I'])
+        self.assertEqual(copy._max_size, 2)
+        self.assertEqual(copy.cache_info(), {
+            'hits': 0, 'misses': 0, 'size': 0, 'n_bytes': 0})
+        for _ in range(2):
+            np.testing.assert_array_equal(
+                copy.simulate(test_parameters, test_times), expected)
+        self.assertEqual(copy.cache_info()['hits'], 1)
+        self.assertEqual(model.cache_info()['size'], 1)
+
+    def test_simulate_bounds(self):
+        test_times = np.linspace(0, 10, num=10)
+        test_parameters = [[0.9, 0, 0.1, 0, 1, 1, beta]
+                           for beta in (1, 2, 3)]
+
+        # The least recently used simulation is forgotten first
+        model = se.CachedModel(se.SEIRModel(), max_size=2)
+        for params in test_parameters + test_parameters[1:]:
+            model.simulate(params, test_times)
+        self.assertEqual(model.cache_info()['hits'], 2)
+        self.assertEqual(model.cache_info()['size'], 2)
+        model.simulate(test_parameters[0], test_times)
+        self.assertEqual(model.cache_info()['misses'], 4)
+
+        # The total size of the outputs is bounded
+        n_bytes = 10 * 5 * 8
+        model = se.CachedModel(se.SEIRModel(), max_bytes=2 * n_bytes)
+        for params in test_parameters:
+            model.simulate(params, test_times)
+        self.assertEqual(model.cache_info()['size'], 2)
+        self.assertEqual(model.cache_info()['n_bytes'], 2 * n_bytes)
+
 
 if __name__ == '__main__':
     unittest.main()
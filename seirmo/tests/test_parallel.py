@@ -0,0 +1,133 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import subprocess
+import sys
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+import seirmo as se
+
+
+class TestEnsembleRunner(unittest.TestCase):
+    """
+    Test the 'EnsembleRunner' class.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.model = se.StochasticSEIRModel([
+            'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'])
+        cls.parameters = np.array([50, 0, 5, 0, 0.02, 0.5, 0.25])
+        cls.times = np.linspace(0, 20, num=6)
+
+    def test__init__(self):
+        runner = se.EnsembleRunner(self.model, n_workers=2)
+        self.assertEqual(runner.n_workers(), 2)
+        self.assertGreaterEqual(se.EnsembleRunner(self.model).n_workers(), 1)
+
+        with self.assertRaises(TypeError):
+            se.EnsembleRunner(se.SEIRModel())
+        with self.assertRaises(ValueError):
+            se.EnsembleRunner(self.model, n_workers=0)
+
+    def test_run(self):
+        runner = se.EnsembleRunner(self.model, n_workers=1)
+        output = runner.run(self.parameters, self.times, n_runs=8, seed=1)
+
+        # Check output shape, initial state and conservation
+        self.assertEqual(output.shape, (8, 6, 4))
+        npt.assert_array_equal(output[:, 0], [[50, 0, 5, 0]] * 8)
+        npt.assert_array_equal(np.sum(output, axis=2), 55)
+
+        # Check replicates are independent but reproducible
+        self.assertGreater(len(np.unique(output[:, -1, 3])), 1)
+        npt.assert_array_equal(
+            output, runner.run(self.parameters, self.times, 8, seed=1))
+
+        with self.assertRaises(ValueError):
+            runner.run(self.parameters, self.times, n_runs=0)
+
+    def test_run_parallel(self):
+        """Ensure results do not depend on the number of workers"""
+        serial = se.EnsembleRunner(self.model, n_workers=1).run(
+            self.parameters, self.times, n_runs=6, seed=7)
+        parallel = se.EnsembleRunner(self.model, n_workers=2).run(
+            self.parameters, self.times, n_runs=6, seed=7, chunksize=2)
+        npt.assert_array_equal(serial, parallel)
+
+    def test_run_shared(self):
+        """Ensure outputs written to shared memory match the default"""
+        expected = se.EnsembleRunner(self.model, n_workers=1).run(
+            self.parameters, self.times, n_runs=4, seed=5)
+
+        for n_workers in (1, 2):
+            runner = se.EnsembleRunner(self.model, n_workers=n_workers)
+            with se.SharedOutputBuffer((4, 6, 4)) as buffer:
+                output = runner.run(self.parameters, self.times, n_runs=4,
+                                    seed=5, shared_output=buffer)
+                npt.assert_array_equal(output, expected)
+                self.assertTrue(np.shares_memory(output, buffer.array()))
+                del output
+        self.assertIsNone(self.model._output_collector._shared_output)
+
+        # Selected outputs and sweeps
+        model = se.StochasticSEIRModel([
+            'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'])
+        model.set_outputs(['I', 'R'])
+        runner = se.EnsembleRunner(model, n_workers=2)
+        sweep = np.array([self.parameters, self.parameters])
+        with se.SharedOutputBuffer((8, 6, 4)) as buffer:
+            output = runner.run(sweep, self.times, n_runs=4, seed=5,
+                                shared_output=buffer)
+            npt.assert_array_equal(output[0], expected[..., 2:])
+            self.assertEqual(output.shape, (2, 4, 6, 2))
+
+            with self.assertRaises(ValueError):
+                runner.run(self.parameters, self.times, n_runs=4,
+                           shared_output=buffer)
+
+    def test_run_shared_detach(self):
+        """Ensure the workers detach from the shared memory, without errors
+        when their copies of the buffer are garbage collected"""
+        code = (
+            'import numpy as np\n'
+            'import seirmo as se\n'
+            'model = se.StochasticSEIRModel(\n'
+            '    ["S0", "E0", "I0", "R0", "beta", "kappa", "gamma"])\n'
+            'runner = se.EnsembleRunner(model, n_workers=2)\n'
+            'parameters = [50, 0, 5, 0, 0.02, 0.5, 0.25]\n'
+            'with se.SharedOutputBuffer((20, 6, 4)) as buffer:\n'
+            '    for chunksize in (1, 3):\n'
+            '        output = runner.run(\n'
+            '            parameters, np.linspace(0, 20, 6), 20, seed=1,\n'
+            '            chunksize=chunksize, shared_output=buffer)\n'
+            '        assert np.all(np.sum(output, axis=2) == 55)\n'
+            '    del output\n')
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stderr, '')
+
+    def test_sweep(self):
+        runner = se.EnsembleRunner(self.model, n_workers=2)
+        sweep = np.array([
+            self.parameters, self.parameters * [1, 1, 1, 1, 0, 1, 1]])
+        output = runner.run(sweep, self.times, n_runs=3, seed=2,
+                            method='tau_leaping')
+
+        self.assertEqual(output.shape, (2, 3, 6, 4))
+        # Without infection, nobody leaves the susceptible compartment
+        npt.assert_array_equal(output[1, :, :, 0], 50)
+
+        # Check replicates are streamed in order
+        streamed = list(runner.imap(sweep, self.times, n_runs=3, seed=2,
+                                    method='tau_leaping'))
+        npt.assert_array_equal(np.array(streamed), output.reshape(6, 6, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+import seirmo as se
+from seirmo import _seir_kernel
+
+
+class TestSEIRKernel(unittest.TestCase):
+    """
+    Test the compiled Gillespie kernel for the SEIR model.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.model = se.StochasticSEIRModel([
+            'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'])
+        cls.parameters = np.array([500, 0, 5, 0, 0.001, 0.5, 0.25])
+        cls.times = np.linspace(0, 40, num=21)
+
+    def test_same_trajectory(self):
+        """Ensure the kernel reproduces the NumPy backend for a seed"""
+        for seed in range(5):
+            expected = self.model.simulate(
+                self.parameters, self.times,
+                rng=np.random.default_rng(seed))
+            output = _seir_kernel._simulate_seir(
+                self.parameters[:4], *self.parameters[4:], self.times, 0.01,
+                np.random.default_rng(seed), compiled=False)
+            npt.assert_array_equal(output, expected)
+
+    def test_chunks(self):
+        """Ensure the trajectory does not depend on the chunk size"""
+        outputs = [_seir_kernel._simulate_seir(
+            self.parameters[:4], *self.parameters[4:], self.times, 0.01,
+            np.random.default_rng(3), compiled=False, chunk_size=chunk_size)
+            for chunk_size in (1, 7, 4096)]
+        npt.assert_array_equal(outputs[0], outputs[1])
+        npt.assert_array_equal(outputs[0], outputs[2])
+
+    def test_no_infection(self):
+        """Ensure the kernel keeps going while all rates are zero"""
+        output = _seir_kernel._simulate_seir(
+            [10, 0, 0, 3], 1, 1, 1, self.times, 0.01,
+            np.random.default_rng(0), compiled=False)
+        npt.assert_array_equal(output, [[10, 0, 0, 3]] * len(self.times))
+
+    @unittest.skipIf(
+        _seir_kernel._compiled_kernel() is None, 'Numba is not installed')
+    def test_compiled(self):
+        """Ensure the compiled kernel reproduces the NumPy backend"""
+        expected = self.model.simulate(
+            self.parameters, self.times, rng=np.random.default_rng(6))
+        output = self.model.simulate(
+            self.parameters, self.times, rng=np.random.default_rng(6),
+            backend='numba')
+        npt.assert_array_equal(output, expected)
+
+    def test_backend_input(self):
+        with self.assertRaises(ValueError):
+            self.model.simulate(self.parameters, self.times, backend='c')
+        with self.assertRaises(ValueError):
+            self.model.simulate(self.parameters, self.times,
+                                method='tau_leaping', backend='numba')
+
+        # Selected outputs are respected by both backends
+        model = se.StochasticSEIRModel([
+            'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'])
+        model.set_outputs(['I'])
+        output = model.simulate(self.parameters, self.times, backend='numba')
+        self.assertEqual(output.shape, (len(self.times), 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
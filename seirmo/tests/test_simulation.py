@@ -43,6 +43,19 @@ class TestSimulationController(unittest.TestCase):
         expected = np.ones(shape=10)
         np.testing.assert_almost_equal(total, expected)
 
+    def test_run_cached(self):
+        simulation = se.SimulationController(
+            se.SEIRModel, 0, 10, cache_size=2)
+        self.assertIsInstance(simulation._model, se.CachedModel)
+
+        test_parameters = [0.9, 0, 0.1, 0, 1, 1, 1]
+        output = simulation.run(test_parameters, ['S', 'E', 'I', 'R'])
+        np.testing.assert_array_equal(
+            simulation.run(test_parameters), output)
+        simulation.run(test_parameters, ['I'])
+        self.assertEqual(simulation._model.cache_info()['hits'], 1)
+        self.assertEqual(simulation._model.cache_info()['misses'], 2)
+
 
 if __name__ == '__main__':
     unittest.main()
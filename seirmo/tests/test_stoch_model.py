@@ -97,6 +97,39 @@ class TestStochModel(unittest.TestCase):
         expected_propensity = np.zeros((4, 4))
         nptest.assert_array_equal(model_prop, expected_propensity)
 
+    def test_reaction_rates(self):
+        model = se.StochasticSEIRModel([
+            'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'
+        ])
+        test_parameters = [0.9, 0, 0.1, 0, 0.5, 2, 3]
+        model._parameters.configure_parameters(np.array(test_parameters))
+
+        # Check the rates match the non-zero entries of the propensity
+        current_state = np.array([0, 10, 4, 2, 1])
+        rates = model.update_reaction_rates(current_state)
+        nptest.assert_array_equal(rates, [10, 8, 6])
+        propensity = model.update_propensity(current_state)
+        nptest.assert_array_equal(
+            propensity[tuple(model.reactions.T)], rates)
+
+    def test_compile_reaction_rates(self):
+        model = se.StochasticSEIRModel([
+            'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'
+        ])
+        test_parameters = [0.9, 0, 0.1, 0, 0.5, 2, 3]
+        model._parameters.configure_parameters(np.array(test_parameters))
+        reaction_rates = model.compile_reaction_rates()
+
+        # Check the compiled rates match the reference implementation
+        for current_state in ([0, 10, 4, 2, 1], [1, 0, 0, 0, 5]):
+            current_state = np.array(current_state, dtype=float)
+            nptest.assert_array_equal(
+                reaction_rates(current_state),
+                model.update_reaction_rates(current_state))
+
+        # Check the rates are written into the same preallocated vector
+        self.assertIs(reaction_rates(np.ones(5)), reaction_rates(np.ones(5)))
+
     def test_simulate(self):
         model = se.StochasticSEIRModel([
             'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'
@@ -127,6 +160,79 @@ class TestStochModel(unittest.TestCase):
         pos_matrix = (output >= 0)
         assert np.all(pos_matrix), 'One of the compartments has negative pop'
 
+        # Check the initial state is recorded at the first time point
+        output = model.simulate(np.array(test_parameters), test_times)
+        nptest.assert_array_equal(output[0], [9, 1])
+        self.assertFalse(np.any(np.isnan(output)))
+
+        # Check the output is only retrieved once the simulation has ended
+        with patch.object(model._output_collector, 'retrieve') as retrieve:
+            model.simulate(np.array(test_parameters), test_times)
+        self.assertEqual(retrieve.call_count, 1)
+
+    def test_simulate_tau_leaping(self):
+        model = se.StochasticSEIRModel([
+            'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'
+        ])
+        test_parameters = np.array([10 ** 6, 0, 10, 0, 5e-7, 0.5, 0.25])
+        test_times = np.linspace(0, 100, num=11)
+
+        output = model.simulate(test_parameters, test_times,
+                                method='tau_leaping')
+
+        # Check output shape, positivity and conservation
+        self.assertEqual(output.shape, (11, 4))
+        self.assertTrue(np.all(output >= 0))
+        nptest.assert_array_equal(np.sum(output, axis=1), 10 ** 6 + 10)
+
+        with self.assertRaises(ValueError):
+            model.simulate(test_parameters, test_times, method='euler')
+
+    def test_simulate_methods(self):
+        model = se.StochasticSEIRModel([
+            'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'
+        ])
+        test_parameters = np.array([100, 0, 5, 0, 0.01, 0.5, 0.25])
+        test_times = np.linspace(0, 20, num=11)
+
+        for method in ('next_reaction', 'composition_rejection'):
+            output = model.simulate(test_parameters, test_times,
+                                    method=method)
+            self.assertEqual(output.shape, (11, 4))
+            nptest.assert_array_equal(output[0], [100, 0, 5, 0])
+            self.assertTrue(np.all(output >= 0))
+            nptest.assert_array_equal(np.sum(output, axis=1), 105)
+
+    def test_simulate_ensemble(self):
+        model = se.StochasticSEIRModel([
+            'S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'
+        ])
+        test_parameters = np.array([100, 0, 5, 0, 0.01, 0.5, 0.25])
+        test_times = np.linspace(0, 20, num=11)
+
+        output = model.simulate_ensemble(
+            test_parameters, test_times, n_runs=30, seed=3)
+
+        # Check output shape, initial state, positivity and conservation
+        self.assertEqual(output.shape, (30, 11, 4))
+        nptest.assert_array_equal(output[:, 0], [[100, 0, 5, 0]] * 30)
+        self.assertTrue(np.all(output >= 0))
+        nptest.assert_array_equal(np.sum(output, axis=2), 105)
+
+        # Check replicates differ, but are reproducible from the seed
+        self.assertGreater(len(np.unique(output[:, -1, 3])), 1)
+        nptest.assert_array_equal(output, model.simulate_ensemble(
+            test_parameters, test_times, n_runs=30, seed=3))
+
+        # Check outputs can be selected
+        model.set_outputs(['S', 'I'])
+        selected = model.simulate_ensemble(
+            test_parameters, test_times, n_runs=30, seed=3)
+        nptest.assert_array_equal(selected, output[:, :, [0, 2]])
+
+        with self.assertRaises(ValueError):
+            model.simulate_ensemble(test_parameters, test_times, n_runs=0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,7 +4,10 @@
 # for copyright notice and full license details.
 #
 
+import time
+import tracemalloc
 import unittest
+from unittest.mock import patch
 import numpy as np
 import numpy.testing as npt
 
@@ -29,6 +32,32 @@ class TestStochasticOutputCollector(unittest.TestCase):
         self.assertEqual(output._times[0], 0)
         self.assertEqual(output._index, 0)
 
+    def test_begin_shared(self):
+        output = se.StochasticOutputCollector(['S', 'I', 'R'])
+        with se.SharedOutputBuffer((2, 4, 3)) as buffer:
+            output.set_shared_output(buffer, 0)
+            output.begin(np.arange(4))
+            output.report(np.array([0, 1, 2, 3]))
+            output.report(np.array([2.5, 4, 5, 6]))
+            npt.assert_array_equal(
+                buffer.array()[0], [[1, 2, 3], [1, 2, 3], [1, 2, 3],
+                                    [np.nan] * 3])
+            self.assertTrue(np.shares_memory(output._data, buffer.array()))
+
+            with self.assertRaises(ValueError):
+                output.begin(np.arange(5))
+            output.set_shared_output(None)
+
+        # Without an index, the states fill the whole buffer
+        with se.SharedOutputBuffer((4, 3)) as buffer:
+            output.set_shared_output(buffer)
+            output.begin(np.arange(4))
+            output.report(np.array([0, 1, 2, 3]))
+            output.report(np.array([2.5, 4, 5, 6]))
+            npt.assert_array_equal(buffer.array()[:3], [[1, 2, 3]] * 3)
+            self.assertTrue(np.shares_memory(output._data, buffer.array()))
+            output.set_shared_output(None)
+
     def test_report_and_retrieve_time(self):
         output = se.StochasticOutputCollector(['S', 'E', 'I', 'R'])
         output.begin(np.array([1, 2, 3]))
@@ -46,6 +75,80 @@ class TestStochasticOutputCollector(unittest.TestCase):
         npt.assert_array_equal(output.retrieve_time(1),
                                np.transpose([2, 3, 4, 5]))
 
+    def test_report_fills_skipped_times(self):
+        output = se.StochasticOutputCollector(['S', 'I'])
+        output.begin(np.arange(6))
+
+        # A single event can jump over several time points, which all hold
+        # the state before the event
+        output.report(np.array([0, 10, 0]))
+        output.report(np.array([0.5, 9, 1]))
+        output.report(np.array([3.5, 8, 2]))
+        output.report(np.array([7, 7, 3]))
+        npt.assert_array_equal(output.retrieve(), [
+            [10, 0], [9, 1], [9, 1], [9, 1], [8, 2], [8, 2]])
+
+        # Events at a time point are included in the state at that time
+        output.begin(np.arange(3))
+        output.report(np.array([0, 10, 0]))
+        output.report(np.array([1, 9, 1]))
+        output.report(np.array([2.5, 8, 2]))
+        npt.assert_array_equal(output.retrieve(), [[10, 0], [9, 1], [9, 1]])
+
+    def test_report_memory(self):
+        """Ensure the memory used by reports does not grow with the number
+        of events or time points"""
+        peaks = []
+        for n_events in (10 ** 3, 10 ** 5):
+            output = se.StochasticOutputCollector(['S', 'I'])
+            output.begin(np.linspace(0, 1, num=n_events // 10))
+            events = np.column_stack((
+                np.linspace(0, 1.1, num=n_events),
+                np.zeros((n_events, 2))))
+
+            tracemalloc.start()
+            for event in events:
+                output.report(event)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        self.assertLess(peaks[1], 10 ** 4)
+        self.assertLess(peaks[1], 2 * peaks[0] + 10 ** 3)
+
+    def test_report_cost(self):
+        """Ensure the cost of a report is small, and does not grow with the
+        number of events"""
+        costs = []
+        for n_events in (10 ** 3, 10 ** 5):
+            events = np.column_stack((
+                np.linspace(0, 1.1, num=n_events),
+                np.zeros((n_events, 2))))
+
+            # Only the events which pass a time point search the remaining
+            # time points
+            output = se.StochasticOutputCollector(['S', 'I'])
+            output.begin(np.linspace(0, 1, num=100))
+            with patch('numpy.searchsorted',
+                       wraps=np.searchsorted) as searchsorted:
+                for event in events:
+                    output.report(event)
+            self.assertGreater(searchsorted.call_count, 0)
+            self.assertLessEqual(searchsorted.call_count, 100)
+
+            # Time per report, taking the fastest of a few repeats to reduce
+            # noise from other processes
+            cost = np.inf
+            for _ in range(3):
+                output.begin(np.linspace(0, 1, num=100))
+                start = time.perf_counter()
+                for event in events:
+                    output.report(event)
+                cost = min(cost, (time.perf_counter() - start) / n_events)
+            costs.append(cost)
+
+        self.assertLess(costs[1], 10 ** -4)
+        self.assertLess(costs[1], 3 * costs[0])
+
 
 if __name__ == '__main__':
     unittest.main()
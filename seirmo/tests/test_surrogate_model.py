@@ -0,0 +1,140 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import unittest
+import numpy as np
+import numpy.testing as npt
+
+import seirmo as se
+
+
+class TestSurrogateModel(unittest.TestCase):
+    """
+    Test the 'SurrogateModel' class.
+    """
+    @classmethod
+    def setUpClass(cls):
+        # Design varying beta and gamma around an outbreak
+        rng = np.random.default_rng(1)
+        cls.design = np.tile([0.98, 0, 0.02, 0, 1, 0.4, 0.25], (40, 1))
+        cls.design[:, 4] = rng.uniform(0.8, 1.2, 40)
+        cls.design[:, 6] = rng.uniform(0.2, 0.3, 40)
+        cls.times = np.arange(0, 30)
+
+        cls.model = se.SEIRModel()
+        cls.model.set_outputs(['I', 'Incidence'])
+        cls.surrogate = se.SurrogateModel(cls.model, tolerance=1e-3)
+        cls.surrogate.fit(cls.design, cls.times)
+
+    def test__init__(self):
+        model = se.SurrogateModel(se.SEIRModel(), tolerance=0.1)
+        self.assertEqual(model.tolerance(), 0.1)
+        self.assertEqual(model.n_parameters(), 7)
+        self.assertEqual(model.n_outputs(), 5)
+        self.assertEqual(
+            model.parameter_names(),
+            ['S0', 'E0', 'I0', 'R0', 'alpha', 'beta', 'gamma'])
+        self.assertEqual(
+            model.output_names(), ['S', 'E', 'I', 'R', 'Incidence'])
+        self.assertEqual(
+            model.emulator_info(), {'emulated': 0, 'simulated': 0})
+
+        # Stochastic models can be emulated too
+        se.SurrogateModel(
+            se.StochasticSEIRModel(model.parameter_names()), tolerance=1)
+
+        with self.assertRaises(TypeError):
+            se.SurrogateModel('1', tolerance=0.1)
+        with self.assertRaises(ValueError):
+            se.SurrogateModel(se.SEIRModel(), tolerance=-1)
+
+    def test_fit(self):
+        model = se.SurrogateModel(se.SEIRModel(), tolerance=0.1)
+        with self.assertRaises(ValueError):
+            model.fit(self.design[:, :6], self.times)
+        with self.assertRaises(ValueError):
+            model.fit(self.design[:1], self.times)
+        with self.assertRaises(ValueError):
+            model.predict(self.design[0])
+
+    def test_predict(self):
+        # The emulator interpolates the design
+        mean, std = self.surrogate.predict(self.design[0])
+        self.assertEqual(mean.shape, (30, 2))
+        self.assertEqual(std.shape, (30, 2))
+        npt.assert_allclose(
+            mean, self.model.simulate(self.design[0], self.times), atol=1e-4)
+
+        # Within the design it is accurate, and knows it
+        parameters = np.array([0.98, 0, 0.02, 0, 1.05, 0.4, 0.23])
+        mean, std = self.surrogate.predict(parameters)
+        error = np.abs(mean - self.model.simulate(parameters, self.times))
+        self.assertLess(np.max(error), 1e-3)
+        self.assertLess(np.max(std), 1e-3)
+
+        # Far outside the design it knows it is not
+        parameters = np.array([0.98, 0, 0.02, 0, 3, 0.4, 0.1])
+        _, std = self.surrogate.predict(parameters)
+        self.assertGreater(np.max(std), 1e-2)
+
+    def test_simulate(self):
+        model = se.SEIRModel()
+        model.set_outputs(['I', 'Incidence'])
+        surrogate = se.SurrogateModel(model, tolerance=1e-3)
+
+        # Until it is fitted the model is simulated
+        parameters = np.array([0.98, 0, 0.02, 0, 1.05, 0.4, 0.23])
+        npt.assert_array_equal(
+            surrogate.simulate(parameters, self.times),
+            model.simulate(parameters, self.times))
+        self.assertEqual(
+            surrogate.emulator_info(), {'emulated': 0, 'simulated': 1})
+
+        # Accurate predictions are emulated, inaccurate ones simulated
+        surrogate._emulator = self.surrogate._emulator
+        mean, _ = surrogate.predict(parameters)
+        npt.assert_array_equal(
+            surrogate.simulate(parameters, self.times), mean)
+        self.assertEqual(
+            surrogate.emulator_info(), {'emulated': 1, 'simulated': 1})
+
+        parameters = np.array([0.98, 0, 0.02, 0, 3, 0.4, 0.1])
+        npt.assert_array_equal(
+            surrogate.simulate(parameters, self.times),
+            model.simulate(parameters, self.times))
+        self.assertEqual(
+            surrogate.emulator_info(), {'emulated': 1, 'simulated': 2})
+
+        # Other times or outputs than those fitted are simulated
+        parameters = self.design[0]
+        surrogate.simulate(parameters, self.times[:10])
+        surrogate.set_outputs(['I'])
+        self.assertEqual(surrogate.output_names(), ['I'])
+        surrogate.simulate(parameters, self.times)
+        self.assertEqual(
+            surrogate.emulator_info(), {'emulated': 1, 'simulated': 4})
+
+    def test_simulate_stochastic(self):
+        """Ensure the mean output of a stochastic model is emulated"""
+        np.random.seed(1)
+        model = se.StochasticSEIRModel(
+            ['S0', 'E0', 'I0', 'R0', 'beta', 'kappa', 'gamma'])
+        design = np.tile([90, 0, 10, 0, 0.01, 0.5, 0.25], (30, 1))
+        design[:, 4] = np.linspace(0.005, 0.015, 30)
+        times = np.linspace(0, 10, 11)
+
+        surrogate = se.SurrogateModel(model, tolerance=10)
+        surrogate.fit(design, times)
+
+        # The nugget absorbs the noise instead of interpolating it
+        self.assertGreater(surrogate._emulator['nugget'], 1e-4)
+        self.assertLess(self.surrogate._emulator['nugget'], 1e-6)
+        mean, _ = surrogate.predict(design[15])
+        npt.assert_allclose(np.sum(mean, axis=1), 100, rtol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
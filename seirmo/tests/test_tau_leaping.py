@@ -0,0 +1,112 @@
+#
+# This file is part of seirmo (https://github.com/SABS-R3-Epidemiology/seirmo/)
+# which is released under the BSD 3-clause license. See accompanying LICENSE.md
+# for copyright notice and full license details.
+#
+
+import unittest
+import numpy as np
+from parameterized import parameterized
+from unittest.mock import MagicMock
+
+import seirmo as se
+
+numReps = 20
+
+
+class TestTauLeapingFunc(unittest.TestCase):
+    """Test the solve_tau_leaping function"""
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.initial = np.array([10, 0])
+        cls.t_span = [0, 10]
+        cls.reactions = np.array([[0, 1]])
+        cls.m = MagicMock()
+        cls.m.return_value = np.array([1])
+
+    def test_t_span_input(self):
+        """Ensure correct error handling for invalid t_span inputs"""
+        with self.assertRaises(ValueError):  # t_span is 2D
+            list(se.solve_tau_leaping(self.m, self.initial, [0],
+                                      self.reactions))
+        with self.assertRaises(ValueError):  # t_stop > t_start
+            list(se.solve_tau_leaping(self.m, self.initial, [-2, 0],
+                                      self.reactions))
+        with self.assertRaises(TypeError):  # time values must be floats
+            list(se.solve_tau_leaping(self.m, self.initial, [0, 'ten'],
+                                      self.reactions))
+
+    def test_intial_input(self):
+        with self.assertRaises(ValueError):  # initial conditions must be +ve
+            list(se.solve_tau_leaping(self.m, np.array([-10, 0]),
+                                      self.t_span, self.reactions))
+        with self.assertRaises(ValueError):  # one order per compartment
+            list(se.solve_tau_leaping(self.m, self.initial, self.t_span,
+                                      self.reactions, highest_order=[1]))
+
+    def test_neg_propensity(self):
+        """Test error handling of negative reaction rates"""
+        m_neg = MagicMock()
+        m_neg.return_value = np.array([-1])
+        solve = se.solve_tau_leaping(m_neg, self.initial, self.t_span,
+                                     self.reactions)
+        with self.assertRaises(ValueError):
+            next(solve)
+
+    def test_zero_propensity(self):
+        """Ensure that zero rates give an unchanged state"""
+        m_zeros = MagicMock()
+        m_zeros.return_value = np.array([0])
+        solution = list(se.solve_tau_leaping(m_zeros, self.initial,
+                                             self.t_span, self.reactions))
+        self.assertEqual(solution[-1][1:].tolist(), self.initial.tolist())
+        self.assertGreaterEqual(solution[-1][0], self.t_span[1])
+
+    @parameterized.expand([(10 ** n,) for n in range(1, 7)])
+    def test_non_negative_and_conserved(self, population):
+        """Ensure compartments stay non-negative and population is
+        conserved, for small and large populations"""
+        reactions = np.array([[0, 1], [1, 2], [2, 0]])
+
+        def rate_func(x: np.ndarray):
+            return np.array([2 * x[1] * x[2] / population, x[2], x[3]])
+
+        solve = se.solve_tau_leaping(
+            rate_func, np.array([population - 1, 1, 0]), [0, 20],
+            reactions)
+        for output in solve:
+            self.assertTrue(np.all(output[1:] >= 0),
+                            'Returned negative values in state array')
+            self.assertEqual(np.sum(output[1:]), population,
+                             'Unexpected output - pop. not conserved')
+
+    def test_leaps(self):
+        """Ensure large populations are simulated in few steps"""
+        def rate_func(x: np.ndarray):
+            return np.array([x[1]])
+
+        solution = list(se.solve_tau_leaping(
+            rate_func, np.array([10 ** 6, 0]), [0, 20], self.reactions))
+        self.assertLess(len(solution), 10 ** 4)
+        self.assertEqual(solution[-1][1:].sum(), 10 ** 6)
+        self.assertLess(solution[-1][1], 10)
+
+    @parameterized.expand([(seed,) for seed in range(numReps // 4)])
+    def test_exponential_decay(self, seed):
+        """Ensure the leaped trajectory follows the expected mean decay"""
+        def rate_func(x: np.ndarray):
+            return np.array([0.5 * x[1]])
+
+        np.random.seed(seed)
+        for output in se.solve_tau_leaping(
+                rate_func, np.array([10 ** 6, 0]), [0, 2], self.reactions,
+                max_t_step=0.5):
+            if output[0] >= 1:
+                break
+        # The step ending after t = 1 ends no later than t = 2
+        expected = 10 ** 6 * np.exp(-0.5 * output[0])
+        self.assertAlmostEqual(output[1] / expected, 1, delta=0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()
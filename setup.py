@@ -81,5 +81,9 @@ setup(
             # Flake8 for code style checking
             'flake8>=3',
         ],
+        'numba': [
+            # Compiled kernel for the stochastic SEIR model
+            'numba',
+        ],
     },
 )